@@ -0,0 +1,133 @@
+# backend/api/batcher.py
+
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+# --- Micro-batching configuration (environment overrides) ---
+MICROBATCH_ENABLED = os.getenv("NERONODE_MICROBATCH", "0").lower() in ("1", "true", "yes")
+MICROBATCH_MAX_WAIT_MS = float(os.getenv("NERONODE_MICROBATCH_WAIT_MS", "2"))
+MICROBATCH_MAX_ROWS = int(os.getenv("NERONODE_MICROBATCH_MAX_ROWS", "64"))
+
+
+class MicroBatcher:
+    """Coalesces concurrent prediction requests into one batched model call.
+
+    Each `submit` enqueues an (n_rows, n_features) matrix and waits. A single
+    worker task drains the queue: it takes the first pending request, keeps
+    collecting until `max_batch_rows` rows are gathered or `max_wait_ms` has
+    elapsed, runs `predict_fn` once on the stacked matrix and fans the slices
+    back out. The call goes through `run(predict_fn, X)` (e.g. a Workload's
+    `run`, so batches share its admission limit), or the loop's default
+    executor when `run` is None; either way the event loop stays free. An
+    exception from `run` (such as a saturated workload) fails every request
+    in the batch.
+    """
+
+    def __init__(self, predict_fn, max_wait_ms: float = MICROBATCH_MAX_WAIT_MS,
+                 max_batch_rows: int = MICROBATCH_MAX_ROWS, run=None):
+        self.predict_fn = predict_fn
+        self.run = run
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_rows = max(1, int(max_batch_rows))
+        self._queue = None
+        self._worker = None
+        self._loop = None
+
+        # --- Stats ---
+        self.pending_rows = 0
+        self.requests_total = 0
+        self.rows_total = 0
+        self.batches_total = 0
+        self.max_batch_size = 0
+        self.errors_total = 0
+        self.batch_size_buckets = {}  # power-of-two upper bound -> count
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, X: np.ndarray) -> np.ndarray:
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self.pending_rows += X.shape[0]
+        self.requests_total += 1
+        await self._queue.put((X, future))
+        return await future
+
+    async def _collect(self):
+        X, future = await self._queue.get()
+        batch = [(X, future)]
+        rows = X.shape[0]
+        deadline = self._loop.time() + self.max_wait
+        while rows < self.max_batch_rows:
+            timeout = deadline - self._loop.time()
+            if timeout <= 0:
+                break
+            try:
+                X, future = await asyncio.wait_for(self._queue.get(), timeout)
+            except asyncio.TimeoutError:
+                break
+            batch.append((X, future))
+            rows += X.shape[0]
+        return batch, rows
+
+    async def _run(self):
+        while True:
+            batch, rows = await self._collect()
+            self.pending_rows -= rows
+            self._record_batch(rows)
+            matrices = [X for X, _ in batch]
+            stacked = matrices[0] if len(matrices) == 1 else np.vstack(matrices)
+            try:
+                if self.run is not None:
+                    predictions = await self.run(self.predict_fn, stacked)
+                else:
+                    predictions = await self._loop.run_in_executor(None, self.predict_fn, stacked)
+                predictions = np.asarray(predictions)
+            except Exception as e:
+                self.errors_total += 1
+                print(f"MicroBatcher: batched inference of {rows} rows failed: {e}", file=sys.stderr)
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            offset = 0
+            for X, future in batch:
+                n = X.shape[0]
+                if not future.done():
+                    future.set_result(predictions[offset:offset + n])
+                offset += n
+
+    def _record_batch(self, rows: int):
+        self.batches_total += 1
+        self.rows_total += rows
+        self.max_batch_size = max(self.max_batch_size, rows)
+        bucket = 1
+        while bucket < rows:
+            bucket *= 2
+        self.batch_size_buckets[bucket] = self.batch_size_buckets.get(bucket, 0) + 1
+
+    def stats(self) -> dict:
+        return {
+            "enabled": True,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_batch_rows": self.max_batch_rows,
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "pending_rows": self.pending_rows,
+            "requests_total": self.requests_total,
+            "rows_total": self.rows_total,
+            "batches_total": self.batches_total,
+            "errors_total": self.errors_total,
+            "avg_batch_size": (self.rows_total / self.batches_total) if self.batches_total else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "batch_size_histogram": {f"<={k}": v for k, v in sorted(self.batch_size_buckets.items())},
+            "timestamp": time.time(),
+        }
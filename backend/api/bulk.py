@@ -0,0 +1,141 @@
+# backend/api/bulk.py
+
+import io
+import json
+import tempfile
+
+import numpy as np
+
+from backend.model.features import MODEL_TRAINING_FEATURES
+
+BULK_DEFAULT_CHUNK_ROWS = 10000
+BULK_MAX_CHUNK_ROWS = 200000
+# Uploads are buffered in memory up to this size, then spill to a temporary file.
+BULK_SPOOL_MEMORY_BYTES = 8 * 1024 * 1024
+BULK_READ_BYTES = 64 * 1024
+
+
+class BulkParseError(ValueError):
+    pass
+
+
+def bulk_format_from_content_type(content_type: str) -> str:
+    content_type = (content_type or "").lower()
+    if "ndjson" in content_type or "jsonl" in content_type or "json" in content_type:
+        return "ndjson"
+    return "csv"
+
+
+async def spool_upload(byte_stream, max_memory: int = BULK_SPOOL_MEMORY_BYTES):
+    """Read a whole request body into a SpooledTemporaryFile, rewound and ready to score from.
+
+    The body has to be consumed before a StreamingResponse starts: under ASGI
+    spec < 2.4 Starlette listens for disconnects while streaming, and that
+    listener takes (and drops) any body messages still arriving.
+    """
+    spool = tempfile.SpooledTemporaryFile(max_size=max_memory)
+    try:
+        async for chunk in byte_stream:
+            spool.write(chunk)
+    except BaseException:
+        spool.close()
+        raise
+    spool.seek(0)
+    return spool
+
+
+async def iter_spool(spool, read_bytes: int = BULK_READ_BYTES):
+    while True:
+        chunk = spool.read(read_bytes)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def _iter_lines(byte_stream):
+    # Re-split arbitrary body chunks on newlines, carrying partial lines over.
+    remainder = b""
+    async for chunk in byte_stream:
+        if not chunk:
+            continue
+        remainder += chunk
+        lines = remainder.split(b"\n")
+        remainder = lines.pop()
+        for line in lines:
+            yield line
+    if remainder:
+        yield remainder
+
+
+def _parse_csv_chunk(lines, usecols, start_line):
+    try:
+        X = np.loadtxt(io.StringIO("\n".join(lines)), delimiter=",", usecols=usecols,
+                       dtype=np.float64, ndmin=2)
+    except ValueError as e:
+        raise BulkParseError(f"Could not parse CSV rows starting at line {start_line}: {e}")
+    return np.ascontiguousarray(X)
+
+
+def _parse_ndjson_chunk(lines, start_line):
+    X = np.empty((len(lines), len(MODEL_TRAINING_FEATURES)), dtype=np.float64)
+    for i, line in enumerate(lines):
+        try:
+            record = json.loads(line)
+            X[i] = [record[col] for col in MODEL_TRAINING_FEATURES]
+        except KeyError as e:
+            raise BulkParseError(f"Line {start_line + i}: missing feature {e}")
+        except (ValueError, TypeError) as e:
+            raise BulkParseError(f"Line {start_line + i}: invalid record: {e}")
+    return X
+
+
+async def iter_feature_chunks(byte_stream, fmt: str = "csv", chunk_rows: int = BULK_DEFAULT_CHUNK_ROWS):
+    """Parse a CSV (with header) or NDJSON byte stream into (n, 21) float matrices.
+
+    Rows are buffered `chunk_rows` at a time, so memory stays bounded by the
+    chunk size rather than the upload size. CSV columns are matched by header
+    name to MODEL_TRAINING_FEATURES; extra columns (e.g. Diabetes_binary) are ignored.
+    """
+    usecols = None
+    buffered = []
+    line_no = 0
+    start_line = 1
+    async for raw_line in _iter_lines(byte_stream):
+        line_no += 1
+        try:
+            line = raw_line.decode("utf-8").strip()
+        except UnicodeDecodeError as e:
+            raise BulkParseError(f"Line {line_no}: upload is not valid UTF-8 ({e.reason} at byte {e.start})")
+        if not line:
+            continue
+        if fmt == "csv" and usecols is None:
+            header = [h.strip().strip('"') for h in line.split(",")]
+            missing = [col for col in MODEL_TRAINING_FEATURES if col not in header]
+            if missing:
+                raise BulkParseError(f"CSV header is missing required columns: {missing}")
+            usecols = [header.index(col) for col in MODEL_TRAINING_FEATURES]
+            start_line = line_no + 1
+            continue
+        buffered.append(line)
+        if len(buffered) >= chunk_rows:
+            yield _parse_csv_chunk(buffered, usecols, start_line) if fmt == "csv" else _parse_ndjson_chunk(buffered, start_line)
+            buffered = []
+            start_line = line_no + 1
+    if fmt == "csv" and usecols is None:
+        raise BulkParseError("CSV upload is empty (no header row).")
+    if buffered:
+        yield _parse_csv_chunk(buffered, usecols, start_line) if fmt == "csv" else _parse_ndjson_chunk(buffered, start_line)
+
+
+def format_prediction_chunk(predictions, first_row: int, fmt: str) -> str:
+    predictions = np.asarray(predictions).astype(int)
+    rows = range(first_row, first_row + len(predictions))
+    if fmt == "csv":
+        return "".join(f"{i},{p}\n" for i, p in zip(rows, predictions.tolist()))
+    return "".join(f'{{"row": {i}, "prediction": {p}}}\n' for i, p in zip(rows, predictions.tolist()))
+
+
+def format_summary(summary: dict, fmt: str) -> str:
+    if fmt == "csv":
+        return "# " + " ".join(f"{k}={v}" for k, v in summary.items()) + "\n"
+    return json.dumps({"summary": summary}) + "\n"
@@ -1,26 +1,51 @@
 # backend/api/endpoints.py
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Header, Request, Query
+from fastapi.responses import StreamingResponse, Response, JSONResponse
 # Import your Pydantic schemas from the schemas.py file
 from backend.api.schemas import Features, Prediction, SingleFeatureInput, MetricsResponse, ClientMetric, GlobalMetric # Make sure to import all used schemas
 
 # Assuming backend.db.connection and backend.model.fetch are correctly set up
-from backend.db.connection import get_db_connection
-from backend.model.fetch import fetch_global_model
-import pandas as pd
+from backend.db.connection import db_cursor
+from backend.db.metrics import (query_metrics, records_to_columns, CLIENT_METRIC_COLUMNS,
+                                GLOBAL_METRIC_COLUMNS, METRICS_MAX_PAGE_SIZE)
+from backend.model.registry import ModelRegistry
+from backend.model.orchestrator import get_round_summary
+from backend.model.prediction_cache import PredictionCache, PREDICTION_CACHE_ENABLED
+from backend.model.features import RAW_INPUT_COLUMNS, MODEL_TRAINING_FEATURES, features_to_array
+from backend.api.batcher import MicroBatcher, MICROBATCH_ENABLED
+from backend.api.workloads import ADMIN, METRICS, PREDICTION, WORKLOADS, WorkloadBusy
+from backend.telemetry import (debug_sampled, observe_stage, stage_timer, time_db, track_model_version,
+                               render_latest, PREDICTION_ROWS, DEBUG_SAMPLE_RATE)
+from backend.api.bulk import (BulkParseError, iter_feature_chunks, iter_spool, spool_upload, bulk_format_from_content_type,
+                              format_prediction_chunk, format_summary,
+                              BULK_DEFAULT_CHUNK_ROWS, BULK_MAX_CHUNK_ROWS)
+import asyncio
 import numpy as np
-from typing import List
+from functools import partial
+from typing import List, Optional
+import os
 import sys
+import time
 
 router = APIRouter()
 
-# --- Model Loading ---
-try:
-    # Ensure this model ID and version correctly point to a model trained ONLY on raw features
-    model = fetch_global_model(model_id=1, version=3) # Confirmed version 3 is the one in use
+# --- Model Registry (hot-reloadable global model) ---
+# NERONODE_MODEL_VERSION pins the served version ("latest" follows new versions
+# as they land in central_updates). Admins can re-pin or roll back at runtime
+# through the /admin/model endpoints below, without restarting workers.
+MODEL_ID = int(os.getenv("NERONODE_MODEL_ID", "1"))
+_pinned_env = os.getenv("NERONODE_MODEL_VERSION", "3")  # Confirmed version 3 is the one in use
+PINNED_VERSION = None if _pinned_env.lower() == "latest" else int(_pinned_env)
+MODEL_POLL_INTERVAL = float(os.getenv("NERONODE_MODEL_POLL_SECONDS", "30"))
 
+ADMIN_TOKEN = os.getenv("NERONODE_ADMIN_TOKEN")
+
+registry = ModelRegistry(model_id=MODEL_ID, pinned_version=PINNED_VERSION, poll_interval=MODEL_POLL_INTERVAL)
+
+
+def _log_expected_features(model):
     # --- DEBUGGING START: Inspect the loaded model's expected features ---
-    # This block will now likely confirm only the 21 raw features are expected.
     print("\n--- DEBUG: Inspecting Loaded Model's Expected Feature Names ---", file=sys.stderr)
     expected_features_from_model = None
     try:
@@ -49,124 +74,408 @@ try:
     print("----------------------------------------------------------\n", file=sys.stderr)
     # --- DEBUGGING END: Inspect the loaded model's expected features ---
 
-except Exception as e:
-    raise RuntimeError(f"Error loading global model from DB: {e}")
 
-# --- Define the raw input columns, matching the order in SingleFeatureInput ---
-RAW_INPUT_COLUMNS = [
-    "HighBP", "HighChol", "CholCheck", "BMI", "Smoker", "Stroke",
-    "HeartDiseaseorAttack", "PhysActivity", "Fruits", "Veggies",
-    "HvyAlcoholConsump", "AnyHealthcare", "NoDocbcCost", "GenHlth",
-    "MentHlth", "PhysHlth", "DiffWalk", "Sex", "Age", "Education", "Income"
-]
+# --- Startup lifecycle ---
+# Nothing touches the DB at import time. backend.main's lifespan calls
+# start_model_loading(), which loads the model in the background (retrying while
+# the DB is unreachable) and then pushes synthetic rows through the prediction
+# path. /health answers immediately; /ready turns 200 only after that warm-up.
+WARMUP_ROWS = int(os.getenv("NERONODE_WARMUP_ROWS", "16"))
+MODEL_LOAD_RETRY_MAX_SECONDS = float(os.getenv("NERONODE_MODEL_LOAD_RETRY_MAX_SECONDS", "30"))
+
+_PROCESS_STARTED_AT = time.time()
+startup_state = {
+    "ready": False,
+    "attempts": 0,
+    "load_seconds": None,
+    "warmup_seconds": None,
+    "ready_at": None,
+    "last_error": None,
+}
+_loader_task = None
+
+
+def _synthetic_rows(n_rows: int) -> list:
+    # Small integer codes like real BRFSS answers, so every feature path sees non-trivial values.
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 6, size=(n_rows, len(RAW_INPUT_COLUMNS))).astype(float)
+    return [SingleFeatureInput(**dict(zip(RAW_INPUT_COLUMNS, row))) for row in values.tolist()]
+
+
+def _warm_up(serving) -> float:
+    # Same frame build + predict as a real request; bypasses the prediction cache so nothing synthetic is stored.
+    start = time.perf_counter()
+    X = features_to_array(_synthetic_rows(WARMUP_ROWS), MODEL_TRAINING_FEATURES)
+    serving.model.predict(X)
+    return time.perf_counter() - start
+
+
+async def _load_model():
+    delay = 1.0
+    while True:
+        startup_state["attempts"] += 1
+        try:
+            start = time.perf_counter()
+            # Fetch + compile on the admin workload, off the event loop.
+            serving = await ADMIN.run(registry.refresh)
+            startup_state["load_seconds"] = time.perf_counter() - start
+            startup_state["warmup_seconds"] = await PREDICTION.run(_warm_up, serving)
+            break
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            startup_state["last_error"] = str(e)
+            print(f"Startup: loading global model failed (attempt {startup_state['attempts']}): {e}; "
+                  f"retrying in {delay:.0f}s", file=sys.stderr)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, MODEL_LOAD_RETRY_MAX_SECONDS)
+
+    if DEBUG_SAMPLE_RATE > 0:
+        _log_expected_features(serving.model)
+    registry.start()
+    track_model_version(lambda: registry.current().version if registry.current() else None)
+    startup_state.update(ready=True, ready_at=time.time(), last_error=None)
+    print(f"Startup: serving model {serving.model_id} v{serving.version} "
+          f"(load {startup_state['load_seconds']:.3f}s, warm-up {startup_state['warmup_seconds'] * 1000:.1f}ms)",
+          file=sys.stderr)
+
+
+def start_model_loading():
+    global _loader_task
+    if _loader_task is None or _loader_task.done():
+        _loader_task = asyncio.get_running_loop().create_task(_load_model())
+    return _loader_task
+
+
+async def shutdown():
+    if _loader_task is not None and not _loader_task.done():
+        _loader_task.cancel()
+        try:
+            await _loader_task
+        except asyncio.CancelledError:
+            pass
+    registry.stop()
+    for workload in WORKLOADS.values():
+        workload.shutdown()
+
+
+def _require_admin(token):
+    if ADMIN_TOKEN and token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin token required.")
+
+
+# --- Blocking work runs on per-workload executors (backend.api.workloads) ---
+# Prediction, metrics and admin/model-fetch calls each get their own bounded
+# thread pool and admission limit instead of sharing Starlette's threadpool.
+async def _run_blocking(workload, fn, *args, **kwargs):
+    try:
+        return await workload.run(fn, *args, **kwargs)
+    except WorkloadBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
 
-# --- Define the FINAL list of features that the model was trained ON ---
-# <<< IMPORTANT CHANGE HERE: ONLY RAW FEATURES >>>
-MODEL_TRAINING_FEATURES = [
-    "HighBP", "HighChol", "CholCheck", "BMI", "Smoker", "Stroke",
-    "HeartDiseaseorAttack", "PhysActivity", "Fruits", "Veggies",
-    "HvyAlcoholConsump", "AnyHealthcare", "NoDocbcCost", "GenHlth",
-    "MentHlth", "PhysHlth", "DiffWalk", "Sex", "Age", "Education", "Income"
-]
-# Total expected features for the model = 21 (raw features).
+
+# --- Feature layout shared with the rest of the backend ---
+# RAW_INPUT_COLUMNS / MODEL_TRAINING_FEATURES live in backend.model.features; they are
+# re-exported here so existing imports from this module keep working.
+
+
+# --- Prediction memoization (NERONODE_PREDICTION_CACHE=0 disables) ---
+prediction_cache = PredictionCache() if PREDICTION_CACHE_ENABLED else None
+
+
+def _predict_batch(X: np.ndarray) -> np.ndarray:
+    # One registry snapshot per batch, so a concurrent swap never splits a batch across versions.
+    serving = registry.current()
+    if prediction_cache is None:
+        return serving.model.predict(X)
+    # Keyed by the serving (model_id, version): a swap invalidates the cache.
+    return prediction_cache.predict((serving.model_id, serving.version), X, serving.model.predict)
+
+
+# --- Optional request-coalescing micro-batcher (NERONODE_MICROBATCH=1) ---
+# Batches are admitted by the prediction workload like any other predict call;
+# a saturated workload fails the whole batch with the same 503.
+batcher = MicroBatcher(_predict_batch, run=partial(_run_blocking, PREDICTION)) if MICROBATCH_ENABLED else None
 
 
 # --- Prediction Endpoint ---
 @router.post("/", response_model=Prediction)
-def predict_diabetes(data: Features):
+async def predict_diabetes(data: Features, request: Request):
+    # Body parsing + pydantic validation ran between the middleware stamp and here.
+    received_at = getattr(request.state, "received_at", None)
+    if received_at is not None:
+        observe_stage("validation", time.perf_counter() - received_at)
+
     if not data.features:
         raise HTTPException(status_code=400, detail="No features provided for prediction.")
 
-    list_of_input_dicts = [item.model_dump() for item in data.features]
-
-    df_raw = pd.DataFrame(list_of_input_dicts)[RAW_INPUT_COLUMNS]
-
-    # <<< IMPORTANT CHANGE HERE: REMOVE FEATURE ENGINEERING >>>
-    # df_processed = df_raw.copy() # No need for df_processed if no new features are created
-    # df_processed["Age_BMI"] = df_processed["Age"] * df_processed["Age"] # Original typo was here!
-    # df_processed["BP_Chol"] = df_processed["HighBP"] + df_processed["HighChol"]
-    # df_processed["ChronicRiskScore"] = df_processed["Stroke"] + df_processed["HeartDiseaseorAttack"] + df_processed["DiffWalk"]
-    # df_processed["HealthCombo"] = df_processed["GenHlth"] + df_processed["PhysHlth"] + df_processed["MentHlth"]
-
-    # 3. CRUCIAL: Reindex the DataFrame to match the model's exact training features and order
+    # Pack every row straight into one contiguous (n_rows, 21) float matrix in
+    # MODEL_TRAINING_FEATURES order; no per-row dicts or intermediate DataFrame.
     try:
-        # Since no new features are created, df_raw is now the source of df_final_input
-        df_final_input = df_raw[MODEL_TRAINING_FEATURES] # This will select raw columns in the correct order
-    except KeyError as ke:
-        import traceback
-        print(f"--- Feature Missing/Mismatch Error Traceback ---\n{traceback.format_exc()}", file=sys.stderr)
-        missing_columns = set(MODEL_TRAINING_FEATURES) - set(df_raw.columns) # Changed df_processed to df_raw
-        extra_columns = set(df_raw.columns) - set(MODEL_TRAINING_FEATURES)   # Changed df_processed to df_raw
-        raise HTTPException(status_code=500,
-                            detail=f"Prediction error: Feature mismatch or incorrect order. "
-                                   f"Missing in input for model: {list(missing_columns)}. "
-                                   f"Extra in input from client: {list(extra_columns)}. "
-                                   f"DataFrame columns before reindexing: {df_raw.columns.tolist()}." # Changed df_processed to df_raw
-                                   f"Model expected columns (MODEL_TRAINING_FEATURES): {MODEL_TRAINING_FEATURES}. "
-                                   f"Check server logs for details.")
-    except Exception as e_reindex:
+        with stage_timer("frame_build"):
+            X = features_to_array(data.features, MODEL_TRAINING_FEATURES)
+    except Exception as e_pack:
         import traceback
-        print(f"--- Reindexing Error Traceback ---\n{traceback.format_exc()}", file=sys.stderr)
-        raise HTTPException(status_code=500, detail=f"Prediction error during reindexing: {e_reindex}. "
-                                                    f"DataFrame columns before reindexing: {df_raw.columns.tolist()}." # Changed df_processed to df_raw
+        print(f"--- Feature Packing Error Traceback ---\n{traceback.format_exc()}", file=sys.stderr)
+        raise HTTPException(status_code=500, detail=f"Prediction error while packing features: {e_pack}. "
                                                     f"Model expected columns (MODEL_TRAINING_FEATURES): {MODEL_TRAINING_FEATURES}. "
                                                     f"Check server logs for details.")
 
-    # --- DEBUGGING START: Print DataFrame columns being sent to model ---
-    print(f"\n--- DEBUG: DataFrame columns being sent to model ---", file=sys.stderr)
-    print(df_final_input.columns.tolist(), file=sys.stderr)
-    print(f"DEBUG: Total DataFrame columns: {len(df_final_input.columns.tolist())}", file=sys.stderr)
-    # Added the data row print back, as it's useful for debugging the model's actual output
-    print("DEBUG: Data row being sent to model:", file=sys.stderr)
-    print(df_final_input.iloc[0].to_dict(), file=sys.stderr)
-    print("-----------------------------------------------------\n", file=sys.stderr)
-    # --- DEBUGGING END ---
+    # --- DEBUGGING (opt-in, sampled via NERONODE_DEBUG_SAMPLE_RATE) ---
+    if debug_sampled():
+        print(f"\n--- DEBUG: Batch being sent to model ---", file=sys.stderr)
+        print(f"DEBUG: Batch shape: {X.shape} (columns: {len(MODEL_TRAINING_FEATURES)})", file=sys.stderr)
+        print("DEBUG: First data row being sent to model:", file=sys.stderr)
+        print(dict(zip(MODEL_TRAINING_FEATURES, X[0].tolist())), file=sys.stderr)
+        print("-----------------------------------------------------\n", file=sys.stderr)
 
-    try:
-        if model is None:
-            raise HTTPException(status_code=503, detail="Prediction service unavailable: Global model not loaded.")
+    if registry.current() is None:
+        raise HTTPException(status_code=503, detail="Prediction service unavailable: Global model not loaded.")
 
-        prediction = int(model.predict(df_final_input)[0])
-        return {"prediction": prediction}
+    try:
+        # One predict call for the whole batch; with the micro-batcher enabled,
+        # concurrent requests are coalesced into a shared call.
+        with stage_timer("inference"):
+            if batcher is not None:
+                raw_predictions = await batcher.submit(X)
+            else:
+                raw_predictions = await _run_blocking(PREDICTION, _predict_batch, X)
+        PREDICTION_ROWS.labels("predict").inc(X.shape[0])
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         print(f"--- Prediction Error Traceback ---\n{traceback.format_exc()}", file=sys.stderr)
         raise HTTPException(status_code=500,
                             detail=f"Prediction error: {e}. "
-                                   f"Final DataFrame columns sent: {df_final_input.columns.tolist()}. "
+                                   f"Batch shape sent: {X.shape}, columns: {MODEL_TRAINING_FEATURES}. "
                                    f"Check server logs for full traceback.")
 
+    with stage_timer("serialization"):
+        predictions = np.asarray(raw_predictions).astype(int).tolist()
+        body = Prediction(prediction=predictions[0], predictions=predictions).model_dump_json()
+    return Response(content=body, media_type="application/json")
 
-# --- Metrics Endpoint (No changes needed here for this issue) ---
-@router.get("/metrics/", response_model=MetricsResponse)
-def get_metrics():
+
+# --- Streaming Bulk Scoring Endpoint ---
+@router.post("/bulk/")
+async def predict_bulk(request: Request,
+                       format: Optional[str] = Query(default=None, pattern="^(csv|ndjson)$"),
+                       chunk_rows: int = Query(default=BULK_DEFAULT_CHUNK_ROWS, ge=1, le=BULK_MAX_CHUNK_ROWS)):
+    """Score a CSV (with header) or NDJSON upload chunk by chunk and stream predictions back."""
+    fmt = format or bulk_format_from_content_type(request.headers.get("content-type"))
+    serving = registry.current()
+    if serving is None:
+        raise HTTPException(status_code=503, detail="Prediction service unavailable: Global model not loaded.")
+
+    # Buffer the whole upload before responding (see spool_upload); scoring still runs chunk by chunk.
+    spool = await spool_upload(request.stream())
+    chunks = iter_feature_chunks(iter_spool(spool), fmt=fmt, chunk_rows=chunk_rows)
+    # Parse the first chunk up front so header/format errors still get a 400.
+    try:
+        first_chunk = await chunks.__anext__()
+    except StopAsyncIteration:
+        first_chunk = None
+    except BulkParseError as e:
+        spool.close()
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def stream_predictions():
+        start = time.perf_counter()
+        rows = 0
+        chunk = first_chunk
+        try:
+            while chunk is not None:
+                predictions = await PREDICTION.run(serving.model.predict, chunk)
+                PREDICTION_ROWS.labels("bulk").inc(chunk.shape[0])
+                yield format_prediction_chunk(predictions, rows, fmt)
+                rows += chunk.shape[0]
+                try:
+                    chunk = await chunks.__anext__()
+                except StopAsyncIteration:
+                    chunk = None
+        except Exception as e:
+            print(f"Bulk scoring failed after {rows} rows: {e}", file=sys.stderr)
+            yield format_summary({"error": str(e), "rows": rows}, fmt)
+            return
+        finally:
+            spool.close()
+        elapsed = time.perf_counter() - start
+        yield format_summary({
+            "rows": rows,
+            "seconds": round(elapsed, 4),
+            "rows_per_sec": round(rows / elapsed, 1) if elapsed > 0 else None,
+            "model_version": serving.version,
+        }, fmt)
+
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    return StreamingResponse(stream_predictions(), media_type=media_type)
+
+
+# --- Liveness / Readiness Endpoints ---
+def _startup_status() -> dict:
+    serving = registry.current()
+    ready_at = startup_state["ready_at"]
+    return {
+        "status": "ok",
+        "ready": startup_state["ready"],
+        "model_id": registry.model_id,
+        "model_version": serving.version if serving else None,
+        "load_seconds": startup_state["load_seconds"],
+        "warmup_seconds": startup_state["warmup_seconds"],
+        "ready_after_seconds": ready_at - _PROCESS_STARTED_AT if ready_at else None,
+        "uptime_seconds": time.time() - _PROCESS_STARTED_AT,
+        "load_attempts": startup_state["attempts"],
+        "last_error": startup_state["last_error"],
+    }
+
+
+@router.get("/health")
+async def health():
+    """Liveness: the process is up and serving HTTP, whether or not the model has loaded yet."""
+    return _startup_status()
+
+
+@router.get("/ready")
+async def ready():
+    """Readiness: 200 once the model is loaded and warmed, 503 before that."""
+    body = _startup_status()
+    if not body["ready"]:
+        body["status"] = "loading"
+        return JSONResponse(body, status_code=503)
+    return body
+
+
+# --- Prometheus Scrape Endpoint ---
+@router.get("/prometheus")
+async def get_prometheus_metrics():
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
+
+# --- Micro-batcher Stats Endpoint ---
+@router.get("/batcher/stats")
+async def get_batcher_stats():
+    if batcher is None:
+        return {"enabled": False}
+    return batcher.stats()
+
+
+# --- Prediction Cache Stats Endpoint ---
+@router.get("/cache/stats")
+async def get_prediction_cache_stats():
+    if prediction_cache is None:
+        return {"enabled": False}
+    return prediction_cache.stats()
+
+
+# --- Workload Executor Stats Endpoint ---
+@router.get("/workloads/stats")
+async def get_workload_stats():
+    return {name: workload.stats() for name, workload in WORKLOADS.items()}
+
+
+# --- Federation Round Endpoint ---
+@router.get("/rounds/current")
+async def get_round_status(model_id: int = MODEL_ID):
+    """The federation round clients should train for (opened by backend.model.orchestrator),
+    with its duration once closed and the seconds after open at which each client reported."""
     try:
-        conn = get_db_connection()
-        cursor = conn.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT client_id, round_num AS iteration, model_name, fit_status,
-                   accuracy, loss, macro_f1, recall_minority,
-                   f1_minority, f1_majority
-            FROM client_updates
-            ORDER BY iteration
-        """)
-        records = cursor.fetchall()
-        df = pd.DataFrame(records)
-
-        if df.empty:
-            return {"global_metrics": [], "client_metrics": []}
-
-        metric_columns = ['accuracy', 'loss', 'macro_f1', 'recall_minority', 'f1_minority', 'f1_majority']
-
-        global_metrics = df.groupby("iteration")[metric_columns].mean().reset_index()
-        client_metrics = df.copy()
-
-        return {
-            "global_metrics": global_metrics.to_dict(orient="records"),
-            "client_metrics": client_metrics.to_dict(orient="records")
-        }
+        current = await _run_blocking(METRICS, get_round_summary, model_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error fetching round status: {e}", file=sys.stderr)
+        raise HTTPException(status_code=500, detail=f"Error fetching round status: {e}")
+    if current is None:
+        raise HTTPException(status_code=404, detail=f"No federation round recorded for model {model_id}")
+    return {key: value.isoformat() if hasattr(value, "isoformat") else value for key, value in current.items()}
+
 
+# --- Model Admin Endpoints ---
+@router.get("/admin/model")
+async def get_model_status():
+    return registry.status()
+
+
+@router.post("/admin/model/pin/{version}")
+async def pin_model_version(version: int, x_admin_token: Optional[str] = Header(default=None)):
+    _require_admin(x_admin_token)
+    try:
+        await _run_blocking(ADMIN, registry.pin, version)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error loading model version {version}: {e}")
+    return registry.status()
+
+
+@router.post("/admin/model/unpin")
+async def unpin_model_version(x_admin_token: Optional[str] = Header(default=None)):
+    _require_admin(x_admin_token)
+    try:
+        await _run_blocking(ADMIN, registry.unpin)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error loading latest model version: {e}")
+    return registry.status()
+
+
+@router.post("/admin/model/rollback")
+async def rollback_model_version(x_admin_token: Optional[str] = Header(default=None)):
+    _require_admin(x_admin_token)
+    try:
+        await _run_blocking(ADMIN, registry.rollback)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error rolling back model: {e}")
+    return registry.status()
+
+
+# --- Metrics Endpoint ---
+def _query_metrics_page(**filters):
+    # Aggregation happens in SQL; rows are shaped straight from cursor tuples.
+    with time_db("metrics_query"), db_cursor() as db:
+        return query_metrics(db, **filters)
+
+
+@router.get("/metrics/", response_model=MetricsResponse)
+async def get_metrics(client_id: Optional[str] = None,
+                      model_name: Optional[str] = None,
+                      iteration_min: Optional[int] = None,
+                      iteration_max: Optional[int] = None,
+                      cursor: Optional[str] = Query(default=None, description="next_cursor from the previous page"),
+                      limit: Optional[int] = Query(default=None, ge=1, le=METRICS_MAX_PAGE_SIZE),
+                      fields: Optional[str] = Query(default=None, description="Comma-separated client metric fields"),
+                      include_global: bool = True,
+                      format: str = Query(default="records", pattern="^(records|columnar)$")):
+    selected_fields = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+    try:
+        payload = await _run_blocking(METRICS, _query_metrics_page, client_id=client_id, model_name=model_name,
+                                      iteration_min=iteration_min, iteration_max=iteration_max,
+                                      fields=selected_fields, after=cursor, limit=limit,
+                                      include_global=include_global)
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         import traceback
         print(f"Error fetching metrics in FastAPI: {e}\n{traceback.format_exc()}", file=sys.stderr)
-        raise HTTPException(status_code=500, detail=f"Error fetching metrics: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error fetching metrics: {e}")
+
+    if format == "columnar":
+        payload["global_metrics"] = records_to_columns(payload["global_metrics"], GLOBAL_METRIC_COLUMNS)
+        payload["client_metrics"] = records_to_columns(payload["client_metrics"],
+                                                       selected_fields or CLIENT_METRIC_COLUMNS)
+        return JSONResponse(payload)
+    if selected_fields:
+        # Partial records don't fit ClientMetric; skip response_model validation.
+        return JSONResponse(payload)
+    return payload
@@ -1,7 +1,7 @@
 # backend/api/schemas.py - CORRECTED BMI TYPE
 
 from pydantic import BaseModel, Field
-from typing import List
+from typing import List, Optional
 
 class SingleFeatureInput(BaseModel):
     HighBP: int
@@ -30,7 +30,8 @@ class Features(BaseModel):
     features: List[SingleFeatureInput]
 
 class Prediction(BaseModel):
-    prediction: int
+    prediction: int  # first row's prediction, kept for single-row clients (dashboard)
+    predictions: List[int] = Field(default_factory=list)  # one prediction per input row, in order
 
 
 
@@ -58,4 +59,5 @@ class GlobalMetric(BaseModel):
 
 class MetricsResponse(BaseModel):
     global_metrics: List[GlobalMetric]
-    client_metrics: List[ClientMetric]
\ No newline at end of file
+    client_metrics: List[ClientMetric]
+    next_cursor: Optional[str] = None  # pass back as ?cursor= to fetch the next page of client_metrics
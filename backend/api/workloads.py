@@ -0,0 +1,110 @@
+# backend/api/workloads.py
+
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from backend.telemetry import WORKLOAD_IN_FLIGHT, WORKLOAD_QUEUE_WAIT, WORKLOAD_REJECTED
+
+
+class WorkloadBusy(Exception):
+    pass
+
+
+class Workload:
+    """A dedicated, bounded thread pool plus an admission limit for one class of blocking work.
+
+    Handlers stay `async` and hand their blocking call (model inference, MySQL
+    queries, model fetches) to `run`, so nothing occupies Starlette's shared
+    threadpool. At most `max_concurrency` calls are admitted at once (running
+    on `max_workers` threads or queued behind them); further callers wait up
+    to `queue_timeout` seconds and then get WorkloadBusy. A flood of slow
+    metrics queries therefore saturates only the metrics workload, and
+    prediction latency is unaffected.
+
+    The thread pool is created on first use and again after `shutdown`, so the
+    module-level workloads survive an app lifespan ending and a new one starting.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_concurrency: int = None, queue_timeout: float = 5.0):
+        self.name = name
+        self.max_workers = max(1, int(max_workers))
+        self.max_concurrency = max(self.max_workers, int(max_concurrency or self.max_workers * 2))
+        self.queue_timeout = queue_timeout
+        self.executor = None
+        self._semaphore = None
+        self._loop = None
+
+        # --- Stats ---
+        self.in_flight = 0
+        self.completed_total = 0
+        self.rejected_total = 0
+
+    def _ensure_executor(self) -> ThreadPoolExecutor:
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                               thread_name_prefix=f"neronode-{self.name}")
+        return self.executor
+
+    def _ensure_semaphore(self):
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._semaphore
+
+    async def run(self, fn, *args, **kwargs):
+        semaphore = self._ensure_semaphore()
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected_total += 1
+            WORKLOAD_REJECTED.labels(self.name).inc()
+            raise WorkloadBusy(f"{self.name} workload saturated ({self.max_concurrency} calls in flight)")
+        WORKLOAD_QUEUE_WAIT.labels(self.name).observe(time.perf_counter() - start)
+        self.in_flight += 1
+        WORKLOAD_IN_FLIGHT.labels(self.name).inc()
+        try:
+            return await self._loop.run_in_executor(self._ensure_executor(), partial(fn, *args, **kwargs))
+        finally:
+            self.in_flight -= 1
+            self.completed_total += 1
+            WORKLOAD_IN_FLIGHT.labels(self.name).dec()
+            semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_workers": self.max_workers,
+            "max_concurrency": self.max_concurrency,
+            "queue_timeout": self.queue_timeout,
+            "in_flight": self.in_flight,
+            "completed_total": self.completed_total,
+            "rejected_total": self.rejected_total,
+        }
+
+    def shutdown(self):
+        executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _workload_from_env(name: str, default_workers: int, default_timeout: float) -> Workload:
+    prefix = f"NERONODE_{name.upper()}"
+    workers = int(os.getenv(f"{prefix}_WORKERS", str(default_workers)))
+    concurrency = os.getenv(f"{prefix}_CONCURRENCY")
+    return Workload(name, workers, int(concurrency) if concurrency else None,
+                    float(os.getenv(f"{prefix}_QUEUE_TIMEOUT", str(default_timeout))))
+
+
+# --- Per-workload executors (environment overrides) ---
+# Metrics and admin workers hold pooled DB connections while they run, so their
+# defaults stay below the pool size (config.yaml db.pool_size, 8) and leave
+# connections free for model polling.
+PREDICTION = _workload_from_env("predict", min(32, (os.cpu_count() or 1) + 4), 2.0)
+METRICS = _workload_from_env("metrics", 4, 5.0)
+ADMIN = _workload_from_env("admin", 2, 30.0)
+
+WORKLOADS = {"predict": PREDICTION, "metrics": METRICS, "admin": ADMIN}
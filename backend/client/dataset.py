@@ -0,0 +1,166 @@
+# backend/client/dataset.py
+#
+# Columnar on-disk cache for client training CSVs.
+#
+#   python -m backend.client.dataset client_dataset/client_1_binary.csv [...]
+#
+# The first open of a CSV converts it into <cache_dir>/<name>-<key>/: one .npy
+# file per column, stored in the narrowest dtype that holds the column exactly
+# (uint8/int8/... for the 0/1 flags and ordinal codes, float32 otherwise), plus
+# schema.json. Later opens memory-map the column files, so nothing is parsed and
+# only the columns actually touched are paged in. The cache is rebuilt when the
+# source file's size or mtime changes.
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from backend.model.features import RAW_INPUT_COLUMNS
+
+DATASET_CACHE_DIR = os.getenv("NERONODE_DATASET_CACHE_DIR", "backend/client/cache/datasets")
+TARGET_COLUMN = "Diabetes_binary"
+SCHEMA_VERSION = 1
+
+_INTEGER_DTYPES = (np.uint8, np.int8, np.uint16, np.int16, np.int32)
+
+
+class SchemaError(ValueError):
+    pass
+
+
+def _narrowest_dtype(values: np.ndarray):
+    if values.size == 0:
+        return np.dtype(np.uint8)
+    if np.isnan(values).any() or not np.array_equal(values, np.round(values)):
+        return np.dtype(np.float32)
+    lo, hi = values.min(), values.max()
+    for dtype in _INTEGER_DTYPES:
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.float32)
+
+
+def _source_fingerprint(csv_path: str) -> dict:
+    stat = os.stat(csv_path)
+    return {"path": os.path.abspath(csv_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def dataset_dir(csv_path: str, cache_dir: str = DATASET_CACHE_DIR) -> str:
+    stem = os.path.splitext(os.path.basename(csv_path))[0]
+    key = hashlib.sha256(os.path.abspath(csv_path).encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f"{stem}-{key}")
+
+
+def check_schema(columns, required=RAW_INPUT_COLUMNS, target: str = TARGET_COLUMN):
+    missing = [name for name in list(required) + [target] if name not in columns]
+    if missing:
+        raise SchemaError(f"Dataset is missing required columns: {missing}")
+
+
+def convert_csv(csv_path: str, out_dir: str) -> dict:
+    """Convert `csv_path` into a columnar cache at `out_dir`; returns the schema."""
+    # Every column in these datasets is numeric; float32 parsing keeps the
+    # one-off conversion's peak memory at half of pandas' float64 default.
+    data = pd.read_csv(csv_path, dtype=np.float32)
+    check_schema(data.columns)
+
+    parent = os.path.dirname(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=parent, prefix=".dataset-")
+    columns = []
+    for name in data.columns:
+        values = data[name].to_numpy()
+        dtype = _narrowest_dtype(values)
+        np.save(os.path.join(tmp_dir, f"{len(columns):03d}.npy"), values.astype(dtype, copy=False))
+        columns.append({"name": name, "dtype": dtype.name, "file": f"{len(columns):03d}.npy"})
+
+    schema = {"version": SCHEMA_VERSION, "rows": len(data), "columns": columns, "source": _source_fingerprint(csv_path)}
+    with open(os.path.join(tmp_dir, "schema.json"), "w") as f:
+        json.dump(schema, f, indent=2)
+
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.replace(tmp_dir, out_dir)
+    return schema
+
+
+class ColumnarDataset:
+    """Memory-mapped view of a converted dataset."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "schema.json")) as f:
+            self.schema = json.load(f)
+        self.columns = [column["name"] for column in self.schema["columns"]]
+        self._files = {column["name"]: column["file"] for column in self.schema["columns"]}
+        self._arrays = {}
+        check_schema(self.columns)
+
+    def __len__(self):
+        return self.schema["rows"]
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name not in self._arrays:
+            self._arrays[name] = np.load(os.path.join(self.path, self._files[name]), mmap_mode="r")
+        return self._arrays[name]
+
+    def dtypes(self) -> dict:
+        return {column["name"]: column["dtype"] for column in self.schema["columns"]}
+
+    def features(self, columns=RAW_INPUT_COLUMNS, dtype=np.float32) -> np.ndarray:
+        """Stack `columns` into one contiguous (rows, len(columns)) matrix in model column order."""
+        X = np.empty((len(self), len(columns)), dtype=dtype)
+        for j, name in enumerate(columns):
+            X[:, j] = self[name]
+        return X
+
+    def target(self) -> np.ndarray:
+        return self[TARGET_COLUMN]
+
+
+def _is_current(path: str, csv_path: str) -> bool:
+    try:
+        with open(os.path.join(path, "schema.json")) as f:
+            schema = json.load(f)
+    except (OSError, ValueError):
+        return False
+    source, current = schema.get("source", {}), _source_fingerprint(csv_path)
+    return (schema.get("version") == SCHEMA_VERSION
+            and source.get("size") == current["size"] and source.get("mtime_ns") == current["mtime_ns"])
+
+
+def open_dataset(csv_path: str, cache_dir: str = DATASET_CACHE_DIR) -> ColumnarDataset:
+    """Open the columnar cache for `csv_path`, converting the CSV first if the cache is missing or stale."""
+    path = dataset_dir(csv_path, cache_dir)
+    if not _is_current(path, csv_path):
+        convert_csv(csv_path, path)
+    return ColumnarDataset(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert client CSVs into the columnar dataset cache")
+    parser.add_argument("csv", nargs="+")
+    parser.add_argument("--cache-dir", default=DATASET_CACHE_DIR)
+    args = parser.parse_args()
+
+    for csv_path in args.csv:
+        started = time.perf_counter()
+        path = dataset_dir(csv_path, args.cache_dir)
+        schema = convert_csv(csv_path, path)
+        size = sum(os.path.getsize(os.path.join(path, column["file"])) for column in schema["columns"])
+        print(f"{csv_path}: {schema['rows']} rows, {len(schema['columns'])} columns -> {path} "
+              f"({size / 1e6:.1f} MB, was {os.path.getsize(csv_path) / 1e6:.1f} MB CSV) "
+              f"in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
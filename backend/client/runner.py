@@ -0,0 +1,293 @@
+# backend/client/runner.py
+#
+# Client-side training round, replacing the copy-pasted client_files/clientN.ipynb flow:
+#
+#   python -m backend.client.runner --client-id 1 --data client_dataset/client_1_binary.csv
+#
+# 1. Load the client CSV through the columnar cache (backend.client.dataset),
+#    split it once and cache the split as .npy files; trials (and later runs on
+#    the same file) memory-map it instead of re-reading the CSV.
+# 2. Tune LogisticRegression with Optuna. Trials run in parallel worker
+#    processes sharing one journal-file study. Each trial is scored fold by fold
+#    and hopeless ones are pruned after the first folds (MedianPruner).
+# 3. Refit the best parameters on the full training split, evaluate on the test
+#    split and upload through backend.model.upload.
+#
+# Optuna is only needed here, not by the server: pip install optuna
+
+import argparse
+import hashlib
+import math
+import os
+import sys
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import StratifiedKFold, train_test_split
+
+from backend.client.dataset import open_dataset
+from backend.model.evaluation import evaluate
+from backend.model.features import MODEL_TRAINING_FEATURES
+
+SPLIT_CACHE_DIR = os.getenv("NERONODE_SPLIT_CACHE_DIR", "backend/client/cache")
+
+# Only valid (solver, penalty) pairs are offered, so no trial is spent on a combination sklearn rejects.
+SOLVER_PENALTIES = ["liblinear:l1", "liblinear:l2", "saga:l1", "saga:l2", "lbfgs:l2", "newton-cg:l2"]
+
+
+def _import_optuna():
+    try:
+        import optuna
+    except ImportError as e:
+        raise ImportError("The client runner needs optuna for hyperparameter search: pip install optuna") from e
+    return optuna
+
+
+# --- Train/test split cache ---
+def _split_key(path: str, test_size: float, seed: int) -> str:
+    stat = os.stat(path)
+    raw = f"{os.path.abspath(path)}|{stat.st_size}|{stat.st_mtime_ns}|{test_size}|{seed}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:16]
+
+
+def _load_frame(path: str):
+    dataset = open_dataset(path)
+    # Features are small integer codes, exact in float32, which halves the cached split on disk.
+    # That is a storage saving only: some solvers (lbfgs, newton-cg) still upcast to float64 on each fit.
+    X = dataset.features(MODEL_TRAINING_FEATURES, dtype=np.float32)
+    # Labels keep the CSV's 0.0/1.0 values, which the upload metrics are keyed on.
+    y = dataset.target().astype(np.float64)
+    return X, y
+
+
+def cached_split(path: str, test_size: float = 0.2, seed: int = 42, cache_dir: str = SPLIT_CACHE_DIR):
+    """Return the split directory for `path`, building it on first use."""
+    split_dir = os.path.join(cache_dir, f"split-{_split_key(path, test_size, seed)}")
+    if os.path.exists(os.path.join(split_dir, "y_test.npy")):
+        return split_dir
+
+    X, y = _load_frame(path)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=seed)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(dir=cache_dir, prefix=".split-")
+    for name, array in (("X_train", X_train), ("X_test", X_test), ("y_train", y_train), ("y_test", y_test)):
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(array))
+    try:
+        os.replace(tmp_dir, split_dir)
+    except OSError:
+        # Another process built the same split concurrently; keep theirs.
+        for name in os.listdir(tmp_dir):
+            os.remove(os.path.join(tmp_dir, name))
+        os.rmdir(tmp_dir)
+    return split_dir
+
+
+def load_split(split_dir: str):
+    """(X_train, X_test, y_train, y_test), memory-mapped read-only."""
+    return tuple(np.load(os.path.join(split_dir, f"{name}.npy"), mmap_mode="r")
+                 for name in ("X_train", "X_test", "y_train", "y_test"))
+
+
+# --- Search ---
+def minority_score(y_true, y_pred, minority, labels) -> float:
+    """recall + 0.5 * F1 of the minority class (the notebooks' tuning objective)."""
+    metrics = evaluate(y_true, y_pred, labels=labels)
+    return metrics["recall"][minority] + 0.5 * metrics["f1"][minority]
+
+
+def build_model(params: dict) -> LogisticRegression:
+    solver, penalty = params["solver_penalty"].split(":")
+    return LogisticRegression(solver=solver, penalty=penalty, C=params["C"], max_iter=params["max_iter"],
+                              class_weight=params["class_weight"], random_state=42)
+
+
+def _make_objective(optuna, X_train, y_train, folds: int, seed: int):
+    classes, counts = np.unique(y_train, return_counts=True)
+    minority = classes[np.argmin(counts)].item()
+    splits = list(StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed).split(X_train, y_train))
+
+    def objective(trial):
+        params = {
+            "solver_penalty": trial.suggest_categorical("solver_penalty", SOLVER_PENALTIES),
+            "C": trial.suggest_float("C", 1e-3, 10, log=True),
+            "max_iter": trial.suggest_int("max_iter", 100, 300),
+            "class_weight": trial.suggest_categorical("class_weight", [None, "balanced"]),
+        }
+        scores = []
+        for step, (fit_idx, val_idx) in enumerate(splits):
+            model = build_model(params).fit(X_train[fit_idx], y_train[fit_idx])
+            scores.append(minority_score(y_train[val_idx], model.predict(X_train[val_idx]), minority, classes))
+            trial.report(float(np.mean(scores)), step)
+            if trial.should_prune():
+                raise optuna.TrialPruned()
+        return float(np.mean(scores))
+
+    return objective
+
+
+def _create_study(optuna, storage, study_name: str, seed: int):
+    return optuna.create_study(
+        study_name=study_name, storage=storage, direction="maximize", load_if_exists=True,
+        sampler=optuna.samplers.TPESampler(seed=seed),
+        pruner=optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=0),
+    )
+
+
+def _journal_storage(optuna, path: str):
+    try:
+        from optuna.storages.journal import JournalFileBackend
+    except ImportError:  # optuna < 4.0
+        from optuna.storages import JournalFileStorage as JournalFileBackend
+    return optuna.storages.JournalStorage(JournalFileBackend(path))
+
+
+def _run_trials(journal_path: str, study_name: str, split_dir: str, n_trials: int, folds: int, seed: int,
+                sampler_seed: int):
+    # Worker process: every worker maps the same split files and appends to the same study journal.
+    # All workers score on the same CV folds (`seed`) so the pruner and best trial compare like with
+    # like; only the sampler seed differs, so workers don't propose identical trials.
+    optuna = _import_optuna()
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    X_train, _, y_train, _ = load_split(split_dir)
+    study = _create_study(optuna, _journal_storage(optuna, journal_path), study_name, sampler_seed)
+    study.optimize(_make_objective(optuna, X_train, y_train, folds, seed), n_trials=n_trials)
+
+
+def tune(split_dir: str, n_trials: int = 50, workers: int = None, folds: int = 3, seed: int = 42):
+    """Run the hyperparameter search; returns (best_params, best_value, trial state counts)."""
+    optuna = _import_optuna()
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    workers = max(1, min(workers or os.cpu_count() or 1, n_trials))
+    if workers == 1:
+        X_train, _, y_train, _ = load_split(split_dir)
+        study = _create_study(optuna, None, None, seed)
+        study.optimize(_make_objective(optuna, X_train, y_train, folds, seed), n_trials=n_trials)
+        return _study_result(study)
+    else:
+        study_name = f"client-{uuid.uuid4().hex[:8]}"
+        journal_path = os.path.join(split_dir, f"{study_name}.journal")
+        per_worker = math.ceil(n_trials / workers)
+        # Create the study (and its journal file) before the workers attach to it.
+        _create_study(optuna, _journal_storage(optuna, journal_path), study_name, seed)
+        try:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(_run_trials, journal_path, study_name, split_dir,
+                                       min(per_worker, n_trials - i * per_worker), folds, seed, seed + i)
+                           for i in range(workers) if n_trials - i * per_worker > 0]
+                for future in futures:
+                    future.result()
+            study = optuna.load_study(study_name=study_name, storage=_journal_storage(optuna, journal_path))
+            return _study_result(study)
+        finally:
+            for path in (journal_path, journal_path + ".lock"):
+                if os.path.exists(path):
+                    os.remove(path)
+
+
+def _study_result(study):
+    states = {}
+    for trial in study.get_trials(deepcopy=False):
+        states[trial.state.name] = states.get(trial.state.name, 0) + 1
+    return study.best_params, study.best_value, states
+
+
+# --- Round ---
+def _current_round(model_id: int) -> int:
+    from backend.model.orchestrator import get_current_round
+    current = get_current_round(model_id)
+    if current is None or current["status"] != "open":
+        raise ValueError(f"No open federation round for model {model_id}; pass --round explicitly")
+    return int(current["round_num"])
+
+
+def run_client_round(client_id: str, data_path: str, model_id: int = 1, round_num: int = None,
+                     n_trials: int = 50, workers: int = None, folds: int = 3, test_size: float = 0.2,
+                     seed: int = 42, delta: bool = False, upload: bool = True, upload_queue=None) -> dict:
+    """One client round. With `upload_queue` (backend.model.upload_queue.UploadQueue) the update is spooled
+    and uploaded in the background instead of blocking on the central DB."""
+    timings = {}
+    started = time.perf_counter()
+    split_dir = cached_split(data_path, test_size, seed)
+    X_train, X_test, y_train, y_test = load_split(split_dir)
+    timings["split"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    best_params, best_value, states = tune(split_dir, n_trials, workers, folds, seed)
+    timings["search"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    model = build_model(best_params).fit(X_train, y_train)
+    y_pred = model.predict(X_test)
+    metrics = evaluate(y_test, y_pred, proba=model.predict_proba(X_test))
+    accuracy, loss = metrics["accuracy"], metrics["log_loss"]
+    timings["refit"] = time.perf_counter() - started
+
+    summary = {"client_id": client_id, "best_params": best_params, "best_score": best_value, "trials": states,
+               "accuracy": accuracy, "loss": loss, "num_samples": len(y_train), "round_num": round_num}
+    if upload:
+        from backend.model.upload import upload_model_delta, upload_model_update
+        started = time.perf_counter()
+        if round_num is None:
+            round_num = summary["round_num"] = _current_round(model_id)
+        if delta:
+            from backend.model.fetch import fetch_global_model, fetch_global_model_metadata
+            base_version = fetch_global_model_metadata(model_id)[0]
+            base_model = fetch_global_model(model_id, base_version)
+            submit = upload_queue.put_delta if upload_queue is not None else upload_model_delta
+            submit(model, base_model, base_version, y_test, y_pred, accuracy, loss, model_id,
+                   client_id, round_num, num_samples=len(y_train))
+        else:
+            submit = upload_queue.put if upload_queue is not None else upload_model_update
+            submit(model, y_test, y_pred, accuracy, loss, model_id, client_id, round_num,
+                   num_samples=len(y_train))
+        timings["upload"] = time.perf_counter() - started
+    summary["timings"] = timings
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train, tune and upload one client's update for a federation round")
+    parser.add_argument("--client-id", required=True)
+    parser.add_argument("--data", required=True, help="client CSV (e.g. client_dataset/client_1_binary.csv)")
+    parser.add_argument("--model-id", type=int, default=1)
+    parser.add_argument("--round", type=int, default=None, help="default: the open round from fl_rounds")
+    parser.add_argument("--trials", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=None, help="parallel trial processes (default: all cores)")
+    parser.add_argument("--folds", type=int, default=3, help="CV folds per trial; pruning happens between folds")
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--delta", action="store_true", help="upload as a delta against the latest global model")
+    parser.add_argument("--dry-run", action="store_true", help="train and evaluate without uploading")
+    parser.add_argument("--background-upload", action="store_true",
+                        help="spool the update locally and upload it from a background worker with retries")
+    parser.add_argument("--upload-timeout", type=float, default=60.0,
+                        help="with --background-upload: how long to wait for the spool to drain before exiting")
+    args = parser.parse_args()
+
+    upload_queue = None
+    if args.background_upload and not args.dry_run:
+        from backend.model.upload_queue import UploadQueue
+        upload_queue = UploadQueue().start()
+
+    summary = run_client_round(args.client_id, args.data, args.model_id, args.round, args.trials, args.workers,
+                               args.folds, args.test_size, args.seed, args.delta, upload=not args.dry_run,
+                               upload_queue=upload_queue)
+    print(f"Client {summary['client_id']}: best {summary['best_params']} (score {summary['best_score']:.4f}), "
+          f"trials {summary['trials']}", file=sys.stderr)
+    print(f"Client {summary['client_id']}: accuracy {summary['accuracy']:.4f}, log loss {summary['loss']:.4f}; "
+          + ", ".join(f"{stage} {seconds:.2f}s" for stage, seconds in summary["timings"].items()), file=sys.stderr)
+
+    if upload_queue is not None:
+        if not upload_queue.flush(args.upload_timeout):
+            print(f"Client {summary['client_id']}: upload still pending after {args.upload_timeout:.0f}s; "
+                  f"it stays spooled and is retried by the next run or `python -m backend.model.upload_queue`",
+                  file=sys.stderr)
+        upload_queue.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,149 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
 import mysql.connector
+from mysql.connector import pooling
+import yaml
+
+CONFIG_PATH = os.getenv("NERONODE_DB_CONFIG", os.path.join(os.path.dirname(__file__), "config.yaml"))
+
+# Environment overrides for every key in the `db:` section of config.yaml,
+# e.g. NERONODE_DB_HOST, NERONODE_DB_PASSWORD, NERONODE_DB_POOL_SIZE.
+_DEFAULTS = {
+    "host": "127.0.0.1",
+    "user": "clientUsers",
+    "password": "",
+    "name": "fl_database",
+    "port": 3306,
+    "pool_name": "neronode_pool",
+    "pool_size": 8,
+    "pool_reset_session": True,
+    "pool_timeout": 5,
+    "connect_timeout": 5,
+    "read_timeout": 30,
+    "write_timeout": 30,
+}
+
+_pool = None
+_checkout_timeout = _DEFAULTS["pool_timeout"]
+_pool_lock = threading.Lock()
+# Pools inherited across fork(); kept referenced so their sockets are never shut down from the child.
+_inherited_pools = []
+
+
+def _coerce(value, default):
+    if isinstance(default, bool):
+        return str(value).lower() in ("1", "true", "yes")
+    if isinstance(default, int):
+        return int(value)
+    return value
+
+
+def load_config_section(section: str, path: str = CONFIG_PATH) -> dict:
+    """Return one top-level section of config.yaml ({} if the file or section is missing)."""
+    try:
+        with open(path) as f:
+            return dict((yaml.safe_load(f) or {}).get(section) or {})
+    except FileNotFoundError:
+        return {}
+
+
+def load_db_config(path: str = CONFIG_PATH) -> dict:
+    config = dict(_DEFAULTS)
+    config.update(load_config_section("db", path))
+    for key, default in _DEFAULTS.items():
+        env_value = os.getenv(f"NERONODE_DB_{key.upper()}")
+        if env_value is not None:
+            config[key] = _coerce(env_value, default)
+    return config
+
+
+def get_pool():
+    global _pool, _checkout_timeout
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                config = load_db_config()
+                _pool = pooling.MySQLConnectionPool(
+                    pool_name=config["pool_name"],
+                    pool_size=int(config["pool_size"]),
+                    pool_reset_session=bool(config["pool_reset_session"]),
+                    host=config["host"],
+                    port=int(config["port"]),
+                    user=config["user"],
+                    password=str(config["password"]),
+                    database=config["name"],
+                    connection_timeout=int(config["connect_timeout"]),
+                    read_timeout=int(config["read_timeout"]),
+                    write_timeout=int(config["write_timeout"]),
+                )
+                _checkout_timeout = float(config["pool_timeout"])
+    return _pool
+
+
+def _reset_pool_after_fork():
+    # mysql-connector opens every pooled connection up front, so a forked child
+    # (e.g. a ProcessPoolExecutor worker) would otherwise talk on the parent's
+    # sockets and corrupt both sessions. The child builds its own pool on first
+    # use. The inherited one is only dropped, not closed: closing, or letting it
+    # be garbage-collected, shuts the shared sockets down for the parent too.
+    global _pool, _pool_lock
+    if _pool is not None:
+        _inherited_pools.append(_pool)
+    _pool = None
+    _pool_lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_pool_after_fork)
+
 
 def get_db_connection():
+    """Check out a pooled connection; `conn.close()` returns it to the pool.
+
+    The pool pings each connection on checkout and reconnects stale ones. When
+    every connection is busy, wait up to `pool_timeout` seconds for one to be
+    released instead of opening more server connections.
+    """
     try:
-        conn = mysql.connector.connect(
-            host="192.168.91.196",
-            user="clientUsers",
-            password="ronaldo7",
-            database="fl_database"
-        )
-        return conn
+        pool = get_pool()
+        deadline = time.monotonic() + _checkout_timeout
+        while True:
+            try:
+                return pool.get_connection()
+            except pooling.PoolError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.01)
     except mysql.connector.Error as err:
         print(f"Error connecting to database: {err}")
-        raise
\ No newline at end of file
+        raise
+
+
+@contextmanager
+def db_cursor(dictionary: bool = False, commit: bool = False, buffered: bool = True):
+    """Yield a cursor on a pooled connection; always closes the cursor and releases the connection.
+
+    With `commit=True` the transaction is committed on success; any exception rolls it back.
+    """
+    conn = get_db_connection()
+    cursor = None
+    try:
+        cursor = conn.cursor(dictionary=dictionary, buffered=buffered)
+        yield cursor
+        if commit:
+            conn.commit()
+    except Exception:
+        try:
+            conn.rollback()
+        except mysql.connector.Error:
+            pass
+        raise
+    finally:
+        if cursor is not None:
+            try:
+                cursor.close()
+            except mysql.connector.Error:
+                pass
+        conn.close()
@@ -0,0 +1,121 @@
+# backend/db/metrics.py
+
+import base64
+
+METRIC_COLUMNS = ["accuracy", "loss", "macro_f1", "recall_minority", "f1_minority", "f1_majority"]
+
+CLIENT_METRIC_COLUMNS = ["client_id", "iteration", "model_name", "fit_status"] + METRIC_COLUMNS
+
+GLOBAL_METRIC_COLUMNS = ["iteration"] + METRIC_COLUMNS
+
+# API field name -> SQL expression; the whitelist for field selection.
+_CLIENT_COLUMN_SQL = {col: col for col in CLIENT_METRIC_COLUMNS}
+_CLIENT_COLUMN_SQL["iteration"] = "round_num"
+
+METRICS_MAX_PAGE_SIZE = 5000
+
+
+def _where(client_id=None, model_name=None, iteration_min=None, iteration_max=None):
+    clauses = ["round_num IS NOT NULL"]
+    params = []
+    if client_id is not None:
+        clauses.append("client_id = %s")
+        params.append(str(client_id))
+    if model_name is not None:
+        clauses.append("model_name = %s")
+        params.append(model_name)
+    if iteration_min is not None:
+        clauses.append("round_num >= %s")
+        params.append(int(iteration_min))
+    if iteration_max is not None:
+        clauses.append("round_num <= %s")
+        params.append(int(iteration_max))
+    return clauses, params
+
+
+def encode_cursor(round_num: int, update_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{round_num}:{update_id}".encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        round_num, update_id = base64.urlsafe_b64decode(padded.encode()).decode().split(":")
+        return int(round_num), int(update_id)
+    except Exception:
+        raise ValueError(f"Invalid metrics cursor: {cursor!r}")
+
+
+def rows_to_records(rows, columns):
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def records_to_columns(records, columns) -> dict:
+    """Compact columnar encoding: one array per column instead of a list of dicts."""
+    return {col: [record[col] for record in records] for col in columns}
+
+
+def query_global_metrics(cursor, client_id=None, model_name=None, iteration_min=None, iteration_max=None):
+    """Per-iteration global aggregates, computed by the database."""
+    clauses, params = _where(client_id, model_name, iteration_min, iteration_max)
+    cursor.execute(f"""
+        SELECT round_num AS iteration,
+               AVG(accuracy), AVG(loss), AVG(macro_f1),
+               AVG(recall_minority), AVG(f1_minority), AVG(f1_majority)
+        FROM client_updates
+        WHERE {" AND ".join(clauses)}
+        GROUP BY round_num
+        ORDER BY round_num
+    """, tuple(params))
+    return rows_to_records(cursor.fetchall(), GLOBAL_METRIC_COLUMNS)
+
+
+def query_client_metrics(cursor, client_id=None, model_name=None, iteration_min=None, iteration_max=None,
+                         fields=None, after=None, limit=None):
+    """Per-client series with column projection and keyset pagination on (round_num, update_id).
+
+    Returns (records, next_cursor); next_cursor is None on the last page.
+    """
+    columns = list(fields) if fields else list(CLIENT_METRIC_COLUMNS)
+    unknown = [col for col in columns if col not in _CLIENT_COLUMN_SQL]
+    if unknown:
+        raise ValueError(f"Unknown metrics fields: {unknown}")
+
+    clauses, params = _where(client_id, model_name, iteration_min, iteration_max)
+    if after is not None:
+        after_round, after_id = decode_cursor(after)
+        clauses.append("(round_num > %s OR (round_num = %s AND update_id > %s))")
+        params.extend([after_round, after_round, after_id])
+
+    select = ", ".join(f"{_CLIENT_COLUMN_SQL[col]} AS {col}" if col == "iteration" else col for col in columns)
+    sql = f"""
+        SELECT {select}, round_num, update_id
+        FROM client_updates
+        WHERE {" AND ".join(clauses)}
+        ORDER BY round_num, update_id
+    """
+    if limit is not None:
+        sql += " LIMIT %s"
+        params.append(int(limit) + 1)  # one extra row tells us whether another page exists
+    cursor.execute(sql, tuple(params))
+    rows = cursor.fetchall()
+
+    next_cursor = None
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][-2], rows[-1][-1])
+    return rows_to_records((row[:-2] for row in rows), columns), next_cursor
+
+
+def query_metrics(cursor, client_id=None, model_name=None, iteration_min=None, iteration_max=None,
+                  fields=None, after=None, limit=None, include_global=True) -> dict:
+    """Run the metrics queries on a tuple cursor and shape the MetricsResponse payload.
+
+    Global aggregates are only returned on the first page (no `after` cursor).
+    """
+    filters = dict(client_id=client_id, model_name=model_name, iteration_min=iteration_min, iteration_max=iteration_max)
+    global_metrics = []
+    if include_global and after is None:
+        global_metrics = query_global_metrics(cursor, **filters)
+    client_metrics, next_cursor = query_client_metrics(cursor, fields=fields, after=after, limit=limit, **filters)
+    return {"global_metrics": global_metrics, "client_metrics": client_metrics, "next_cursor": next_cursor}
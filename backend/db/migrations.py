@@ -0,0 +1,214 @@
+# backend/db/migrations.py
+#
+# Versioned schema migrations for fl_database (MariaDB).
+#
+#   python -m backend.db.migrations            # apply pending migrations
+#   python -m backend.db.migrations --status   # list applied / pending
+#   python -m backend.db.migrations --check    # EXPLAIN the hot queries and verify index use
+
+import argparse
+import sys
+
+from backend.db.connection import db_cursor
+
+# (version, description, statements). Statements are written to be re-runnable
+# (IF [NOT] EXISTS), so a migration interrupted halfway can simply be applied again.
+MIGRATIONS = [
+    (1, "composite and covering indexes for hot query shapes", [
+        # fetch_global_model / list_global_versions: WHERE model_id = ? [AND version = ?] ORDER BY version DESC
+        "CREATE INDEX IF NOT EXISTS idx_central_model_version ON central_updates (model_id, version)",
+        # aggregation: WHERE model_id = ? AND round_num = ?
+        "CREATE INDEX IF NOT EXISTS idx_client_model_round ON client_updates (model_id, round_num, client_id)",
+        # /metrics/: ORDER BY round_num, update_id over the metric columns only (covering, never touches blobs)
+        """CREATE INDEX IF NOT EXISTS idx_client_metrics ON client_updates
+           (round_num, update_id, client_id, model_name, fit_status,
+            accuracy, loss, macro_f1, recall_minority, f1_minority, f1_majority)""",
+        # /metrics/?client_id=...: per-client series in round order
+        "CREATE INDEX IF NOT EXISTS idx_client_series ON client_updates (client_id, round_num, update_id)",
+    ]),
+    (2, "integer central_updates.version and auto-increment update_id", [
+        # version was varchar(20), so ORDER BY version DESC sorted '10' before '9'.
+        "ALTER TABLE central_updates MODIFY version INT NULL",
+        # The shipped dump has a row with update_id = 0. Adding AUTO_INCREMENT would
+        # resequence it to 1 and collide with the existing row 1, so move it past the max first.
+        """UPDATE central_updates AS c
+           JOIN (SELECT MAX(update_id) + 1 AS next_id FROM central_updates) AS m
+           SET c.update_id = m.next_id
+           WHERE c.update_id = 0""",
+        "ALTER TABLE central_updates MODIFY update_id INT(11) NOT NULL AUTO_INCREMENT",
+    ]),
+    (3, "blob references on update rows and separate model_blobs table", [
+        # Rows written through the blob store keep only the sha256 reference and size;
+        # legacy rows keep their inline model_blob until re-published.
+        "ALTER TABLE central_updates ADD COLUMN IF NOT EXISTS blob_hash CHAR(64) NULL",
+        "ALTER TABLE central_updates ADD COLUMN IF NOT EXISTS blob_size BIGINT NULL",
+        "ALTER TABLE client_updates ADD COLUMN IF NOT EXISTS blob_hash CHAR(64) NULL",
+        "ALTER TABLE client_updates ADD COLUMN IF NOT EXISTS blob_size BIGINT NULL",
+        """CREATE TABLE IF NOT EXISTS model_blobs (
+               blob_hash CHAR(64) NOT NULL PRIMARY KEY,
+               blob_size BIGINT NOT NULL,
+               data LONGBLOB NOT NULL,
+               created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+           ) ENGINE=InnoDB""",
+    ]),
+    (4, "delta-encoded client updates", [
+        # update_encoding: 'full' (complete model) or 'delta' (parameters relative to base_version)
+        "ALTER TABLE client_updates ADD COLUMN IF NOT EXISTS update_encoding VARCHAR(16) NULL",
+        "ALTER TABLE client_updates ADD COLUMN IF NOT EXISTS base_version INT NULL",
+    ]),
+    (5, "training sample counts for weighted aggregation", [
+        "ALTER TABLE client_updates ADD COLUMN IF NOT EXISTS num_samples INT NULL",
+    ]),
+    (6, "federation rounds driven by the orchestrator", [
+        """CREATE TABLE IF NOT EXISTS fl_rounds (
+               model_id INT NOT NULL,
+               round_num INT NOT NULL,
+               status ENUM('open','aggregating','closed','failed') NOT NULL DEFAULT 'open',
+               quorum INT NOT NULL,
+               expected_clients INT NOT NULL,
+               opened_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6),
+               deadline_at TIMESTAMP(6) NULL,
+               closed_at TIMESTAMP(6) NULL,
+               published_version INT NULL,
+               PRIMARY KEY (model_id, round_num)
+           ) ENGINE=InnoDB""",
+    ]),
+    (7, "idempotent client update inserts", [
+        # "<model_id>:<client_id>:<round_num>"; NULL on legacy rows, which the unique index ignores.
+        "ALTER TABLE client_updates ADD COLUMN IF NOT EXISTS idempotency_key VARCHAR(191) NULL",
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_client_update_idempotency ON client_updates (idempotency_key)",
+    ]),
+    (8, "chunked, resumable blob uploads", [
+        """CREATE TABLE IF NOT EXISTS blob_uploads (
+               blob_hash CHAR(64) NOT NULL PRIMARY KEY,
+               blob_size BIGINT NOT NULL,
+               chunk_size INT NOT NULL,
+               num_chunks INT NOT NULL,
+               status ENUM('uploading','complete') NOT NULL DEFAULT 'uploading',
+               created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+               completed_at TIMESTAMP NULL
+           ) ENGINE=InnoDB""",
+        """CREATE TABLE IF NOT EXISTS blob_upload_chunks (
+               blob_hash CHAR(64) NOT NULL,
+               chunk_index INT NOT NULL,
+               chunk_sha256 CHAR(64) NOT NULL,
+               data MEDIUMBLOB NOT NULL,
+               PRIMARY KEY (blob_hash, chunk_index)
+           ) ENGINE=InnoDB""",
+    ]),
+    (9, "per-client round arrivals and round durations", [
+        "ALTER TABLE fl_rounds ADD COLUMN IF NOT EXISTS duration_seconds DOUBLE NULL",
+        # Seconds from round open to each client's first update, as counted by the orchestrator.
+        """CREATE TABLE IF NOT EXISTS fl_round_arrivals (
+               model_id INT NOT NULL,
+               round_num INT NOT NULL,
+               client_id VARCHAR(50) NOT NULL,
+               arrival_seconds DOUBLE NOT NULL,
+               PRIMARY KEY (model_id, round_num, client_id)
+           ) ENGINE=InnoDB""",
+    ]),
+]
+
+# (name, sql, params, expected index) for EXPLAIN-based plan checks.
+QUERY_PLAN_CHECKS = [
+    ("fetch_global_model by version",
+     "SELECT update_id FROM central_updates WHERE model_id = %s AND version = %s", (1, 3),
+     "idx_central_model_version"),
+    ("latest global version",
+     "SELECT version FROM central_updates WHERE model_id = %s ORDER BY version DESC LIMIT 1", (1,),
+     "idx_central_model_version"),
+    ("aggregation round scan",
+     "SELECT update_id FROM client_updates WHERE model_id = %s AND round_num = %s", (1, 2),
+     "idx_client_model_round"),
+    ("metrics client series",
+     """SELECT client_id, round_num, model_name, fit_status, accuracy, loss, macro_f1,
+               recall_minority, f1_minority, f1_majority, update_id
+        FROM client_updates WHERE round_num IS NOT NULL ORDER BY round_num, update_id""", (),
+     "idx_client_metrics"),
+    ("metrics global aggregates",
+     """SELECT round_num, AVG(accuracy), AVG(loss), AVG(macro_f1), AVG(recall_minority),
+               AVG(f1_minority), AVG(f1_majority)
+        FROM client_updates WHERE round_num IS NOT NULL GROUP BY round_num ORDER BY round_num""", (),
+     "idx_client_metrics"),
+    ("metrics single client",
+     "SELECT update_id FROM client_updates WHERE client_id = %s AND round_num IS NOT NULL ORDER BY round_num, update_id",
+     ("1",), "idx_client_series"),
+]
+
+
+def _ensure_migrations_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INT NOT NULL PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def applied_versions(cursor):
+    _ensure_migrations_table(cursor)
+    cursor.execute("SELECT version FROM schema_migrations ORDER BY version")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def apply_migrations(target: int = None) -> list:
+    """Apply pending migrations up to `target` (default: all), in order. Returns applied versions."""
+    applied = []
+    with db_cursor(commit=True) as cursor:
+        done = set(applied_versions(cursor))
+    for version, description, statements in MIGRATIONS:
+        if version in done or (target is not None and version > target):
+            continue
+        print(f"Applying migration {version}: {description}", file=sys.stderr)
+        # DDL commits implicitly in MariaDB; each migration is recorded only after all its statements ran.
+        with db_cursor(commit=True) as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute("INSERT INTO schema_migrations (version, description) VALUES (%s, %s)",
+                           (version, description))
+        applied.append(version)
+    return applied
+
+
+def check_query_plans(cursor) -> list:
+    """EXPLAIN each hot query; return a list of failure messages (empty when every plan uses its index)."""
+    failures = []
+    for name, sql, params, expected_index in QUERY_PLAN_CHECKS:
+        cursor.execute("EXPLAIN " + sql, params)
+        columns = [d[0] for d in cursor.description]
+        plan = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        first = plan[0] if plan else {}
+        if first.get("key") != expected_index or first.get("type") == "ALL":
+            failures.append(f"{name}: expected index {expected_index}, got key={first.get('key')} "
+                            f"type={first.get('type')} extra={first.get('Extra')}")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description="fl_database schema migrations")
+    parser.add_argument("--status", action="store_true", help="show applied and pending migrations")
+    parser.add_argument("--check", action="store_true", help="verify query plans use the expected indexes")
+    parser.add_argument("--target", type=int, default=None, help="migrate up to this version")
+    args = parser.parse_args()
+
+    if args.status:
+        with db_cursor(commit=True) as cursor:
+            done = set(applied_versions(cursor))
+        for version, description, _ in MIGRATIONS:
+            print(f"{version:>4}  {'applied' if version in done else 'pending':<8} {description}")
+        return
+    if args.check:
+        with db_cursor() as cursor:
+            failures = check_query_plans(cursor)
+        for failure in failures:
+            print(f"[plan] {failure}", file=sys.stderr)
+        print("Query plans OK" if not failures else f"{len(failures)} query plan check(s) failed")
+        sys.exit(1 if failures else 0)
+
+    applied = apply_migrations(args.target)
+    print(f"Applied migrations: {applied}" if applied else "Schema is up to date")
+
+
+if __name__ == "__main__":
+    main()
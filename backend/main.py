@@ -1,14 +1,33 @@
 # backend/main.py (Example structure)
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.middleware.gzip import GZipMiddleware
 from backend.api import endpoints # Import your endpoints router
+from backend.telemetry import instrument_app
+
+@asynccontextmanager
+async def lifespan(app):
+    # Model loading and warm-up run in the background; probe /ready before routing traffic.
+    endpoints.start_model_loading()
+    yield
+    await endpoints.shutdown()
+
 
 app = FastAPI(
     title="Neronode Federated Learning API",
     description="API for federated learning model predictions and metrics.",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan,
 )
 
+# gzip responses (e.g. /metrics/) for clients that send Accept-Encoding: gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Request latency / counters for the /prometheus scrape endpoint
+instrument_app(app)
+
 # Include the router
 app.include_router(endpoints.router)
 
@@ -0,0 +1,150 @@
+# backend/model/aggregate.py
+#
+# Server-side FedAvg for linear global models.
+#
+#   python -m backend.model.aggregate --model-id 1 --round 2 [--weighting samples|uniform] [--dry-run]
+#
+# Client updates for (model_id, round_num) are streamed one at a time: each is
+# loaded (full or delta-encoded), its coef_/intercept_ copied into one row of a
+# preallocated (n_clients, n_params) matrix, and the estimator dropped. The new
+# global parameters are a single weighted matrix-vector product.
+
+import argparse
+import sys
+
+import numpy as np
+
+from backend.db.connection import db_cursor
+from backend.model import serialization
+from backend.model.delta import linear_params
+from backend.model.fetch import decode_client_update
+from backend.model.upload import publish_global_model
+from backend.telemetry import time_db
+
+
+def fetch_round_updates(model_id: int, round_num: int, clients=None):
+    """Metadata of every client update in a round (no blobs), oldest first.
+
+    With `clients`, only updates from those client_ids are returned (the set
+    the orchestrator counted towards quorum, not whatever arrived since).
+    """
+    if clients is not None and not clients:
+        return []
+    client_filter = ""
+    params = (model_id, round_num)
+    if clients is not None:
+        client_filter = f"AND client_id IN ({', '.join(['%s'] * len(clients))})"
+        params += tuple(str(client_id) for client_id in clients)
+    with time_db("fetch_round_updates"), db_cursor() as cursor:
+        cursor.execute(f"""
+            SELECT update_id, client_id, blob_hash, update_encoding, base_version, num_samples
+            FROM client_updates
+            WHERE model_id = %s AND round_num = %s {client_filter}
+            ORDER BY update_id
+        """, params)
+        return cursor.fetchall()
+
+
+def _load_update_model(model_id, update_id, blob_hash, update_encoding, base_version, allow_pickle):
+    model_blob = None
+    if not blob_hash:
+        # Legacy row with an inline blob: fetch just this one.
+        with time_db("fetch_model_blob"), db_cursor() as cursor:
+            cursor.execute("SELECT model_blob FROM client_updates WHERE update_id = %s", (update_id,))
+            model_blob = cursor.fetchone()[0]
+    return decode_client_update(model_id, blob_hash, model_blob, update_encoding, base_version, allow_pickle)
+
+
+def resolve_weights(client_ids, num_samples, weighting="samples") -> np.ndarray:
+    """Normalized aggregation weights.
+
+    weighting: "samples" (num_samples per update, uniform if any are missing),
+    "uniform", or a {client_id: weight} mapping (missing clients get weight 0).
+    """
+    n = len(client_ids)
+    if isinstance(weighting, dict):
+        weights = np.array([float(weighting.get(str(c), weighting.get(c, 0.0))) for c in client_ids])
+    elif weighting == "samples" and all(s is not None and s > 0 for s in num_samples):
+        weights = np.asarray(num_samples, dtype=np.float64)
+    elif weighting in ("samples", "uniform"):
+        if weighting == "samples":
+            print("FedAvg: num_samples missing for some updates; using uniform weights", file=sys.stderr)
+        weights = np.ones(n)
+    else:
+        raise ValueError(f"Unknown weighting {weighting!r}")
+    total = weights.sum()
+    if total <= 0:
+        raise ValueError("Aggregation weights sum to zero")
+    return weights / total
+
+
+def fedavg(model_id: int, round_num: int, weighting="samples", allow_pickle: bool = False, clients=None):
+    """Weighted average of a round's linear client models (only `clients`, if given). Returns (global_model, summary)."""
+    rows = fetch_round_updates(model_id, round_num, clients)
+    if not rows:
+        raise ValueError(f"No client updates for model {model_id} round {round_num}")
+
+    params = None
+    template = None
+    classes = None
+    client_ids, num_samples = [], []
+    for i, (update_id, client_id, blob_hash, update_encoding, base_version, n_samples) in enumerate(rows):
+        model = _load_update_model(model_id, update_id, blob_hash, update_encoding, base_version, allow_pickle)
+        vector = linear_params(model)
+        if params is None:
+            params = np.empty((len(rows), vector.size), dtype=np.float64)
+            template = serialization.linear_header(model)
+            classes = np.asarray(model.classes_)
+        elif vector.size != params.shape[1] or not np.array_equal(np.asarray(model.classes_), classes):
+            raise ValueError(f"Client {client_id} (update {update_id}) has an incompatible model shape/classes")
+        params[i] = vector
+        client_ids.append(client_id)
+        num_samples.append(n_samples)
+        del model
+
+    weights = resolve_weights(client_ids, num_samples, weighting)
+    averaged = weights @ params  # (n_clients,) @ (n_clients, n_params) -> (n_params,)
+
+    header, arrays = template
+    coef_shape = arrays["coef_"].shape
+    n_coef = int(np.prod(coef_shape))
+    arrays = dict(arrays, coef_=averaged[:n_coef].reshape(coef_shape),
+                  intercept_=averaged[n_coef:].reshape(np.shape(arrays["intercept_"])))
+    arrays.pop("n_iter_", None)
+    global_model = serialization.build_linear_model(header, arrays)
+
+    summary = {
+        "model_id": model_id,
+        "round_num": round_num,
+        "n_updates": len(rows),
+        "weights": {str(c): float(w) for c, w in zip(client_ids, weights)},
+    }
+    return global_model, summary
+
+
+def aggregate_round(model_id: int, round_num: int, weighting="samples", model_name: str = "FedAvg",
+                    allow_pickle: bool = False, publish: bool = True, clients=None) -> dict:
+    """FedAvg a round and publish the result as the next central_updates version."""
+    global_model, summary = fedavg(model_id, round_num, weighting, allow_pickle, clients)
+    if publish:
+        summary["version"] = publish_global_model(global_model, model_id, model_name)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server-side FedAvg for linear global models")
+    parser.add_argument("--model-id", type=int, default=1)
+    parser.add_argument("--round", type=int, required=True, dest="round_num")
+    parser.add_argument("--weighting", choices=["samples", "uniform"], default="samples")
+    parser.add_argument("--model-name", default="FedAvg")
+    parser.add_argument("--allow-pickle", action="store_true", help="accept legacy pickled client blobs")
+    parser.add_argument("--dry-run", action="store_true", help="aggregate without publishing")
+    args = parser.parse_args()
+
+    summary = aggregate_round(args.model_id, args.round_num, args.weighting, args.model_name,
+                              allow_pickle=args.allow_pickle, publish=not args.dry_run)
+    print(summary)
+
+
+if __name__ == "__main__":
+    main()
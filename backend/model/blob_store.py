@@ -0,0 +1,231 @@
+# backend/model/blob_store.py
+
+import math
+import os
+import sys
+import tempfile
+import time
+
+from backend.db.connection import db_cursor, load_config_section
+from backend.model.cache import blob_sha256
+
+
+class BlobNotFoundError(KeyError):
+    pass
+
+
+class BlobStore:
+    """Content-addressed storage for serialized model blobs.
+
+    Update rows only keep the returned sha256 reference and size; blobs are
+    written once per distinct content and verified against their hash on read.
+    """
+
+    def put(self, blob: bytes):
+        """Store `blob` and return (sha256, size). Storing the same bytes twice is a no-op."""
+        raise NotImplementedError
+
+    def get(self, sha256: str) -> bytes:
+        raise NotImplementedError
+
+    def exists(self, sha256: str) -> bool:
+        raise NotImplementedError
+
+
+class FilesystemBlobStore(BlobStore):
+    """Blobs under <root>/<sha[:2]>/<sha>, written atomically. Works fully offline."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, sha256: str) -> str:
+        return os.path.join(self.root, sha256[:2], sha256)
+
+    def put(self, blob: bytes):
+        blob = bytes(blob)
+        sha256 = blob_sha256(blob)
+        path = self._path(sha256)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(blob)
+                os.replace(tmp_path, path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        return sha256, len(blob)
+
+    def get(self, sha256: str) -> bytes:
+        try:
+            with open(self._path(sha256), "rb") as f:
+                blob = f.read()
+        except FileNotFoundError:
+            raise BlobNotFoundError(sha256)
+        if blob_sha256(blob) != sha256:
+            raise ValueError(f"Blob {sha256} is corrupt (hash mismatch)")
+        return blob
+
+    def exists(self, sha256: str) -> bool:
+        return os.path.exists(self._path(sha256))
+
+
+class DatabaseBlobStore(BlobStore):
+    """Blobs in the separate `model_blobs` table, keyed by sha256 (see migration 3).
+
+    Blobs larger than `chunk_threshold` never travel in one packet: they are
+    written as `chunk_size` rows of blob_upload_chunks (migration 8), each with
+    its own sha256 and committed on its own. An interrupted put resumes from
+    the chunks the server already holds with a matching checksum. The upload
+    is only marked complete once the server has re-hashed every chunk, and
+    get() reassembles the chunks and verifies the full blob's sha256.
+    """
+
+    def __init__(self, chunk_size: int = 1024 * 1024, chunk_threshold: int = 4 * 1024 * 1024,
+                 chunk_retries: int = 5, retry_backoff: float = 0.5):
+        self.chunk_size = chunk_size
+        self.chunk_threshold = chunk_threshold
+        self.chunk_retries = chunk_retries
+        self.retry_backoff = retry_backoff
+
+    def put(self, blob: bytes):
+        blob = bytes(blob)
+        sha256 = blob_sha256(blob)
+        if len(blob) > self.chunk_threshold:
+            self._put_chunked(blob, sha256)
+            return sha256, len(blob)
+        with db_cursor(commit=True) as cursor:
+            cursor.execute("""
+                INSERT IGNORE INTO model_blobs (blob_hash, blob_size, data)
+                VALUES (%s, %s, %s)
+            """, (sha256, len(blob), blob))
+        return sha256, len(blob)
+
+    # --- Chunked upload ---
+    def _begin_upload(self, sha256: str, size: int) -> int:
+        """Register the upload (idempotent); returns the chunk size to use, which an earlier attempt may have fixed."""
+        with db_cursor(commit=True) as cursor:
+            cursor.execute("""
+                INSERT IGNORE INTO blob_uploads (blob_hash, blob_size, chunk_size, num_chunks, status)
+                VALUES (%s, %s, %s, %s, 'uploading')
+            """, (sha256, size, self.chunk_size, max(1, math.ceil(size / self.chunk_size))))
+            cursor.execute("SELECT chunk_size, status FROM blob_uploads WHERE blob_hash = %s", (sha256,))
+            chunk_size, status = cursor.fetchone()
+        return 0 if status == "complete" else int(chunk_size)
+
+    def _acknowledged_chunks(self, sha256: str) -> set:
+        # Acknowledged = stored and re-hashed by the server to the checksum the client sent.
+        with db_cursor() as cursor:
+            cursor.execute("""
+                SELECT chunk_index
+                FROM blob_upload_chunks
+                WHERE blob_hash = %s AND SHA2(data, 256) = chunk_sha256
+            """, (sha256,))
+            return {int(row[0]) for row in cursor.fetchall()}
+
+    def _send_chunk(self, sha256: str, index: int, chunk: bytes):
+        for attempt in range(self.chunk_retries):
+            try:
+                with db_cursor(commit=True) as cursor:
+                    cursor.execute("""
+                        INSERT INTO blob_upload_chunks (blob_hash, chunk_index, chunk_sha256, data)
+                        VALUES (%s, %s, %s, %s)
+                        ON DUPLICATE KEY UPDATE chunk_sha256 = VALUES(chunk_sha256), data = VALUES(data)
+                    """, (sha256, index, blob_sha256(chunk), chunk))
+                return
+            except Exception as e:
+                if attempt == self.chunk_retries - 1:
+                    raise
+                delay = self.retry_backoff * (2 ** attempt)
+                print(f"DatabaseBlobStore: chunk {index} of {sha256[:12]} failed ({e}); retrying in {delay:.1f}s",
+                      file=sys.stderr)
+                time.sleep(delay)
+
+    def _complete_upload(self, sha256: str, size: int, num_chunks: int):
+        with db_cursor(commit=True) as cursor:
+            cursor.execute("""
+                UPDATE blob_uploads u
+                SET u.status = 'complete', u.completed_at = CURRENT_TIMESTAMP
+                WHERE u.blob_hash = %s
+                  AND (SELECT COUNT(*) FROM blob_upload_chunks c
+                       WHERE c.blob_hash = u.blob_hash AND SHA2(c.data, 256) = c.chunk_sha256
+                         AND c.chunk_index < %s) = %s
+                  AND (SELECT SUM(LENGTH(c.data)) FROM blob_upload_chunks c
+                       WHERE c.blob_hash = u.blob_hash AND c.chunk_index < %s) = %s
+            """, (sha256, num_chunks, num_chunks, num_chunks, size))
+            if cursor.rowcount != 1:
+                raise ValueError(f"Chunked upload of {sha256} failed server-side verification")
+
+    def _put_chunked(self, blob: bytes, sha256: str):
+        chunk_size = self._begin_upload(sha256, len(blob))
+        if not chunk_size:
+            return  # already complete
+        num_chunks = max(1, math.ceil(len(blob) / chunk_size))
+        done = self._acknowledged_chunks(sha256)
+        if done:
+            print(f"DatabaseBlobStore: resuming upload of {sha256[:12]} at {len(done)}/{num_chunks} chunks",
+                  file=sys.stderr)
+        for index in range(num_chunks):
+            if index not in done:
+                self._send_chunk(sha256, index, blob[index * chunk_size:(index + 1) * chunk_size])
+        self._complete_upload(sha256, len(blob), num_chunks)
+
+    def _get_chunked(self, sha256: str):
+        with db_cursor() as cursor:
+            cursor.execute("""
+                SELECT c.data
+                FROM blob_uploads u
+                JOIN blob_upload_chunks c ON c.blob_hash = u.blob_hash AND c.chunk_index < u.num_chunks
+                WHERE u.blob_hash = %s AND u.status = 'complete'
+                ORDER BY c.chunk_index
+            """, (sha256,))
+            chunks = [bytes(row[0]) for row in cursor.fetchall()]
+        if not chunks:
+            return None
+        return b"".join(chunks)
+
+    def get(self, sha256: str) -> bytes:
+        with db_cursor() as cursor:
+            cursor.execute("SELECT data FROM model_blobs WHERE blob_hash = %s", (sha256,))
+            row = cursor.fetchone()
+        blob = bytes(row[0]) if row else self._get_chunked(sha256)
+        if blob is None:
+            raise BlobNotFoundError(sha256)
+        if blob_sha256(blob) != sha256:
+            raise ValueError(f"Blob {sha256} is corrupt (hash mismatch)")
+        return blob
+
+    def exists(self, sha256: str) -> bool:
+        with db_cursor() as cursor:
+            cursor.execute("""
+                SELECT 1 FROM model_blobs WHERE blob_hash = %s
+                UNION ALL
+                SELECT 1 FROM blob_uploads WHERE blob_hash = %s AND status = 'complete'
+            """, (sha256, sha256))
+            return cursor.fetchone() is not None
+
+
+_default_store = None
+
+
+def get_blob_store() -> BlobStore:
+    """Blob store configured by the `blob_store:` section of config.yaml
+    (NERONODE_BLOB_STORE / NERONODE_BLOB_STORE_PATH override it)."""
+    global _default_store
+    if _default_store is None:
+        config = load_config_section("blob_store")
+        backend = os.getenv("NERONODE_BLOB_STORE", config.get("backend", "database"))
+        if backend == "database":
+            _default_store = DatabaseBlobStore(
+                chunk_size=int(os.getenv("NERONODE_BLOB_CHUNK_BYTES", config.get("chunk_bytes", 1024 * 1024))),
+                chunk_threshold=int(os.getenv("NERONODE_BLOB_CHUNK_THRESHOLD_BYTES",
+                                              config.get("chunk_threshold_bytes", 4 * 1024 * 1024))),
+            )
+        elif backend == "filesystem":
+            path = os.getenv("NERONODE_BLOB_STORE_PATH", config.get("path", "backend/model/blobs"))
+            _default_store = FilesystemBlobStore(path)
+        else:
+            raise ValueError(f"Unknown blob_store backend: {backend!r}")
+    return _default_store
@@ -0,0 +1,94 @@
+# backend/model/cache.py
+
+import hashlib
+import os
+import sys
+import tempfile
+
+MODEL_CACHE_DIR = os.getenv("NERONODE_MODEL_CACHE_DIR", "backend/model/cache")
+MODEL_CACHE_MAX_BYTES = int(float(os.getenv("NERONODE_MODEL_CACHE_MAX_MB", "512")) * 1024 * 1024)
+
+
+def blob_sha256(blob: bytes) -> str:
+    return hashlib.sha256(blob).hexdigest()
+
+
+class ModelCache:
+    """Content-addressed on-disk cache of raw global model blobs.
+
+    Entries are keyed by (model_id, version, sha256 of the blob), so a version
+    that is re-published with different bytes never hits a stale file. Files
+    are written atomically, re-hashed on read, and evicted least-recently-used
+    first once the directory exceeds `max_bytes`.
+    """
+
+    def __init__(self, cache_dir: str = MODEL_CACHE_DIR, max_bytes: int = MODEL_CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, model_id, version, sha256: str) -> str:
+        return os.path.join(self.cache_dir, f"model-{model_id}-v{version}-{sha256}.blob")
+
+    def get(self, model_id, version, sha256: str):
+        path = self._path(model_id, version, sha256)
+        try:
+            with open(path, "rb") as f:
+                blob = f.read()
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        if blob_sha256(blob) != sha256:
+            print(f"ModelCache: corrupt entry {path}, discarding", file=sys.stderr)
+            self._remove(path)
+            self.misses += 1
+            return None
+        os.utime(path)  # mark as recently used for eviction
+        self.hits += 1
+        return blob
+
+    def put(self, model_id, version, sha256: str, blob: bytes):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(model_id, version, sha256)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+        except Exception:
+            self._remove(tmp_path)
+            raise
+        self.evict()
+
+    def evict(self):
+        try:
+            names = os.listdir(self.cache_dir)
+        except FileNotFoundError:
+            return
+        entries = []
+        for name in names:
+            if not name.endswith(".blob"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+default_cache = ModelCache()
@@ -0,0 +1,170 @@
+# backend/model/delta.py
+#
+# Client updates for linear models encoded as a parameter delta against the
+# global (model_id, version) they started from. Only coef_/intercept_ move
+# between rounds, so the delta is stored dense or sparse, and optionally
+# quantized to float32/int8, whichever keeps it within tolerance and packs
+# smallest. Header fields and arrays identical to the base model's (estimator,
+# params, attrs, shapes, classes_) are left out and taken from the base on
+# reconstruction. The client checksums the exact parameters the server will
+# reconstruct.
+
+import hashlib
+
+import numpy as np
+
+from backend.model import serialization
+
+# Entries with |delta| at or below this are treated as unchanged (sparse encoding).
+ZERO_TOLERANCE = 0.0
+# Max absolute reconstruction error accepted for lossy (float32/int8) encodings,
+# relative to the largest parameter magnitude.
+QUANTIZATION_TOLERANCE = 1e-4
+
+
+class DeltaChecksumError(ValueError):
+    pass
+
+
+def linear_params(model) -> np.ndarray:
+    """Flatten coef_ and intercept_ into one float64 parameter vector."""
+    coef = np.asarray(model.coef_, dtype=np.float64)
+    intercept = np.atleast_1d(np.asarray(model.intercept_, dtype=np.float64))
+    return np.concatenate((coef.ravel(), intercept.ravel()))
+
+
+def params_checksum(params: np.ndarray) -> str:
+    return hashlib.sha256(np.ascontiguousarray(params, dtype=np.float64).tobytes()).hexdigest()
+
+
+def _expand(values, indices, size, quant):
+    delta = np.zeros(size, dtype=np.float64)
+    decoded = values.astype(np.float64)
+    if quant is not None:
+        decoded = decoded * quant["scale"]
+    if indices is None:
+        delta[:] = decoded
+    else:
+        delta[indices.astype(np.intp)] = decoded
+    return delta
+
+
+def _candidates(delta, quantize):
+    changed = np.flatnonzero(np.abs(delta) > ZERO_TOLERANCE)
+    layouts = [(None, delta)]
+    if changed.size < delta.size:
+        layouts.append((changed.astype(np.uint32), delta[changed]))
+    value_encodings = ["float64"]
+    if quantize in ("auto", "float32"):
+        value_encodings.append("float32")
+    if quantize in ("auto", "int8"):
+        value_encodings.append("int8")
+    for indices, values in layouts:
+        for encoding in value_encodings:
+            if encoding == "float64":
+                yield indices, values.astype(np.float64), None
+            elif encoding == "float32":
+                yield indices, values.astype(np.float32), None
+            else:
+                peak = float(np.max(np.abs(values))) if values.size else 0.0
+                scale = peak / 127.0 if peak > 0 else 1.0
+                yield indices, np.clip(np.rint(values / scale), -127, 127).astype(np.int8), {"dtype": "int8", "scale": scale}
+
+
+def _model_fields(model) -> tuple:
+    header, arrays = serialization.linear_header(model)
+    fields = {
+        "estimator": header["estimator"],
+        "params": header["params"],
+        "attrs": header["attrs"],
+        "coef_shape": list(np.shape(model.coef_)),
+        "intercept_shape": list(np.shape(model.intercept_)),
+    }
+    return fields, {name: arrays[name] for name in ("classes_", "n_iter_") if name in arrays}
+
+
+def encode_delta(model, base_model, base_model_id: int, base_version: int, quantize: str = "auto",
+                 compress: bool = True) -> bytes:
+    """Encode `model` as a delta against `base_model` (the global base_model_id/base_version).
+
+    quantize: None (exact float64), "float32", "int8" or "auto" (smallest packed
+    blob whose reconstruction error stays within QUANTIZATION_TOLERANCE).
+    """
+    fields, extra_arrays = _model_fields(model)
+    base_fields, base_arrays = _model_fields(base_model)
+    params = linear_params(model)
+    base = linear_params(base_model)
+    if params.shape != base.shape:
+        raise ValueError(f"Model has {params.size} parameters but base model has {base.size}")
+    delta = params - base
+    tolerance = QUANTIZATION_TOLERANCE * max(1.0, float(np.max(np.abs(params))))
+
+    shared_header = {"kind": "linear_delta", "base_model_id": int(base_model_id),
+                     "base_version": int(base_version), "size": int(delta.size)}
+    shared_header.update({key: value for key, value in fields.items() if value != base_fields[key]})
+    # Arrays are only inherited from a base of the same estimator; apply_delta mirrors this.
+    inherit_arrays = "estimator" not in shared_header
+    shared_arrays = {name: array for name, array in extra_arrays.items()
+                     if not (inherit_arrays and name in base_arrays and array.dtype == base_arrays[name].dtype
+                             and np.array_equal(array, base_arrays[name]))}
+
+    best = None
+    for indices, values, quant in _candidates(delta, quantize):
+        reconstructed = base + _expand(values, indices, delta.size, quant)
+        lossless = values.dtype == np.float64
+        if not lossless and np.max(np.abs(reconstructed - params), initial=0.0) > tolerance:
+            continue
+        delta_arrays = {"values": values}
+        if indices is not None:
+            delta_arrays["indices"] = indices
+        delta_arrays.update(shared_arrays)
+        delta_header = dict(shared_header, layout="sparse" if indices is not None else "dense",
+                            quantization=quant, checksum=params_checksum(reconstructed))
+        # Rank by the packed size: container alignment, header and compression all count.
+        blob = serialization.pack_container(delta_header, delta_arrays, compress)
+        if best is None or len(blob) < len(best):
+            best = blob
+    return best
+
+
+def read_delta_header(blob) -> dict:
+    header = serialization.read_header(blob)
+    if header.get("kind") != "linear_delta":
+        raise ValueError("Blob is not a linear parameter delta")
+    return header
+
+
+def apply_delta(blob, base_model):
+    """Reconstruct the full client model from a delta blob and its base global model.
+
+    Raises DeltaChecksumError if the reconstructed parameters don't match the
+    checksum the client computed.
+    """
+    header, arrays = serialization.unpack_container(blob)
+    if header.get("kind") != "linear_delta":
+        raise ValueError("Blob is not a linear parameter delta")
+    base = linear_params(base_model)
+    if base.size != header["size"]:
+        raise ValueError(f"Base model has {base.size} parameters, delta expects {header['size']}")
+
+    params = base + _expand(arrays["values"], arrays.get("indices"), header["size"], header["quantization"])
+    if params_checksum(params) != header["checksum"]:
+        raise DeltaChecksumError(
+            f"Checksum mismatch reconstructing delta against model {header['base_model_id']} v{header['base_version']}"
+        )
+
+    # Fields the encoder left out are the base model's.
+    base_fields, base_arrays = _model_fields(base_model)
+    fields = {key: header.get(key, value) for key, value in base_fields.items()}
+    n_coef = int(np.prod(fields["coef_shape"]))
+    model_arrays = {
+        "coef_": params[:n_coef].reshape(fields["coef_shape"]),
+        "intercept_": params[n_coef:].reshape(fields["intercept_shape"]),
+    }
+    inherit_arrays = "estimator" not in header
+    for name in ("classes_", "n_iter_"):
+        if name in arrays:
+            model_arrays[name] = arrays[name]
+        elif inherit_arrays and name in base_arrays:
+            model_arrays[name] = base_arrays[name]
+    return serialization.build_linear_model(fields, model_arrays)
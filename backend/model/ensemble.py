@@ -0,0 +1,31 @@
+# backend/model/ensemble.py
+
+import numpy as np
+
+
+class WeightedEnsembleClassifier:
+    """Probability-space weighted average of fitted client classifiers (bagging-style global model)."""
+
+    def __init__(self, estimators, weights=None):
+        self.estimators = list(estimators)
+        if weights is None:
+            weights = np.ones(len(self.estimators))
+        weights = np.asarray(weights, dtype=np.float64)
+        self.weights = weights / weights.sum()
+        self.classes_ = np.asarray(self.estimators[0].classes_)
+
+    def predict_proba(self, X) -> np.ndarray:
+        proba = None
+        for weight, estimator in zip(self.weights, self.estimators):
+            p = weight * np.asarray(estimator.predict_proba(X))
+            proba = p if proba is None else proba + p
+        return proba
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def get_params(self, deep=False):
+        return {"weights": self.weights.tolist()}
+
+    def __repr__(self):
+        return f"WeightedEnsembleClassifier(n_estimators={len(self.estimators)})"
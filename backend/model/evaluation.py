@@ -0,0 +1,170 @@
+# backend/model/evaluation.py
+#
+# Classification metrics derived from one confusion-matrix pass.
+#
+# Every candidate (a model, a threshold, or both) is reduced to a KxK confusion
+# matrix with a single np.bincount over (candidate, true, predicted) indices;
+# accuracy, per-class precision/recall/F1 and macro F1 then come from the
+# stacked matrices with array arithmetic. Log loss is computed from
+# probabilities only - never from hard labels.
+#
+#   evaluate(y_test, y_pred, proba=model.predict_proba(X_test))
+#   evaluate_many(y_holdout, proba=np.stack([m.predict_proba(X)[:, 1] for m in models]),
+#                 thresholds=np.linspace(0.1, 0.9, 17))
+
+import numpy as np
+
+LOG_LOSS_EPS = 1e-15
+
+
+def _label_index(values: np.ndarray, labels: np.ndarray) -> np.ndarray:
+    idx = np.searchsorted(labels, values)
+    idx = np.clip(idx, 0, len(labels) - 1)
+    if not np.array_equal(labels[idx], values):
+        raise ValueError(f"Found labels outside {labels.tolist()}")
+    return idx
+
+
+def confusion_matrices(y_true, y_pred, labels) -> np.ndarray:
+    """Confusion matrices of shape (..., K, K) for a (..., n) stack of predictions; rows are true labels."""
+    labels = np.asarray(labels)
+    y_pred = np.asarray(y_pred)
+    true_idx = _label_index(np.asarray(y_true), labels)
+    return _confusion_from_index(true_idx, _label_index(y_pred, labels), len(labels))
+
+
+def _confusion_from_index(true_idx: np.ndarray, pred_idx: np.ndarray, k: int) -> np.ndarray:
+    lead_shape, n = pred_idx.shape[:-1], pred_idx.shape[-1]
+    candidates = int(np.prod(lead_shape, dtype=np.int64))
+    flat = np.arange(candidates)[:, None] * (k * k) + (true_idx * k)[None, :] + pred_idx.reshape(candidates, n)
+    counts = np.bincount(flat.ravel(), minlength=candidates * k * k)
+    return counts.reshape(*lead_shape, k, k)
+
+
+def metrics_from_confusion(cm: np.ndarray) -> dict:
+    """Accuracy, per-class precision/recall/F1 and macro F1 from (..., K, K) confusion matrices."""
+    cm = np.asarray(cm, dtype=np.float64)
+    true_pos = np.diagonal(cm, axis1=-2, axis2=-1)
+    actual = cm.sum(axis=-1)
+    predicted = cm.sum(axis=-2)
+    total = actual.sum(axis=-1)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        precision = np.where(predicted > 0, true_pos / predicted, 0.0)
+        recall = np.where(actual > 0, true_pos / actual, 0.0)
+        f1 = np.where(actual + predicted > 0, 2 * true_pos / (actual + predicted), 0.0)
+        accuracy = np.where(total > 0, true_pos.sum(axis=-1) / total, 0.0)
+    return {
+        "accuracy": accuracy,
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+        "macro_f1": f1.mean(axis=-1),
+        "support": actual,
+    }
+
+
+def log_loss_from_proba(y_true, proba, labels) -> np.ndarray:
+    """Mean negative log-likelihood for (..., n) positive-class or (..., n, K) probabilities."""
+    labels = np.asarray(labels)
+    proba = np.asarray(proba, dtype=np.float64)
+    true_idx = _label_index(np.asarray(y_true), labels)
+    if proba.ndim >= 2 and proba.shape[-1] == len(labels) and proba.shape[-2] == len(true_idx):
+        p_true = np.take_along_axis(proba, np.broadcast_to(true_idx[:, None], proba.shape[:-1] + (1,)),
+                                    axis=-1)[..., 0]
+        p_true = p_true / proba.sum(axis=-1)
+    else:
+        if len(labels) != 2:
+            raise ValueError("Positive-class probabilities need exactly two labels")
+        p_true = np.where(true_idx == 1, proba, 1.0 - proba)
+    return -np.log(np.clip(p_true, LOG_LOSS_EPS, 1.0)).mean(axis=-1)
+
+
+def _default_labels(y_true, y_pred=None) -> np.ndarray:
+    values = [np.unique(np.asarray(y_true))]
+    if y_pred is not None:
+        values.append(np.unique(np.asarray(y_pred)))
+    labels = np.unique(np.concatenate(values))
+    if len(labels) == 1:
+        # A single-class test split still has two outcomes to score against.
+        labels = np.union1d(labels, np.asarray([0, 1], dtype=labels.dtype))
+    return labels
+
+
+def evaluate_many(y_true, y_pred=None, proba=None, thresholds=None, labels=None) -> dict:
+    """Score a stack of candidates in one pass.
+
+    y_pred:     (M, n) hard predictions of M models, or
+    proba:      (M, n) positive-class probabilities of M binary models; with
+                `thresholds` (T,) every model is scored at every threshold and
+                the metric arrays have shape (M, T), otherwise (M,) at 0.5.
+    Per-class arrays (precision/recall/f1/support) get a trailing K axis in
+    `labels` order. "log_loss" (M,) is present whenever `proba` is given.
+    """
+    if y_pred is None and proba is None:
+        raise ValueError("Pass y_pred or proba")
+    y_true = np.asarray(y_true)
+
+    if proba is not None:
+        proba = np.asarray(proba, dtype=np.float64)
+        if proba.ndim == 3:  # (M, n, 2) predict_proba output
+            proba = proba[..., 1]
+        labels = np.asarray(labels) if labels is not None else _default_labels(y_true)
+        if len(labels) != 2:
+            raise ValueError("Threshold scoring needs a binary problem")
+        cuts = np.asarray([0.5] if thresholds is None else thresholds, dtype=np.float64)
+        # Positive iff p > threshold, matching sklearn's and XGBoost's predict() at 0.5.
+        positive = proba[:, None, :] > cuts[None, :, None]
+        if thresholds is None:
+            positive = positive[:, 0, :]
+        # Predicted label index is 0/1 already; skip the label lookup.
+        cm = _confusion_from_index(_label_index(y_true, labels), positive.view(np.uint8), 2)
+    else:
+        y_pred = np.asarray(y_pred)
+        labels = np.asarray(labels) if labels is not None else _default_labels(y_true, y_pred)
+        cm = confusion_matrices(y_true, y_pred, labels)
+
+    result = metrics_from_confusion(cm)
+    result["labels"] = labels
+    if proba is not None:
+        result["log_loss"] = log_loss_from_proba(y_true, proba, labels)
+    if thresholds is not None:
+        result["thresholds"] = np.asarray(thresholds, dtype=np.float64)
+    return result
+
+
+def evaluate(y_true, y_pred=None, proba=None, labels=None, threshold: float = None) -> dict:
+    """Metrics for one model as plain Python values; per-class metrics are dicts keyed by label.
+
+    proba may be predict_proba() output (n, K) or positive-class probabilities (n,).
+    Without y_pred, predictions are derived from proba (binary: p > threshold, default 0.5).
+    """
+    y_true = np.asarray(y_true)
+    if proba is not None:
+        proba = np.asarray(proba, dtype=np.float64)
+    if y_pred is None:
+        if proba is None:
+            raise ValueError("Pass y_pred or proba")
+        if proba.ndim == 2 and proba.shape[1] > 2:
+            labels = np.asarray(labels) if labels is not None else np.unique(y_true)
+            y_pred = labels[np.argmax(proba, axis=1)]
+        else:
+            positive = proba[:, 1] if proba.ndim == 2 else proba
+            labels = np.asarray(labels) if labels is not None else _default_labels(y_true)
+            y_pred = labels[(positive > (0.5 if threshold is None else threshold)).astype(np.intp)]
+    y_pred = np.asarray(y_pred)
+    labels = np.asarray(labels) if labels is not None else _default_labels(y_true, y_pred)
+
+    metrics = metrics_from_confusion(confusion_matrices(y_true, y_pred[None, :], labels)[0])
+    keys = [label.item() for label in labels]
+    result = {
+        "accuracy": float(metrics["accuracy"]),
+        "macro_f1": float(metrics["macro_f1"]),
+        "precision": dict(zip(keys, metrics["precision"].tolist())),
+        "recall": dict(zip(keys, metrics["recall"].tolist())),
+        "f1": dict(zip(keys, metrics["f1"].tolist())),
+        "support": dict(zip(keys, metrics["support"].astype(int).tolist())),
+    }
+    if proba is not None:
+        result["log_loss"] = float(log_loss_from_proba(y_true, proba, labels))
+    return result
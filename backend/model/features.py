@@ -0,0 +1,30 @@
+# backend/model/features.py
+
+import numpy as np
+
+# --- Define the raw input columns, matching the order in SingleFeatureInput ---
+RAW_INPUT_COLUMNS = [
+    "HighBP", "HighChol", "CholCheck", "BMI", "Smoker", "Stroke",
+    "HeartDiseaseorAttack", "PhysActivity", "Fruits", "Veggies",
+    "HvyAlcoholConsump", "AnyHealthcare", "NoDocbcCost", "GenHlth",
+    "MentHlth", "PhysHlth", "DiffWalk", "Sex", "Age", "Education", "Income"
+]
+
+# --- Define the FINAL list of features that the model was trained ON ---
+# Only raw features: the global model is trained on the 21 inputs above, in this order.
+MODEL_TRAINING_FEATURES = list(RAW_INPUT_COLUMNS)
+
+NUM_FEATURES = len(MODEL_TRAINING_FEATURES)
+
+
+def features_to_array(rows, columns=MODEL_TRAINING_FEATURES) -> np.ndarray:
+    """Pack a sequence of SingleFeatureInput-like objects into one C-contiguous
+    float64 matrix of shape (len(rows), len(columns)), in `columns` order."""
+    n_rows = len(rows)
+    n_cols = len(columns)
+    flat = np.fromiter(
+        (getattr(row, col) for row in rows for col in columns),
+        dtype=np.float64,
+        count=n_rows * n_cols,
+    )
+    return flat.reshape(n_rows, n_cols)
@@ -1,47 +1,168 @@
 import pickle
 import os
-from backend.db.connection import get_db_connection
+import sys
+from backend.db.connection import db_cursor, load_config_section
+from backend.model import serialization
+from backend.model.delta import apply_delta
+from backend.model.cache import default_cache, blob_sha256
+from backend.model.blob_store import get_blob_store
+from backend.telemetry import time_db
 
-def fetch_global_model(model_id: int = 1, version: int = None):
-    conn = get_db_connection()
-    cursor = conn.cursor()
 
-    if version:
-        query = """
+# Global models published before the NNMF format are raw pickles written by the
+# central authority; unpickling them is an explicit opt-in (config.yaml: serialization).
+ALLOW_LEGACY_PICKLE = str(os.getenv(
+    "NERONODE_ALLOW_LEGACY_PICKLE",
+    load_config_section("serialization").get("allow_legacy_pickle", False),
+)).lower() in ("1", "true", "yes")
+
+
+def _blob_to_bytes(model_blob):
+    if isinstance(model_blob, str):
+        return model_blob.encode('latin1')
+    return bytes(model_blob)
+
+
+def _load_blob(model_blob, allow_pickle: bool = None):
+    if allow_pickle is None:
+        allow_pickle = ALLOW_LEGACY_PICKLE
+    return serialization.loads(_blob_to_bytes(model_blob), allow_pickle=allow_pickle)
+
+
+def fetch_global_model_metadata(model_id: int = 1, version: int = None):
+    """Return (version, sha256, size, in_blob_store) of a global model without transferring its blob.
+
+    Rows written through the blob store carry blob_hash/blob_size; legacy rows
+    with an inline model_blob are hashed server-side.
+    """
+    with time_db("fetch_model_metadata"):
+        return _fetch_global_model_metadata(model_id, version)
+
+
+def _fetch_global_model_metadata(model_id: int, version):
+    with db_cursor() as cursor:
+        if version:
+            query = """
+                SELECT version, COALESCE(blob_hash, SHA2(model_blob, 256)),
+                       COALESCE(blob_size, LENGTH(model_blob)), blob_hash IS NOT NULL
+                FROM central_updates
+                WHERE model_id = %s AND version = %s
+            """
+            cursor.execute(query, (model_id, version))
+        else:
+            query = """
+                SELECT version, COALESCE(blob_hash, SHA2(model_blob, 256)),
+                       COALESCE(blob_size, LENGTH(model_blob)), blob_hash IS NOT NULL
+                FROM central_updates
+                WHERE model_id = %s
+                ORDER BY version DESC
+                LIMIT 1
+            """
+            cursor.execute(query, (model_id,))
+        row = cursor.fetchone()
+
+    if not row:
+        raise ValueError(f"Global model (id: {model_id}, version: {version if version else 'latest'}) not found in central_updates")
+    return row[0], row[1], row[2], bool(row[3])
+
+
+def _fetch_global_model_blob(model_id: int, version):
+    with time_db("fetch_model_blob"):
+        return _query_global_model_blob(model_id, version)
+
+
+def _query_global_model_blob(model_id: int, version):
+    with db_cursor() as cursor:
+        cursor.execute("""
             SELECT model_blob
             FROM central_updates
             WHERE model_id = %s AND version = %s
-        """
-        cursor.execute(query, (model_id, version))
-    else:
-        query = """
-            SELECT model_blob
-            FROM central_updates
-            WHERE model_id = %s
-            ORDER BY version DESC
-            LIMIT 1
-        """
-        cursor.execute(query, (model_id,))
-
-    row = cursor.fetchone()
-    conn.close()
+        """, (model_id, version))
+        row = cursor.fetchone()
 
     if not row:
-        raise ValueError(f"Global model (id: {model_id}, version: {version if version else 'latest'}) not found in central_updates")
+        raise ValueError(f"Global model (id: {model_id}, version: {version}) not found in central_updates")
+    return row[0]
 
-    model_blob = row[0]
-    if isinstance(model_blob, str):
-        try:
-            model = pickle.loads(model_blob.encode('latin1'))
-        except (UnicodeDecodeError, TypeError):
-            model = pickle.loads(model_blob)
+
+def fetch_global_model(model_id: int = 1, version: int = None, cache=default_cache):
+    # Resolve the version and content hash with a metadata-only query, then serve
+    # the blob from the local cache when it is already on disk.
+    resolved_version, sha256, _, in_blob_store = fetch_global_model_metadata(model_id, version)
+
+    if cache is not None and sha256:
+        blob = cache.get(model_id, resolved_version, sha256)
+        if blob is not None:
+            return _load_blob(blob)
+
+    if in_blob_store:
+        with time_db("fetch_model_blob"):
+            model_blob = get_blob_store().get(sha256)
     else:
-        model = pickle.loads(model_blob)
+        model_blob = _fetch_global_model_blob(model_id, resolved_version)
+
+    if cache is not None and sha256:
+        blob = _blob_to_bytes(model_blob)
+        if blob_sha256(blob) == sha256:
+            try:
+                cache.put(model_id, resolved_version, sha256, blob)
+            except OSError as e:
+                print(f"ModelCache: could not cache model {model_id} v{resolved_version}: {e}", file=sys.stderr)
+        else:
+            print(f"ModelCache: hash mismatch for model {model_id} v{resolved_version}; not caching", file=sys.stderr)
 
-    return model
+    return _load_blob(model_blob)
 
 def save_model_from_db(model_id: int = 1, version: int = None, save_path: str = "backend/model/global_model.pkl"):
     model = fetch_global_model(model_id, version)
     os.makedirs(os.path.dirname(save_path), exist_ok=True)
     with open(save_path, "wb") as f:
-        pickle.dump(model, f)
\ No newline at end of file
+        pickle.dump(model, f)
+
+
+def list_global_versions(model_id: int = 1):
+    """Return the published versions of a global model, newest first (metadata only, no blobs)."""
+    with time_db("list_model_versions"):
+        return _query_global_versions(model_id)
+
+
+def _query_global_versions(model_id: int):
+    with db_cursor() as cursor:
+        # version is an INT since migration 2, so this sorts numerically on idx_central_model_version.
+        cursor.execute("""
+            SELECT DISTINCT version
+            FROM central_updates
+            WHERE model_id = %s AND version IS NOT NULL
+            ORDER BY version DESC
+        """, (model_id,))
+        rows = cursor.fetchall()
+    return [int(row[0]) for row in rows]
+
+
+def load_client_update(update_id: int, allow_pickle: bool = False):
+    """Load one client_updates model, rebuilding delta-encoded updates against their base global version."""
+    with time_db("fetch_client_update"), db_cursor() as cursor:
+        cursor.execute("""
+            SELECT model_id, blob_hash, model_blob, update_encoding, base_version
+            FROM client_updates
+            WHERE update_id = %s
+        """, (update_id,))
+        row = cursor.fetchone()
+
+    if not row:
+        raise ValueError(f"Client update {update_id} not found in client_updates")
+    model_id, blob_hash, model_blob, update_encoding, base_version = row
+    return decode_client_update(model_id, blob_hash, model_blob, update_encoding, base_version, allow_pickle)
+
+
+def decode_client_update(model_id, blob_hash, model_blob, update_encoding, base_version, allow_pickle: bool = False):
+    """Turn one client_updates row's blob columns into a model."""
+    if blob_hash:
+        with time_db("fetch_model_blob"):
+            model_blob = get_blob_store().get(blob_hash)
+    blob = _blob_to_bytes(model_blob)
+    if update_encoding == "delta":
+        base_model = fetch_global_model(model_id=model_id, version=base_version)
+        return apply_delta(blob, base_model)
+    # Client blobs come from external hosts: legacy pickles only with an explicit opt-in.
+    return _load_blob(blob, allow_pickle=allow_pickle)
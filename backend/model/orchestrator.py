@@ -0,0 +1,282 @@
+# backend/model/orchestrator.py
+#
+# Asynchronous federation round scheduler.
+#
+#   python -m backend.model.orchestrator --model-id 1 --clients 4 --quorum 3 --deadline 3600 [--metrics-port 9101]
+#
+# Each round is recorded in fl_rounds (clients read the open round from there or
+# from GET /rounds/current), with each client's arrival time in
+# fl_round_arrivals and the round's wall-clock duration once it closes; the
+# same numbers are exported as Prometheus histograms on --metrics-port. The orchestrator polls client_updates for the open
+# round and aggregates as soon as K of N clients have reported, or when the
+# deadline passes with at least `min_clients` updates. Aggregation runs in a
+# worker thread, the result is published as the next global version, and the
+# next round opens immediately. Updates that arrive after a round closed are
+# counted as stragglers and left out.
+
+import argparse
+import asyncio
+import sys
+import time
+from functools import partial
+
+from prometheus_client import start_http_server
+
+from backend.db.connection import db_cursor
+from backend.telemetry import ROUND_CLIENT_ARRIVAL, ROUND_DURATION, time_db
+
+
+def get_current_round(model_id: int):
+    """The most recent fl_rounds row for a model as a dict, or None."""
+    with time_db("fetch_current_round"), db_cursor(dictionary=True) as cursor:
+        cursor.execute("""
+            SELECT model_id, round_num, status, quorum, expected_clients,
+                   opened_at, deadline_at, closed_at, published_version
+            FROM fl_rounds
+            WHERE model_id = %s
+            ORDER BY round_num DESC
+            LIMIT 1
+        """, (model_id,))
+        return cursor.fetchone()
+
+
+def get_round_summary(model_id: int):
+    """The most recent round with its duration and per-client arrival seconds, or None."""
+    with time_db("fetch_round_summary"), db_cursor(dictionary=True) as cursor:
+        cursor.execute("""
+            SELECT model_id, round_num, status, quorum, expected_clients,
+                   opened_at, deadline_at, closed_at, published_version, duration_seconds
+            FROM fl_rounds
+            WHERE model_id = %s
+            ORDER BY round_num DESC
+            LIMIT 1
+        """, (model_id,))
+        current = cursor.fetchone()
+        if current is None:
+            return None
+        cursor.execute("""
+            SELECT client_id, arrival_seconds
+            FROM fl_round_arrivals
+            WHERE model_id = %s AND round_num = %s
+            ORDER BY arrival_seconds
+        """, (model_id, current["round_num"]))
+        current["arrivals"] = {row["client_id"]: row["arrival_seconds"] for row in cursor.fetchall()}
+        return current
+
+
+class RoundOrchestrator:
+    def __init__(self, model_id: int, expected_clients: int, quorum: int = None, deadline_seconds: float = 3600.0,
+                 min_clients: int = 1, poll_interval: float = 5.0, aggregate_fn=None):
+        self.model_id = model_id
+        self.expected_clients = expected_clients
+        self.quorum = quorum or expected_clients
+        self.deadline_seconds = deadline_seconds
+        self.min_clients = min_clients
+        self.poll_interval = poll_interval
+        if aggregate_fn is None:
+            from backend.model.aggregate import aggregate_round
+            aggregate_fn = aggregate_round
+        # (model_id, round_num, clients=[client_id, ...]) -> summary dict with "version"
+        self.aggregate_fn = aggregate_fn
+
+        self.round_num = None
+        self.opened_monotonic = None
+        self.arrivals = {}  # client_id -> seconds after round open
+        self.history = []
+        self._stop = asyncio.Event()
+
+    # --- DB state ---
+    def _open_round(self, round_num: int):
+        with time_db("open_round"), db_cursor(commit=True) as cursor:
+            cursor.execute("""
+                INSERT INTO fl_rounds (model_id, round_num, status, quorum, expected_clients, deadline_at)
+                VALUES (%s, %s, 'open', %s, %s, NOW(6) + INTERVAL %s SECOND)
+                ON DUPLICATE KEY UPDATE status = 'open'
+            """, (self.model_id, round_num, self.quorum, self.expected_clients, int(self.deadline_seconds)))
+
+    def _set_status(self, round_num: int, status: str, published_version=None, duration_seconds=None):
+        with time_db("update_round"), db_cursor(commit=True) as cursor:
+            cursor.execute("""
+                UPDATE fl_rounds
+                SET status = %s,
+                    published_version = COALESCE(%s, published_version),
+                    duration_seconds = COALESCE(%s, duration_seconds),
+                    closed_at = IF(%s IN ('closed', 'failed'), NOW(6), closed_at)
+                WHERE model_id = %s AND round_num = %s
+            """, (status, published_version, duration_seconds, status, self.model_id, round_num))
+
+    def _extend_deadline(self, round_num: int):
+        with time_db("update_round"), db_cursor(commit=True) as cursor:
+            cursor.execute("""
+                UPDATE fl_rounds
+                SET deadline_at = NOW(6) + INTERVAL %s SECOND
+                WHERE model_id = %s AND round_num = %s
+            """, (int(self.deadline_seconds), self.model_id, round_num))
+
+    def _record_arrivals(self, round_num: int, arrivals: dict):
+        with time_db("record_round_arrivals"), db_cursor(commit=True) as cursor:
+            cursor.executemany("""
+                INSERT INTO fl_round_arrivals (model_id, round_num, client_id, arrival_seconds)
+                VALUES (%s, %s, %s, %s)
+                ON DUPLICATE KEY UPDATE arrival_seconds = arrival_seconds
+            """, [(self.model_id, round_num, client_id, seconds) for client_id, seconds in arrivals.items()])
+
+    def _poll_arrivals(self, round_num: int) -> dict:
+        """client_id -> seconds between round open and that client's first update."""
+        with time_db("poll_round_arrivals"), db_cursor() as cursor:
+            cursor.execute("""
+                SELECT cu.client_id,
+                       TIMESTAMPDIFF(MICROSECOND, r.opened_at, MIN(cu.uploaded_at)) / 1000000
+                FROM client_updates cu
+                JOIN fl_rounds r ON r.model_id = cu.model_id AND r.round_num = cu.round_num
+                WHERE cu.model_id = %s AND cu.round_num = %s
+                GROUP BY cu.client_id
+            """, (self.model_id, round_num))
+            return {str(client_id): max(0.0, float(seconds or 0)) for client_id, seconds in cursor.fetchall()}
+
+    def _resume_round_num(self) -> int:
+        current = get_current_round(self.model_id)
+        if current is None:
+            with db_cursor() as cursor:
+                cursor.execute("SELECT COALESCE(MAX(round_num), 0) FROM client_updates WHERE model_id = %s",
+                               (self.model_id,))
+                return int(cursor.fetchone()[0]) + 1
+        if current["status"] in ("open", "aggregating"):
+            return int(current["round_num"])
+        return int(current["round_num"]) + 1
+
+    # --- Round loop ---
+    async def _db(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(None, partial(fn, *args))
+
+    async def run_round(self, round_num: int) -> dict:
+        self.round_num = round_num
+        self.arrivals = {}
+        self.opened_monotonic = time.monotonic()
+        await self._db(self._open_round, round_num)
+        deadline = self.opened_monotonic + self.deadline_seconds
+        print(f"Orchestrator: round {round_num} open (quorum {self.quorum}/{self.expected_clients}, "
+              f"deadline {self.deadline_seconds:.0f}s)", file=sys.stderr)
+
+        trigger = None
+        while not self._stop.is_set():
+            arrivals = await self._db(self._poll_arrivals, round_num)
+            new_arrivals = {client_id: seconds for client_id, seconds in arrivals.items()
+                            if client_id not in self.arrivals}
+            if new_arrivals:
+                await self._db(self._record_arrivals, round_num, new_arrivals)
+                for seconds in new_arrivals.values():
+                    ROUND_CLIENT_ARRIVAL.labels(str(self.model_id)).observe(seconds)
+            self.arrivals = arrivals
+            if len(arrivals) >= self.quorum:
+                trigger = "quorum"
+                break
+            if time.monotonic() >= deadline:
+                if len(arrivals) >= self.min_clients:
+                    trigger = "deadline"
+                    break
+                # Nobody usable yet: keep the round open rather than publish nothing.
+                deadline = time.monotonic() + self.deadline_seconds
+                await self._db(self._extend_deadline, round_num)
+                print(f"Orchestrator: round {round_num} deadline passed with {len(arrivals)} client(s); extending",
+                      file=sys.stderr)
+            try:
+                await asyncio.wait_for(self._stop.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+        if trigger is None:
+            return {"round_num": round_num, "status": "stopped"}
+
+        await self._db(self._set_status, round_num, "aggregating")
+        # Aggregate exactly the clients counted above; later uploads to this round are stragglers.
+        reported = sorted(self.arrivals)
+        try:
+            summary = await self._db(partial(self.aggregate_fn, self.model_id, round_num, clients=reported))
+        except Exception as e:
+            print(f"Orchestrator: aggregation of round {round_num} failed: {e}", file=sys.stderr)
+            await self._db(self._set_status, round_num, "failed")
+            record = {"round_num": round_num, "status": "failed", "error": str(e), "trigger": trigger,
+                      "clients": reported, "arrivals": dict(self.arrivals)}
+            self._record(record)
+            return record
+
+        version = summary.get("version")
+        wall_clock = time.monotonic() - self.opened_monotonic
+        await self._db(self._set_status, round_num, "closed", version, wall_clock)
+        ROUND_DURATION.labels(str(self.model_id)).observe(wall_clock)
+        record = {
+            "round_num": round_num, "status": "closed", "trigger": trigger, "published_version": version,
+            "wall_clock_seconds": wall_clock, "clients": reported, "arrivals": dict(self.arrivals),
+            "stragglers": max(0, self.expected_clients - len(reported)),
+        }
+        self._record(record)
+        print(f"Orchestrator: round {round_num} closed by {trigger} with {len(reported)} client(s) "
+              f"in {wall_clock:.1f}s; published v{version}", file=sys.stderr)
+        return record
+
+    def _record(self, record: dict):
+        self.history.append(record)
+        del self.history[:-50]
+
+    async def run(self, start_round: int = None, max_rounds: int = None):
+        round_num = start_round if start_round is not None else await self._db(self._resume_round_num)
+        completed = 0
+        while not self._stop.is_set() and (max_rounds is None or completed < max_rounds):
+            record = await self.run_round(round_num)
+            if record["status"] == "stopped":
+                break
+            if record["status"] == "closed":
+                round_num += 1
+            else:
+                # Failed aggregation: retry the same round after a pause.
+                try:
+                    await asyncio.wait_for(self._stop.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+            completed += 1
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self) -> dict:
+        return {
+            "model_id": self.model_id,
+            "round_num": self.round_num,
+            "quorum": self.quorum,
+            "expected_clients": self.expected_clients,
+            "elapsed_seconds": (time.monotonic() - self.opened_monotonic) if self.opened_monotonic else None,
+            "arrivals": dict(self.arrivals),
+            "history": list(self.history),
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Federation round orchestrator (K-of-N quorum with deadlines)")
+    parser.add_argument("--model-id", type=int, default=1)
+    parser.add_argument("--clients", type=int, required=True, help="expected number of clients (N)")
+    parser.add_argument("--quorum", type=int, default=None, help="aggregate once K clients reported (default N)")
+    parser.add_argument("--deadline", type=float, default=3600.0, help="seconds before aggregating with fewer")
+    parser.add_argument("--min-clients", type=int, default=1)
+    parser.add_argument("--poll", type=float, default=5.0)
+    parser.add_argument("--start-round", type=int, default=None)
+    parser.add_argument("--rounds", type=int, default=None, help="stop after this many rounds")
+    parser.add_argument("--trees", action="store_true", help="XGBoost track: use tree-ensemble aggregation")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve the round histograms for Prometheus on this port")
+    args = parser.parse_args()
+
+    if args.metrics_port is not None:
+        start_http_server(args.metrics_port)
+        print(f"Orchestrator: Prometheus metrics on :{args.metrics_port}/metrics", file=sys.stderr)
+
+    aggregate_fn = None
+    if args.trees:
+        from backend.model.tree_aggregate import aggregate_tree_round
+        aggregate_fn = aggregate_tree_round
+    orchestrator = RoundOrchestrator(args.model_id, args.clients, args.quorum, args.deadline,
+                                     args.min_clients, args.poll, aggregate_fn)
+    asyncio.run(orchestrator.run(args.start_round, args.rounds))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+# backend/model/prediction_cache.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from backend.model.features import MODEL_TRAINING_FEATURES
+
+PREDICTION_CACHE_ENABLED = os.getenv("NERONODE_PREDICTION_CACHE", "1").lower() in ("1", "true", "yes")
+PREDICTION_CACHE_MAX_ENTRIES = int(os.getenv("NERONODE_PREDICTION_CACHE_SIZE", "100000"))
+PREDICTION_CACHE_TTL_SECONDS = float(os.getenv("NERONODE_PREDICTION_CACHE_TTL", "3600"))
+
+# Continuous inputs kept as float32; every other feature is a binary flag or a
+# small ordinal code that fits in one byte.
+FLOAT_FEATURES = ["BMI", "MentHlth", "PhysHlth"]
+_FLOAT_IDX = np.array([MODEL_TRAINING_FEATURES.index(c) for c in FLOAT_FEATURES])
+_CODE_IDX = np.array([i for i, c in enumerate(MODEL_TRAINING_FEATURES) if c not in FLOAT_FEATURES])
+
+
+def pack_rows(X: np.ndarray):
+    """Encode each feature row as a compact bytes key (18 uint8 codes + 3 float32 = 30 bytes).
+
+    Rows whose codes are not integers in 0..255, or whose floats don't survive
+    a float32 round-trip, fall back to a tagged float64 encoding so distinct
+    inputs never collide.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    codes = X[:, _CODE_IDX]
+    floats = X[:, _FLOAT_IDX]
+    floats32 = floats.astype(np.float32)
+    compact = ((codes >= 0) & (codes <= 255) & (codes == np.rint(codes))).all(axis=1)
+    compact &= (floats32.astype(np.float64) == floats).all(axis=1)
+    packed = np.concatenate(
+        (codes.astype(np.uint8), np.ascontiguousarray(floats32).view(np.uint8)), axis=1
+    )
+    return [packed[i].tobytes() if compact[i] else b"\xff" + X[i].tobytes() for i in range(X.shape[0])]
+
+
+class PredictionCache:
+    """Bounded LRU + TTL cache of predictions keyed by (model version, packed row).
+
+    The cache tracks the model key it was filled under and clears itself as
+    soon as it sees a different one, so a registry swap can never serve stale
+    predictions.
+    """
+
+    def __init__(self, max_entries: int = PREDICTION_CACHE_MAX_ENTRIES, ttl_seconds: float = PREDICTION_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # packed row -> (prediction, expires_at)
+        self._model_key = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def _check_model(self, model_key):
+        if model_key != self._model_key:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._model_key = model_key
+
+    def predict(self, model_key, X: np.ndarray, predict_fn) -> np.ndarray:
+        """Return predictions for X, calling `predict_fn` once on the cache misses only."""
+        keys = pack_rows(X)
+        now = time.monotonic()
+        results = [None] * len(keys)
+        miss_idx = []
+        with self._lock:
+            self._check_model(model_key)
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None:
+                    if entry[1] > now:
+                        self._entries.move_to_end(key)
+                        results[i] = entry[0]
+                        continue
+                    del self._entries[key]
+                    self.expirations += 1
+                miss_idx.append(i)
+            self.hits += len(keys) - len(miss_idx)
+            self.misses += len(miss_idx)
+
+        if miss_idx:
+            computed = np.asarray(predict_fn(X[miss_idx]))
+            expires_at = time.monotonic() + self.ttl_seconds
+            with self._lock:
+                if model_key == self._model_key:
+                    for i, prediction in zip(miss_idx, computed.tolist()):
+                        self._entries[keys[i]] = (prediction, expires_at)
+                        self._entries.move_to_end(keys[i])
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        self.evictions += 1
+            for i, prediction in zip(miss_idx, computed.tolist()):
+                results[i] = prediction
+        return np.asarray(results)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": True,
+            "model_key": list(self._model_key) if isinstance(self._model_key, tuple) else self._model_key,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,179 @@
+# backend/model/registry.py
+
+import sys
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from backend.model.fetch import fetch_global_model, list_global_versions
+from backend.model.features import NUM_FEATURES
+from backend.model.scorer import compile_model
+
+# One immutable snapshot of what is being served. Request handlers grab it once
+# and use it for the whole request, so a concurrent swap never mixes versions.
+ServingModel = namedtuple("ServingModel", ["model_id", "version", "model", "loaded_at", "load_seconds"])
+
+
+class ModelRegistry:
+    """In-process registry of global model versions with background hot reload.
+
+    A daemon thread polls `central_updates` for new versions. New versions are
+    fetched, unpickled, compiled and warmed off the request path, then swapped
+    in with a single reference assignment. Admins can pin a version (which
+    stops following latest) or roll back to the previously served one; the last
+    `keep_versions` loaded models are kept so rollbacks don't re-fetch.
+    """
+
+    def __init__(self, model_id: int = 1, pinned_version: int = None, poll_interval: float = 30.0,
+                 keep_versions: int = 3, warmup_rows: int = 8):
+        self.model_id = model_id
+        self.pinned_version = pinned_version
+        self.poll_interval = poll_interval
+        self.keep_versions = max(1, keep_versions)
+        self.warmup_rows = warmup_rows
+
+        self._current = None
+        self._loaded = OrderedDict()  # version -> ServingModel, most recently used last
+        self._history = []  # previously served versions, oldest first
+        self._lock = threading.RLock()  # serializes loads/swaps, never taken by readers
+        self._pin_epoch = 0  # bumped by every pin/unpin/rollback, under _lock
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_poll_at = None
+        self.last_error = None
+
+    # --- Read path ---
+    def current(self) -> ServingModel:
+        return self._current
+
+    # --- Loading ---
+    def _warm(self, model):
+        X = np.zeros((self.warmup_rows, NUM_FEATURES), dtype=np.float64)
+        model.predict(X)
+
+    def load(self, version: int) -> ServingModel:
+        """Fetch, compile and warm one version without touching what is being served."""
+        with self._lock:
+            cached = self._loaded.get(version)
+            if cached is not None:
+                self._loaded.move_to_end(version)
+                return cached
+
+        start = time.perf_counter()
+        model = compile_model(fetch_global_model(model_id=self.model_id, version=version))
+        self._warm(model)
+        serving = ServingModel(self.model_id, version, model, time.time(), time.perf_counter() - start)
+        print(f"ModelRegistry: loaded model {self.model_id} v{version} in {serving.load_seconds:.3f}s ({model!r})",
+              file=sys.stderr)
+
+        with self._lock:
+            self._loaded[version] = serving
+            self._loaded.move_to_end(version)
+            while len(self._loaded) > self.keep_versions:
+                oldest = next(iter(self._loaded))
+                if self._current is not None and oldest == self._current.version:
+                    self._loaded.move_to_end(oldest)
+                    continue
+                self._loaded.pop(oldest)
+        return serving
+
+    def _swap(self, serving: ServingModel, record_history: bool = True):
+        with self._lock:
+            previous = self._current
+            if previous is not None and previous.version == serving.version:
+                return
+            if previous is not None and record_history:
+                self._history.append(previous.version)
+                del self._history[:-10]
+            self._current = serving  # atomic reference swap
+        print(f"ModelRegistry: now serving model {self.model_id} v{serving.version}", file=sys.stderr)
+
+    def target_version(self) -> int:
+        if self.pinned_version is not None:
+            return self.pinned_version
+        versions = list_global_versions(self.model_id)
+        if not versions:
+            raise ValueError(f"No versions of global model {self.model_id} found in central_updates")
+        return versions[0]
+
+    def refresh(self) -> ServingModel:
+        """Serve the target version (pinned, else latest), loading it first if needed."""
+        self.last_poll_at = time.time()
+        epoch = self._pin_epoch
+        target = self.target_version()
+        current = self._current
+        if current is None or current.version != target:
+            serving = self.load(target)
+            with self._lock:
+                # An admin pin/unpin/rollback while we resolved or loaded `target` decides what is served.
+                if self._pin_epoch == epoch:
+                    self._swap(serving)
+        return self._current
+
+    # --- Admin operations ---
+    def pin(self, version: int) -> ServingModel:
+        serving = self.load(version)  # load before pinning so a bad version changes nothing
+        with self._lock:
+            self.pinned_version = version
+            self._pin_epoch += 1
+            self._swap(serving)
+        return serving
+
+    def unpin(self) -> ServingModel:
+        with self._lock:
+            self.pinned_version = None
+            self._pin_epoch += 1
+        return self.refresh()
+
+    def rollback(self) -> ServingModel:
+        """Pin and serve the previously served version; repeated calls walk further back."""
+        with self._lock:
+            if not self._history:
+                raise ValueError("No previous model version to roll back to")
+            version = self._history[-1]
+        serving = self.load(version)
+        with self._lock:
+            if self._history and self._history[-1] == version:
+                self._history.pop()
+            self.pinned_version = version
+            self._pin_epoch += 1
+            self._swap(serving, record_history=False)
+        return serving
+
+    def status(self) -> dict:
+        current = self._current
+        return {
+            "model_id": self.model_id,
+            "version": current.version if current else None,
+            "model": repr(current.model) if current else None,
+            "loaded_at": current.loaded_at if current else None,
+            "load_seconds": current.load_seconds if current else None,
+            "pinned_version": self.pinned_version,
+            "loaded_versions": list(self._loaded.keys()),
+            "history": list(self._history),
+            "poll_interval": self.poll_interval,
+            "last_poll_at": self.last_poll_at,
+            "last_error": self.last_error,
+        }
+
+    # --- Background polling ---
+    def _poll_loop(self):
+        while not self._stop.wait(self.poll_interval):
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"ModelRegistry: background refresh failed: {e}", file=sys.stderr)
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._poll_loop, name="model-registry-poller", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
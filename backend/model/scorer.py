@@ -0,0 +1,101 @@
+# backend/model/scorer.py
+
+import sys
+
+import numpy as np
+
+
+class LinearScorer:
+    """Lean NumPy scorer compiled from a fitted binary linear classifier.
+
+    Scoring a batch is one dot product plus a sigmoid, with none of sklearn's
+    per-call input validation or feature-name checks. Inputs must already be
+    in MODEL_TRAINING_FEATURES order.
+    """
+
+    def __init__(self, coef, intercept, classes, has_proba=True, feature_names_in=None, source=None):
+        self.coef_ = np.ascontiguousarray(coef, dtype=np.float64).ravel()
+        self.intercept_ = float(np.ravel(intercept)[0])
+        self.classes_ = np.asarray(classes)
+        self.has_proba = has_proba
+        if feature_names_in is not None:
+            self.feature_names_in_ = np.asarray(feature_names_in, dtype=object)
+        self.source = source
+
+    def decision_function(self, X) -> np.ndarray:
+        return np.asarray(X, dtype=np.float64) @ self.coef_ + self.intercept_
+
+    def predict_proba(self, X) -> np.ndarray:
+        if not self.has_proba:
+            raise AttributeError(f"{self.source or 'model'} has no predict_proba")
+        z = self.decision_function(X)
+        with np.errstate(over="ignore"):
+            p = 1.0 / (1.0 + np.exp(-z))
+        return np.column_stack((1.0 - p, p))
+
+    def predict(self, X) -> np.ndarray:
+        return self.classes_[(self.decision_function(X) > 0).astype(np.intp)]
+
+    def __repr__(self):
+        return f"LinearScorer(source={self.source}, n_features={self.coef_.shape[0]})"
+
+
+def _is_binary_linear_classifier(model) -> bool:
+    try:
+        from sklearn.linear_model._base import LinearClassifierMixin
+    except ImportError:
+        return False
+    if not isinstance(model, LinearClassifierMixin):
+        return False
+    coef = getattr(model, "coef_", None)
+    classes = getattr(model, "classes_", None)
+    if coef is None or classes is None or len(classes) != 2:
+        return False
+    return np.ndim(coef) == 1 or (np.ndim(coef) == 2 and coef.shape[0] == 1)
+
+
+def verify_parity(model, scorer, X, atol: float = 1e-9) -> bool:
+    """Check that `scorer` reproduces `model` on X (labels and, when available, probabilities)."""
+    X = np.asarray(X, dtype=np.float64)
+    X_model = X
+    if hasattr(model, "feature_names_in_"):
+        # Feed the estimator a frame with its fitted column names so sklearn doesn't warn.
+        import pandas as pd
+        X_model = pd.DataFrame(X, columns=model.feature_names_in_)
+    if not np.array_equal(np.asarray(model.predict(X_model)), scorer.predict(X)):
+        return False
+    if scorer.has_proba:
+        return np.allclose(model.predict_proba(X_model), scorer.predict_proba(X), rtol=0.0, atol=atol)
+    return True
+
+
+def compile_model(model, n_parity_rows: int = 256, seed: int = 0):
+    """Return a LinearScorer for binary linear classifiers, or `model` unchanged.
+
+    The compiled scorer is only used if it matches the original estimator on a
+    synthetic parity batch; any mismatch falls back to the generic estimator.
+    """
+    if not _is_binary_linear_classifier(model):
+        return model
+
+    from sklearn.linear_model import LogisticRegression
+
+    scorer = LinearScorer(
+        model.coef_, model.intercept_, model.classes_,
+        has_proba=isinstance(model, LogisticRegression),
+        feature_names_in=getattr(model, "feature_names_in_", None),
+        source=type(model).__name__,
+    )
+
+    # Parity check on synthetic rows.
+    rng = np.random.default_rng(seed)
+    X = rng.normal(0.0, 5.0, size=(n_parity_rows, scorer.coef_.shape[0]))
+    try:
+        ok = verify_parity(model, scorer, X)
+    except Exception as e:
+        print(f"compile_model: parity check raised {e}; using generic estimator.", file=sys.stderr)
+        return model
+    if not ok:
+        print(f"compile_model: {type(model).__name__} parity check failed; using generic estimator.", file=sys.stderr)
+        return model
+    return scorer
@@ -0,0 +1,273 @@
+# backend/model/serialization.py
+#
+# Compact, pickle-free container for the models we exchange:
+#
+#   b"NNMF" | format version (u8) | flags (u8) | header length (u32 LE) | JSON header | payload
+#
+# The JSON header names the estimator, its constructor params and the typed
+# arrays in the payload (dtype, shape, offset). Arrays are 64-byte aligned so an
+# uncompressed payload is loaded with zero-copy np.frombuffer views; with
+# FLAG_ZLIB the payload is decompressed once and then viewed the same way.
+#
+# Supported kinds:
+#   linear   - sklearn linear classifiers/regressors (coef_, intercept_, classes_, ...)
+#   xgboost  - XGBClassifier / XGBRegressor; the booster is stored in its native UBJSON form
+#   pickle   - legacy/unsupported estimators, only when explicitly allowed
+#   xgboost_ensemble - WeightedEnsembleClassifier of XGBoost members (backend/model/ensemble.py)
+#   linear_delta - client parameter delta against a global version (backend/model/delta.py)
+
+import importlib
+import json
+import pickle
+import struct
+import zlib
+
+import numpy as np
+
+MAGIC = b"NNMF"
+FORMAT_VERSION = 1
+FLAG_ZLIB = 0x01
+_PREFIX = struct.Struct("<4sBBI")
+_ALIGN = 64
+
+# Estimator classes that may be reconstructed from a header (no arbitrary imports).
+_LINEAR_ESTIMATORS = {
+    "sklearn.linear_model.LogisticRegression",
+    "sklearn.linear_model.SGDClassifier",
+    "sklearn.linear_model.RidgeClassifier",
+    "sklearn.linear_model.LinearRegression",
+    "sklearn.linear_model.Ridge",
+    "sklearn.svm.LinearSVC",
+}
+_XGBOOST_ESTIMATORS = {
+    "xgboost.XGBClassifier",
+    "xgboost.XGBRegressor",
+}
+_ENSEMBLE_ESTIMATOR = "backend.model.ensemble.WeightedEnsembleClassifier"
+_LINEAR_ARRAYS = ["coef_", "intercept_", "classes_", "n_iter_"]
+
+
+class UnsupportedModelError(TypeError):
+    pass
+
+
+class UnsafeBlobError(ValueError):
+    pass
+
+
+# --- Param encoding (get_params() values are not always plain JSON) ---
+def _encode_value(value):
+    if isinstance(value, dict):
+        if all(isinstance(k, str) for k in value):
+            return {k: _encode_value(v) for k, v in value.items()}
+        return {"__items__": [[_encode_value(k), _encode_value(v)] for k, v in value.items()]}
+    if isinstance(value, (list, tuple)):
+        return [_encode_value(v) for v in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise UnsupportedModelError(f"Parameter value {value!r} is not serializable without pickle")
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if set(value) == {"__items__"}:
+            return {_decode_value(k): _decode_value(v) for k, v in value["__items__"]}
+        return {k: _decode_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_decode_value(v) for v in value]
+    return value
+
+
+def _qualified_name(model) -> str:
+    cls = type(model)
+    module = cls.__module__
+    if module.startswith("sklearn."):
+        module = ".".join(module.split(".")[:2])  # sklearn.linear_model._logistic -> sklearn.linear_model
+    elif module.startswith("xgboost."):
+        module = "xgboost"
+    return f"{module}.{cls.__name__}"
+
+
+def _import_estimator(name: str):
+    module, _, cls_name = name.rpartition(".")
+    return getattr(importlib.import_module(module), cls_name)
+
+
+# --- Container ---
+def pack_container(header: dict, arrays: dict, compress: bool) -> bytes:
+    specs = []
+    chunks = []
+    offset = 0
+    for name, array in arrays.items():
+        array = np.ascontiguousarray(array)
+        pad = (-offset) % _ALIGN
+        if pad:
+            chunks.append(b"\0" * pad)
+            offset += pad
+        specs.append({"name": name, "dtype": array.dtype.str, "shape": list(array.shape),
+                      "offset": offset, "nbytes": array.nbytes})
+        chunks.append(array.tobytes())
+        offset += array.nbytes
+    header = dict(header, arrays=specs)
+    payload = b"".join(chunks)
+    flags = 0
+    if compress:
+        payload = zlib.compress(payload, 6)
+        flags |= FLAG_ZLIB
+    header_bytes = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    # Pad the header so the payload itself starts on an aligned offset.
+    header_bytes += b" " * ((-(_PREFIX.size + len(header_bytes))) % _ALIGN)
+    return _PREFIX.pack(MAGIC, FORMAT_VERSION, flags, len(header_bytes)) + header_bytes + payload
+
+
+def unpack_container(blob):
+    view = memoryview(blob)
+    magic, version, flags, header_len = _PREFIX.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a NNMF model container")
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Unsupported NNMF format version {version}")
+    start = _PREFIX.size
+    header = json.loads(bytes(view[start:start + header_len]).decode("utf-8"))
+    payload = view[start + header_len:]
+    if flags & FLAG_ZLIB:
+        payload = memoryview(zlib.decompress(payload))
+    arrays = {}
+    for spec in header["arrays"]:
+        arrays[spec["name"]] = np.frombuffer(
+            payload, dtype=np.dtype(spec["dtype"]), count=int(np.prod(spec["shape"], dtype=np.int64)),
+            offset=spec["offset"],
+        ).reshape(spec["shape"])
+    return header, arrays
+
+
+def is_native(blob) -> bool:
+    return bytes(blob[:4]) == MAGIC
+
+
+def read_header(blob) -> dict:
+    """Return the JSON header of a container without touching its payload."""
+    _, _, _, header_len = _PREFIX.unpack_from(memoryview(blob), 0)
+    return json.loads(bytes(blob[_PREFIX.size:_PREFIX.size + header_len]).decode("utf-8"))
+
+
+# --- Public API ---
+def dumps(model, compress: bool = True, allow_pickle: bool = False) -> bytes:
+    """Serialize `model` into an NNMF container.
+
+    Linear models and XGBoost estimators are stored as typed arrays. Anything
+    else raises UnsupportedModelError unless `allow_pickle=True`, in which case
+    the pickle is wrapped (and still compressed) as kind "pickle".
+    """
+    name = _qualified_name(model)
+    if name in _LINEAR_ESTIMATORS:
+        header, arrays = linear_header(model)
+        return pack_container(header, arrays, compress)
+
+    if name in _XGBOOST_ESTIMATORS:
+        raw = model.get_booster().save_raw(raw_format="ubj")
+        header = {"kind": "xgboost", "estimator": name, "params": _encode_value(model.get_params()), "attrs": {}}
+        return pack_container(header, {"booster": np.frombuffer(bytes(raw), dtype=np.uint8)}, compress)
+
+    if name == _ENSEMBLE_ESTIMATOR:
+        members = [_qualified_name(m) for m in model.estimators]
+        if any(member not in _XGBOOST_ESTIMATORS for member in members):
+            raise UnsupportedModelError("Only XGBoost ensemble members have a native serialization")
+        header = {
+            "kind": "xgboost_ensemble", "estimator": name, "weights": model.weights.tolist(),
+            "members": [{"estimator": member, "params": _encode_value(m.get_params())}
+                        for member, m in zip(members, model.estimators)],
+        }
+        arrays = {f"booster_{i}": np.frombuffer(bytes(m.get_booster().save_raw(raw_format="ubj")), dtype=np.uint8)
+                  for i, m in enumerate(model.estimators)}
+        return pack_container(header, arrays, compress)
+
+    if not allow_pickle:
+        raise UnsupportedModelError(f"{name} has no native serialization; pass allow_pickle=True to store it as a pickle")
+    header = {"kind": "pickle", "estimator": name}
+    pickled = np.frombuffer(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL), dtype=np.uint8)
+    return pack_container(header, {"pickle": pickled}, compress)
+
+
+def build_linear_model(header: dict, arrays: dict):
+    """Rebuild a whitelisted linear estimator from a header ("estimator", "params", "attrs") and its arrays."""
+    if header["estimator"] not in _LINEAR_ESTIMATORS:
+        raise UnsafeBlobError(f"Estimator {header['estimator']} is not allowed")
+    model = _import_estimator(header["estimator"])(**_decode_value(header["params"]))
+    for name, array in arrays.items():
+        setattr(model, name, array)
+    for name, value in header.get("attrs", {}).items():
+        if name == "feature_names_in_":
+            value = np.asarray(value, dtype=object)
+        elif isinstance(value, list):
+            value = np.asarray(_decode_value(value), dtype=object)
+        setattr(model, name, value)
+    return model
+
+
+def linear_header(model) -> tuple:
+    """Split a supported linear estimator into (header, arrays) as stored by dumps()."""
+    name = _qualified_name(model)
+    if name not in _LINEAR_ESTIMATORS:
+        raise UnsupportedModelError(f"{name} is not a supported linear model")
+    header = {"kind": "linear", "estimator": name, "params": _encode_value(model.get_params()), "attrs": {}}
+    arrays = {}
+    for attr in _LINEAR_ARRAYS:
+        value = getattr(model, attr, None)
+        if value is None:
+            continue
+        value = np.asarray(value)
+        if value.dtype == object:
+            header["attrs"][attr] = _encode_value(value.tolist())
+        else:
+            arrays[attr] = value
+    if hasattr(model, "feature_names_in_"):
+        header["attrs"]["feature_names_in_"] = [str(f) for f in model.feature_names_in_]
+    if hasattr(model, "n_features_in_"):
+        header["attrs"]["n_features_in_"] = int(model.n_features_in_)
+    return header, arrays
+
+
+def loads(blob, allow_pickle: bool = False):
+    """Load a model from an NNMF container or, if `allow_pickle`, a legacy raw pickle."""
+    if isinstance(blob, str):
+        blob = blob.encode("latin1")  # rows that came back from MySQL as strings
+    if not is_native(blob):
+        if not allow_pickle:
+            raise UnsafeBlobError("Refusing to unpickle a legacy model blob; pass allow_pickle=True to opt in")
+        return pickle.loads(blob)
+
+    header, arrays = unpack_container(blob)
+    kind = header["kind"]
+    if kind == "linear":
+        return build_linear_model(header, arrays)
+
+    if kind == "xgboost":
+        if header["estimator"] not in _XGBOOST_ESTIMATORS:
+            raise UnsafeBlobError(f"Estimator {header['estimator']} is not allowed")
+        model = _import_estimator(header["estimator"])(**_decode_value(header["params"]))
+        model.load_model(bytearray(arrays["booster"]))
+        return model
+
+    if kind == "xgboost_ensemble":
+        from backend.model.ensemble import WeightedEnsembleClassifier
+        estimators = []
+        for i, member in enumerate(header["members"]):
+            if member["estimator"] not in _XGBOOST_ESTIMATORS:
+                raise UnsafeBlobError(f"Estimator {member['estimator']} is not allowed")
+            estimator = _import_estimator(member["estimator"])(**_decode_value(member["params"]))
+            estimator.load_model(bytearray(arrays[f"booster_{i}"]))
+            estimators.append(estimator)
+        return WeightedEnsembleClassifier(estimators, header["weights"])
+
+    if kind == "pickle":
+        if not allow_pickle:
+            raise UnsafeBlobError(f"Blob holds a pickled {header.get('estimator')}; pass allow_pickle=True to opt in")
+        return pickle.loads(arrays["pickle"].tobytes())
+
+    if kind == "linear_delta":
+        raise ValueError("Blob is a parameter delta; reconstruct it with backend.model.delta.apply_delta")
+
+    raise ValueError(f"Unknown NNMF model kind {kind!r}")
@@ -0,0 +1,239 @@
+# backend/model/tree_aggregate.py
+#
+# Aggregation of XGBoost client rounds (model_id 2) into one global ensemble.
+#
+#   python -m backend.model.tree_aggregate --model-id 2 --round 2 \
+#       [--mode concat|bagging|best] [--holdout holdout.csv] [--workers 4] [--dry-run]
+#
+# Weights are resolved from the round rows first. Each client booster is then
+# loaded, dumped to JSON and leaf-scaled by its weight in a process pool, so
+# the parent only concatenates trees. Two ensembles are built with per-client weights:
+#   concat  - every client's trees concatenated into one booster, leaf values
+#             scaled by the client weight (weighted average in margin space)
+#   bagging - WeightedEnsembleClassifier averaging client probabilities
+# With a holdout CSV, the concat model and each single client are predicted in
+# parallel, the bagging probabilities are their weighted average, all
+# candidates are scored in one vectorized pass (backend.model.evaluation) and
+# the best macro F1 is published; otherwise `--mode` is.
+
+import argparse
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from backend.model import serialization
+from backend.model.aggregate import fetch_round_updates, resolve_weights, _load_update_model
+from backend.model.ensemble import WeightedEnsembleClassifier
+from backend.model.evaluation import evaluate_many
+from backend.model.features import MODEL_TRAINING_FEATURES
+from backend.model.upload import publish_global_model
+
+_LOGISTIC_OBJECTIVES = {"binary:logistic", "reg:logistic"}
+
+
+# --- Process-pool workers (module level so they pickle by reference) ---
+def _load_client_booster(args):
+    model_id, update_id, client_id, blob_hash, update_encoding, base_version, allow_pickle, weight, keep_blob = args
+    model = _load_update_model(model_id, update_id, blob_hash, update_encoding, base_version, allow_pickle)
+    if not hasattr(model, "get_booster"):
+        raise ValueError(f"Client {client_id} (update {update_id}) is not an XGBoost model")
+    booster_json = json.loads(bytes(model.get_booster().save_raw(raw_format="json")))
+    # The native NNMF blob is only shipped back when a client model itself is needed (bagging, holdout).
+    blob = serialization.dumps(model, compress=False) if keep_blob else None
+    return client_id, scale_booster(booster_json, weight), (type(model), model.get_params()), blob
+
+
+def _predict_candidate(args):
+    name, blob, X = args
+    model = serialization.loads(blob)
+    return name, np.asarray(model.predict_proba(X))[:, 1]
+
+
+# --- Margin-space tree concatenation ---
+def _logit(p):
+    return math.log(p / (1.0 - p))
+
+
+def _sigmoid(z):
+    return 1.0 / (1.0 + math.exp(-z))
+
+
+def _parse_base_score(value: str):
+    value = value.strip()
+    bracketed = value.startswith("[")
+    return float(value.strip("[]")), bracketed
+
+
+def _format_base_score(score: float, bracketed: bool) -> str:
+    text = f"{score:.9E}"
+    return f"[{text}]" if bracketed else text
+
+
+def scale_booster(booster_json: dict, weight: float) -> dict:
+    """Scale one client's booster (parsed JSON model, modified in place) by its weight.
+
+    Leaf values are multiplied by `weight` and the weighted base score in
+    margin space is stored under "weighted_base_margin"; merge_scaled_boosters
+    only has to concatenate the results.
+    """
+    learner = booster_json["learner"]
+    if learner["gradient_booster"]["name"] != "gbtree":
+        raise ValueError("Only gbtree boosters can be concatenated")
+    if int(learner["learner_model_param"].get("num_class", "0")) > 1:
+        raise ValueError("Only binary/regression boosters can be concatenated")
+    objective = learner["objective"]["name"]
+    base_score, _ = _parse_base_score(learner["learner_model_param"]["base_score"])
+    booster_json["weighted_base_margin"] = weight * (_logit(base_score) if objective in _LOGISTIC_OBJECTIVES
+                                                     else base_score)
+    for tree in learner["gradient_booster"]["model"]["trees"]:
+        split_conditions, base_weights = tree["split_conditions"], tree["base_weights"]
+        for i, left in enumerate(tree["left_children"]):
+            if left == -1:
+                split_conditions[i] *= weight
+                base_weights[i] *= weight
+    return booster_json
+
+
+def merge_scaled_boosters(scaled) -> dict:
+    """Concatenate boosters returned by scale_booster into one model; the first one is reused as the template."""
+    merged = scaled[0]
+    learner = merged["learner"]
+    objective = learner["objective"]["name"]
+    num_feature = learner["learner_model_param"]["num_feature"]
+    _, bracketed = _parse_base_score(learner["learner_model_param"]["base_score"])
+
+    trees = []
+    base_margin = 0.0
+    for booster in scaled:
+        client_learner = booster["learner"]
+        if client_learner["objective"]["name"] != objective:
+            raise ValueError("Client boosters use different objectives")
+        if client_learner["learner_model_param"]["num_feature"] != num_feature:
+            raise ValueError("Client boosters use different feature counts")
+        base_margin += booster["weighted_base_margin"]
+        for tree in client_learner["gradient_booster"]["model"]["trees"]:
+            tree["id"] = len(trees)
+            trees.append(tree)
+
+    del merged["weighted_base_margin"]
+    base_score = _sigmoid(base_margin) if objective in _LOGISTIC_OBJECTIVES else base_margin
+    learner["learner_model_param"]["base_score"] = _format_base_score(base_score, bracketed)
+    model = learner["gradient_booster"]["model"]
+    model["trees"] = trees
+    model["tree_info"] = [0] * len(trees)
+    model["gbtree_model_param"]["num_trees"] = str(len(trees))
+    model["gbtree_model_param"]["num_parallel_tree"] = "1"
+    if "iteration_indptr" in model:
+        model["iteration_indptr"] = list(range(len(trees) + 1))
+    return merged
+
+
+def concat_boosters(booster_jsons, weights) -> dict:
+    """Merge binary gbtree boosters (parsed JSON models) into one weighted ensemble.
+
+    The merged margin is sum_k w_k * margin_k: each client's leaf values are
+    scaled by w_k and the base scores are combined in margin space.
+    """
+    return merge_scaled_boosters([scale_booster(json.loads(json.dumps(booster)), weight)
+                                  for weight, booster in zip(weights, booster_jsons)])
+
+
+def build_concat_model(scaled, estimator, params):
+    """Estimator of type `estimator` holding the merged trees of scale_booster outputs."""
+    merged = merge_scaled_boosters(scaled)
+    params = dict(params, n_estimators=len(merged["learner"]["gradient_booster"]["model"]["trees"]))
+    global_model = estimator(**params)
+    global_model.load_model(bytearray(json.dumps(merged).encode("utf-8")))
+    return global_model
+
+
+def load_holdout(path: str):
+    import pandas as pd
+    data = pd.read_csv(path)
+    target = "Diabetes_binary" if "Diabetes_binary" in data.columns else data.columns[-1]
+    return data[MODEL_TRAINING_FEATURES].to_numpy(dtype=np.float64), data[target].to_numpy(dtype=np.float64)
+
+
+def aggregate_tree_round(model_id: int, round_num: int, mode: str = "concat", weighting="samples",
+                         holdout: str = None, workers: int = None, model_name: str = None,
+                         allow_pickle: bool = False, publish: bool = True, clients=None) -> dict:
+    rows = fetch_round_updates(model_id, round_num, clients)
+    if not rows:
+        raise ValueError(f"No client updates for model {model_id} round {round_num}")
+    if mode not in ("concat", "bagging") and not holdout:
+        raise ValueError(f"Unknown mode {mode!r}; use concat or bagging (or pass --holdout to pick the best)")
+    workers = workers or os.cpu_count() or 1
+    client_ids = [row[1] for row in rows]
+    weights = resolve_weights(client_ids, [row[5] for row in rows], weighting)
+
+    keep_blobs = bool(holdout) or mode == "bagging"
+    tasks = [(model_id, update_id, client_id, blob_hash, update_encoding, base_version, allow_pickle,
+              float(weight), keep_blobs)
+             for (update_id, client_id, blob_hash, update_encoding, base_version, _), weight in zip(rows, weights)]
+    with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+        loaded = list(pool.map(_load_client_booster, tasks))
+    estimator, params = loaded[0][2]
+    blobs = [blob for _, _, _, blob in loaded]
+
+    concat = build_concat_model([scaled for _, scaled, _, _ in loaded], estimator, params)
+    summary = {"model_id": model_id, "round_num": round_num, "n_updates": len(rows),
+               "weights": {str(c): float(w) for c, w in zip(client_ids, weights)}}
+
+    chosen = mode
+    if holdout:
+        X, y = load_holdout(holdout)
+        predict_tasks = [("concat", serialization.dumps(concat, compress=False), X)]
+        predict_tasks += [(f"client:{client_id}", blob, X) for client_id, blob in zip(client_ids, blobs)]
+        with ProcessPoolExecutor(max_workers=min(workers, len(predict_tasks))) as pool:
+            predicted = list(pool.map(_predict_candidate, predict_tasks))
+        # Bagging is the weighted average of the client probabilities (WeightedEnsembleClassifier).
+        client_proba = np.stack([proba for _, proba in predicted[1:]])
+        predicted.insert(1, ("bagging", weights @ client_proba))
+        # Inference runs in the pool; all candidates are then scored in one vectorized pass.
+        names = [name for name, _ in predicted]
+        metrics = evaluate_many(y, proba=np.stack([proba for _, proba in predicted]), labels=[0.0, 1.0])
+        summary["candidates"] = {
+            name: {"macro_f1": float(metrics["macro_f1"][i]), "accuracy": float(metrics["accuracy"][i]),
+                   "log_loss": float(metrics["log_loss"][i])}
+            for i, name in enumerate(names)
+        }
+        chosen = names[int(np.argmax(metrics["macro_f1"]))]
+
+    summary["chosen"] = chosen
+    if publish:
+        # Client models are only materialized in the parent for the one candidate that is published.
+        if chosen == "concat":
+            model = concat
+        elif chosen == "bagging":
+            model = WeightedEnsembleClassifier([serialization.loads(blob) for blob in blobs], weights)
+        else:
+            model = serialization.loads(blobs[names.index(chosen) - 2])
+        summary["version"] = publish_global_model(model, model_id, model_name or f"XGBoost-{chosen.split(':')[0]}")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tree-ensemble aggregation for XGBoost rounds")
+    parser.add_argument("--model-id", type=int, default=2)
+    parser.add_argument("--round", type=int, required=True, dest="round_num")
+    parser.add_argument("--mode", choices=["concat", "bagging"], default="concat")
+    parser.add_argument("--weighting", choices=["samples", "uniform"], default="samples")
+    parser.add_argument("--holdout", help="CSV with the 21 features + Diabetes_binary to evaluate candidates")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--model-name", default=None)
+    parser.add_argument("--allow-pickle", action="store_true", help="accept legacy pickled client blobs")
+    parser.add_argument("--dry-run", action="store_true", help="aggregate and evaluate without publishing")
+    args = parser.parse_args()
+
+    summary = aggregate_tree_round(args.model_id, args.round_num, args.mode, args.weighting, args.holdout,
+                                   args.workers, args.model_name, allow_pickle=args.allow_pickle,
+                                   publish=not args.dry_run)
+    print(summary, file=sys.stdout)
+
+
+if __name__ == "__main__":
+    main()
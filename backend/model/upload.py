@@ -1,39 +1,125 @@
-import pickle
 import mysql.connector
-from sklearn.metrics import classification_report
-from backend.db.connection import get_db_connection
+from backend.db.connection import db_cursor
+from backend.model.blob_store import get_blob_store
+from backend.model import serialization
+from backend.model.delta import encode_delta, read_delta_header
+from backend.model.evaluation import evaluate
+from backend.telemetry import time_db
 
 
-def upload_model_update(model, y_test, y_pred, accuracy, loss, model_id, client_id, round_num):
-    # Serialize the model
-    model_blob = pickle.dumps(model)
+def _report_metrics(y_test, y_pred):
+    # One confusion-matrix pass; class 1 (diabetic) is the minority class.
+    metrics = evaluate(y_test, y_pred, labels=[0, 1])
+    return metrics["macro_f1"], metrics["recall"][1], metrics["f1"][1], metrics["f1"][0]
 
-    # Classification report
-    report = classification_report(y_test, y_pred, output_dict=True)
 
-    macro_f1 = report["macro avg"]["f1-score"]
-    recall_minority = report["1.0"]["recall"]
-    f1_minority = report["1.0"]["f1-score"]
-    f1_majority = report["0.0"]["f1-score"]
+class DuplicateUpdateError(ValueError):
+    pass
+
+
+# Retried or re-queued uploads of the same (model, client, round) collapse into the first row.
+INSERT_CLIENT_UPDATE = """
+    INSERT INTO client_updates 
+    (model_id, client_id, blob_hash, blob_size, accuracy, loss, round_num, macro_f1, recall_minority, f1_minority, f1_majority, fit_status,
+     update_encoding, base_version, num_samples, idempotency_key)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE update_id = update_id
+"""
+
+
+def idempotency_key(model_id, client_id, round_num) -> str:
+    return f"{model_id}:{client_id}:{round_num}"
+
+
+def client_update_row(blob_hash, blob_size, y_test, y_pred, accuracy, loss, model_id, client_id, round_num,
+                      update_encoding="full", base_version=None, num_samples=None) -> tuple:
+    """Parameters for INSERT_CLIENT_UPDATE."""
+    macro_f1, recall_minority, f1_minority, f1_majority = _report_metrics(y_test, y_pred)
 
     # You can improve this with logic to detect underfit/overfit
     fit_status = "good"
 
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    return (model_id, client_id, blob_hash, blob_size, float(accuracy), float(loss), round_num,
+            macro_f1, recall_minority, f1_minority, f1_majority, fit_status,
+            update_encoding, base_version, num_samples, idempotency_key(model_id, client_id, round_num))
 
-    insert_query = """
-    INSERT INTO client_updates 
-    (model_id, client_id, model_blob, accuracy, loss, round_num, macro_f1, recall_minority, f1_minority, f1_majority, fit_status)
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """
 
-    cursor.execute(insert_query, (
-        model_id, client_id, model_blob, accuracy, loss, round_num,
-        macro_f1, recall_minority, f1_minority, f1_majority, fit_status
-    ))
-    conn.commit()
-    cursor.close()
-    conn.close()
+def _duplicate_update(model_id, client_id, round_num) -> DuplicateUpdateError:
+    return DuplicateUpdateError(f"Client {client_id} already uploaded an update for model {model_id} "
+                                f"round {round_num}; the first upload is kept")
+
+
+def _insert_client_update(model_blob, y_test, y_pred, accuracy, loss, model_id, client_id, round_num,
+                          update_encoding="full", base_version=None, num_samples=None):
+    # Direct uploads are not retries: a second upload for the same round is an error, not a no-op.
+    key = idempotency_key(model_id, client_id, round_num)
+    with db_cursor() as cursor:
+        cursor.execute("SELECT update_id FROM client_updates WHERE idempotency_key = %s", (key,))
+        if cursor.fetchone() is not None:
+            raise _duplicate_update(model_id, client_id, round_num)
+
+    # The blob goes to the content-addressed blob store; the row keeps only its hash and size.
+    with time_db("blob_store_put"):
+        blob_hash, blob_size = get_blob_store().put(model_blob)
+
+    row = client_update_row(blob_hash, blob_size, y_test, y_pred, accuracy, loss, model_id, client_id, round_num,
+                            update_encoding, base_version, num_samples)
+    with time_db("upload_model_update"), db_cursor(commit=True) as cursor:
+        cursor.execute(INSERT_CLIENT_UPDATE, row)
+        # 0 rows: a concurrent upload for the same round won the race and ON DUPLICATE KEY kept it.
+        if cursor.rowcount == 0:
+            raise _duplicate_update(model_id, client_id, round_num)
+    return blob_size
+
+
+def upload_model_update(model, y_test, y_pred, accuracy, loss, model_id, client_id, round_num,
+                        allow_pickle: bool = False, num_samples: int = None):
+    # Serialize the model (NNMF container; pickle only if explicitly allowed for unsupported estimators)
+    model_blob = serialization.dumps(model, allow_pickle=allow_pickle)
+
+    # num_samples (training rows) weights this client in server-side FedAvg.
+    _insert_client_update(model_blob, y_test, y_pred, accuracy, loss, model_id, client_id, round_num,
+                          num_samples=num_samples)
 
     print(f"[✔] Model update inserted for client {client_id} in round {round_num}")
+
+
+def upload_model_delta(model, base_model, base_version, y_test, y_pred, accuracy, loss, model_id, client_id, round_num,
+                       quantize: str = "auto", num_samples: int = None):
+    """Upload a linear model as a parameter delta against global (model_id, base_version).
+
+    The server rebuilds the full update with backend.model.fetch.load_client_update,
+    verifying the checksum embedded in the delta.
+    """
+    model_blob = encode_delta(model, base_model, model_id, base_version, quantize=quantize)
+    header = read_delta_header(model_blob)
+
+    size = _insert_client_update(model_blob, y_test, y_pred, accuracy, loss, model_id, client_id, round_num,
+                                 update_encoding="delta", base_version=base_version, num_samples=num_samples)
+
+    print(f"[✔] Model delta ({header['layout']}, {size} bytes, base v{base_version}) inserted "
+          f"for client {client_id} in round {round_num}")
+
+
+def publish_global_model(model, model_id: int, model_name: str, allow_pickle: bool = False) -> int:
+    """Write `model` as the next version of global model `model_id` in central_updates; returns the version."""
+    model_blob = serialization.dumps(model, allow_pickle=allow_pickle)
+    with time_db("blob_store_put"):
+        blob_hash, blob_size = get_blob_store().put(model_blob)
+
+    with time_db("publish_global_model"), db_cursor(commit=True) as cursor:
+        # Lock the model's version range so concurrent publishers can't take the same number.
+        cursor.execute("""
+            SELECT COALESCE(MAX(version), 0) + 1
+            FROM central_updates
+            WHERE model_id = %s
+            FOR UPDATE
+        """, (model_id,))
+        version = int(cursor.fetchone()[0])
+        cursor.execute("""
+            INSERT INTO central_updates (model_id, version, blob_hash, blob_size, model_name)
+            VALUES (%s, %s, %s, %s, %s)
+        """, (model_id, version, blob_hash, blob_size, model_name))
+
+    print(f"[✔] Global model {model_id} v{version} ({model_name}) published")
+    return version
@@ -0,0 +1,307 @@
+# backend/model/upload_queue.py
+#
+# Non-blocking client uploads.
+#
+#   queue = UploadQueue().start()
+#   queue.put(model, y_test, y_pred, accuracy, loss, model_id, client_id, round_num, num_samples=n)
+#   ...                      # training continues
+#   queue.flush(timeout=60)  # optional: wait for the spool to drain
+#
+#   python -m backend.model.upload_queue   # drain whatever is left in the spool
+#
+# put() serializes the update and writes it to a local on-disk spool (blob +
+# JSON row, the row written last and atomically), so nothing is lost if the
+# central DB is unreachable or the process exits. A background thread drains
+# the spool in batches: blobs go to the blob store, rows are inserted with one
+# executemany in a single transaction. A batch that fails on a connection
+# problem is retried with exponential backoff and jitter. Any other database
+# error (a DataError, an over-long client_id, ...) means some row will never
+# insert: the batch is then inserted row by row and each failing entry is moved
+# to <spool_dir>/dead-letter/ with an .error file, so it can't hold up the
+# rest of the spool. Rows carry the (model_id, client_id, round_num)
+# idempotency key, so a batch that committed but was retried anyway does not
+# insert twice. The spool follows the same first-wins rule: a second put for
+# a key that is still pending raises DuplicateUpdateError and leaves the
+# first entry untouched.
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import mysql.connector
+
+from backend.db.connection import db_cursor
+from backend.model import serialization
+from backend.model.blob_store import get_blob_store
+from backend.model.delta import encode_delta
+from backend.model.upload import INSERT_CLIENT_UPDATE, _duplicate_update, client_update_row, idempotency_key
+from backend.telemetry import time_db
+
+UPLOAD_SPOOL_DIR = os.getenv("NERONODE_UPLOAD_SPOOL_DIR", "backend/model/spool")
+UPLOAD_BATCH_SIZE = int(os.getenv("NERONODE_UPLOAD_BATCH_SIZE", "32"))
+UPLOAD_BACKOFF_BASE = float(os.getenv("NERONODE_UPLOAD_BACKOFF_BASE", "1.0"))
+UPLOAD_BACKOFF_MAX = float(os.getenv("NERONODE_UPLOAD_BACKOFF_MAX", "300"))
+DEAD_LETTER_DIR = "dead-letter"
+
+# Errors worth retrying: the server or the pool is unavailable, not the data.
+_TRANSIENT_ERRORS = (mysql.connector.errors.OperationalError, mysql.connector.errors.InterfaceError,
+                     mysql.connector.errors.PoolError, OSError)
+
+
+def _write_atomic(path: str, data: bytes):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class UploadQueue:
+    def __init__(self, spool_dir: str = UPLOAD_SPOOL_DIR, batch_size: int = UPLOAD_BATCH_SIZE,
+                 backoff_base: float = UPLOAD_BACKOFF_BASE, backoff_max: float = UPLOAD_BACKOFF_MAX):
+        self.spool_dir = spool_dir
+        self.batch_size = batch_size
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.dead_letter_dir = os.path.join(spool_dir, DEAD_LETTER_DIR)
+        self.uploaded = 0
+        self.quarantined = 0
+        self.failures = 0
+        self.last_error = None
+        self._retry_at = 0.0
+        self._attempts = 0
+        self._lock = threading.Lock()
+        self._spool_lock = threading.Lock()  # serializes enqueue's exists-check and write
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._idle = threading.Event()
+        self._thread = None
+        os.makedirs(spool_dir, exist_ok=True)
+
+    # --- Producer side ---
+    def _entry_name(self, key: str) -> str:
+        return key.replace(":", "_").replace(os.sep, "_")
+
+    def enqueue(self, model_blob: bytes, y_test, y_pred, accuracy, loss, model_id, client_id, round_num,
+                update_encoding="full", base_version=None, num_samples=None) -> str:
+        """Spool a serialized update; returns its idempotency key.
+
+        Raises DuplicateUpdateError if an update for the same (model_id, client_id,
+        round_num) is still waiting in the spool; the first one is kept.
+        """
+        key = idempotency_key(model_id, client_id, round_num)
+        name = self._entry_name(key)
+        marker = os.path.join(self.spool_dir, f"{name}.json")
+        # Metrics are computed now so the spool never needs the test labels.
+        row = client_update_row(None, len(model_blob), y_test, y_pred, accuracy, loss, model_id, client_id,
+                                round_num, update_encoding, base_version, num_samples)
+        with self._spool_lock:
+            if os.path.exists(marker):
+                raise _duplicate_update(model_id, client_id, round_num)
+            _write_atomic(os.path.join(self.spool_dir, f"{name}.blob"), bytes(model_blob))
+            # The .json is the commit marker: an entry without one is incomplete and ignored.
+            _write_atomic(marker, json.dumps({"key": key, "row": list(row), "enqueued_at": time.time()}).encode())
+        self._idle.clear()
+        self._wake.set()
+        return key
+
+    def put(self, model, y_test, y_pred, accuracy, loss, model_id, client_id, round_num,
+            allow_pickle: bool = False, num_samples: int = None) -> str:
+        """Queued counterpart of upload.upload_model_update."""
+        model_blob = serialization.dumps(model, allow_pickle=allow_pickle)
+        return self.enqueue(model_blob, y_test, y_pred, accuracy, loss, model_id, client_id, round_num,
+                            num_samples=num_samples)
+
+    def put_delta(self, model, base_model, base_version, y_test, y_pred, accuracy, loss, model_id, client_id,
+                  round_num, quantize: str = "auto", num_samples: int = None) -> str:
+        """Queued counterpart of upload.upload_model_delta."""
+        model_blob = encode_delta(model, base_model, model_id, base_version, quantize=quantize)
+        return self.enqueue(model_blob, y_test, y_pred, accuracy, loss, model_id, client_id, round_num,
+                            update_encoding="delta", base_version=base_version, num_samples=num_samples)
+
+    def pending(self) -> list:
+        """Spooled entry names, oldest first."""
+        entries = []
+        for filename in os.listdir(self.spool_dir):
+            if filename.endswith(".json") and not filename.startswith("."):
+                path = os.path.join(self.spool_dir, filename)
+                try:
+                    entries.append((os.path.getmtime(path), filename[:-len(".json")]))
+                except FileNotFoundError:
+                    continue
+        return [name for _, name in sorted(entries)]
+
+    # --- Drain side ---
+    def _load_entry(self, name: str):
+        with open(os.path.join(self.spool_dir, f"{name}.json")) as f:
+            entry = json.load(f)
+        with open(os.path.join(self.spool_dir, f"{name}.blob"), "rb") as f:
+            blob = f.read()
+        return entry, blob
+
+    def _remove_entry(self, name: str):
+        for suffix in (".json", ".blob"):
+            try:
+                os.remove(os.path.join(self.spool_dir, f"{name}{suffix}"))
+            except FileNotFoundError:
+                pass
+
+    def _quarantine(self, name: str, error: Exception):
+        os.makedirs(self.dead_letter_dir, exist_ok=True)
+        for suffix in (".blob", ".json"):
+            try:
+                os.replace(os.path.join(self.spool_dir, f"{name}{suffix}"),
+                           os.path.join(self.dead_letter_dir, f"{name}{suffix}"))
+            except FileNotFoundError:
+                pass
+        with open(os.path.join(self.dead_letter_dir, f"{name}.error"), "w") as f:
+            f.write(f"{type(error).__name__}: {error}\n")
+        with self._lock:
+            self.quarantined += 1
+        print(f"UploadQueue: moved {name} to {self.dead_letter_dir} ({error})", file=sys.stderr)
+
+    def _committed(self, names: list, rows: list):
+        for name in names:
+            self._remove_entry(name)
+        with self._lock:
+            self.uploaded += len(names)
+        for row in rows:
+            print(f"[✔] Queued model update inserted for client {row[1]} in round {row[6]}")
+
+    def _insert_each(self, names: list, rows: list) -> int:
+        # Fallback after a non-transient batch failure: commit the good rows, quarantine the bad ones.
+        committed = 0
+        for name, row in zip(names, rows):
+            try:
+                with time_db("upload_model_update"), db_cursor(commit=True) as cursor:
+                    cursor.execute(INSERT_CLIENT_UPDATE, row)
+            except _TRANSIENT_ERRORS:
+                raise
+            except mysql.connector.Error as e:
+                self._quarantine(name, e)
+                continue
+            self._committed([name], [row])
+            committed += 1
+        return committed
+
+    def drain_once(self) -> int:
+        """Upload one batch from the spool; returns the number of updates committed.
+
+        Raises on transient failures; entries that can never be inserted are quarantined.
+        """
+        names = self.pending()[:self.batch_size]
+        if not names:
+            return 0
+        loaded, rows = [], []
+        store = get_blob_store()
+        for name in names:
+            try:
+                entry, blob = self._load_entry(name)
+            except (FileNotFoundError, ValueError) as e:  # a .json without its .blob, or an unreadable one
+                self._quarantine(name, e)
+                continue
+            # Blob store puts are content-addressed, so re-putting after a failed batch is harmless.
+            with time_db("blob_store_put"):
+                blob_hash, blob_size = store.put(blob)
+            row = entry["row"]
+            row[2], row[3] = blob_hash, blob_size
+            loaded.append(name)
+            rows.append(tuple(row))
+        if not rows:
+            return 0
+
+        try:
+            with time_db("upload_model_update_batch"), db_cursor(commit=True) as cursor:
+                cursor.executemany(INSERT_CLIENT_UPDATE, rows)
+        except _TRANSIENT_ERRORS:
+            raise
+        except mysql.connector.Error as e:
+            print(f"UploadQueue: batch insert failed ({e}); inserting rows one by one", file=sys.stderr)
+            return self._insert_each(loaded, rows)
+
+        self._committed(loaded, rows)
+        return len(loaded)
+
+    def _backoff(self) -> float:
+        delay = min(self.backoff_max, self.backoff_base * (2 ** self._attempts))
+        return delay * random.uniform(0.5, 1.0)
+
+    def _run(self):
+        while not self._stop.is_set():
+            wait = self._retry_at - time.monotonic()
+            if wait > 0:
+                self._stop.wait(wait)
+                continue
+            try:
+                uploaded = self.drain_once()
+            except Exception as e:
+                with self._lock:
+                    self.failures += 1
+                    self.last_error = str(e)
+                delay = self._backoff()
+                self._attempts += 1
+                self._retry_at = time.monotonic() + delay
+                print(f"UploadQueue: upload failed ({e}); retrying in {delay:.1f}s", file=sys.stderr)
+                continue
+            self._attempts = 0
+            # A batch that was entirely quarantined commits nothing but may leave more entries behind.
+            if uploaded == 0 and not self.pending():
+                self._idle.set()
+                self._wake.wait()
+                self._wake.clear()
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="upload-queue", daemon=True)
+            self._thread.start()
+        return self
+
+    def flush(self, timeout: float = None) -> bool:
+        """Wait until the spool is empty; returns False if entries remain after `timeout`."""
+        self._wake.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.pending():
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            self._idle.wait(0.1 if remaining is None else min(0.1, remaining))
+        return True
+
+    def stop(self, timeout: float = 5.0):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"pending": len(self.pending()), "uploaded": self.uploaded, "quarantined": self.quarantined,
+                    "failures": self.failures, "last_error": self.last_error}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Drain the local client upload spool into the central DB")
+    parser.add_argument("--spool-dir", default=UPLOAD_SPOOL_DIR)
+    parser.add_argument("--timeout", type=float, default=None, help="give up after this many seconds")
+    args = parser.parse_args()
+
+    queue = UploadQueue(args.spool_dir).start()
+    print(f"UploadQueue: {len(queue.pending())} update(s) pending in {args.spool_dir}", file=sys.stderr)
+    drained = queue.flush(args.timeout)
+    queue.stop()
+    print(f"UploadQueue: {queue.stats()}", file=sys.stderr)
+    sys.exit(0 if drained else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# backend/telemetry.py
+
+import os
+import random
+import time
+from contextlib import contextmanager
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# --- Opt-in sampled debug mode ---
+# NERONODE_DEBUG_SAMPLE_RATE=0.01 dumps ~1% of prediction batches to stderr; 0 (default) disables.
+DEBUG_SAMPLE_RATE = float(os.getenv("NERONODE_DEBUG_SAMPLE_RATE", "0"))
+
+_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REQUEST_LATENCY = Histogram(
+    "neronode_http_request_duration_seconds", "End-to-end HTTP request latency.",
+    ["method", "route"], buckets=_LATENCY_BUCKETS,
+)
+REQUESTS = Counter("neronode_http_requests_total", "HTTP requests handled.", ["method", "route", "status"])
+STAGE_LATENCY = Histogram(
+    "neronode_prediction_stage_duration_seconds",
+    "Per-stage prediction latency (validation, frame_build, inference, serialization).",
+    ["stage"], buckets=_LATENCY_BUCKETS,
+)
+PREDICTION_ROWS = Counter("neronode_prediction_rows_total", "Feature rows scored.", ["endpoint"])
+ERRORS = Counter("neronode_errors_total", "Errors by stage.", ["stage"])
+DB_LATENCY = Histogram(
+    "neronode_db_call_duration_seconds", "Database call latency by operation.",
+    ["operation"], buckets=_LATENCY_BUCKETS,
+)
+ROUND_DURATION = Histogram(
+    "neronode_round_duration_seconds", "Wall-clock time from round open to published aggregate.",
+    ["model_id"], buckets=(1, 10, 30, 60, 300, 900, 1800, 3600, 7200, 21600, 86400),
+)
+ROUND_CLIENT_ARRIVAL = Histogram(
+    "neronode_round_client_arrival_seconds", "Time from round open until each client's update arrived.",
+    ["model_id"], buckets=(1, 10, 30, 60, 300, 900, 1800, 3600, 7200, 21600, 86400),
+)
+MODEL_VERSION = Gauge("neronode_model_version", "Global model version currently being served.")
+WORKLOAD_IN_FLIGHT = Gauge("neronode_workload_in_flight", "Admitted calls per executor workload.", ["workload"])
+WORKLOAD_QUEUE_WAIT = Histogram(
+    "neronode_workload_queue_wait_seconds", "Time a call waited for admission to its workload.",
+    ["workload"], buckets=_LATENCY_BUCKETS,
+)
+WORKLOAD_REJECTED = Counter("neronode_workload_rejected_total", "Calls rejected by a saturated workload.",
+                            ["workload"])
+
+
+def debug_sampled() -> bool:
+    return DEBUG_SAMPLE_RATE > 0 and random.random() < DEBUG_SAMPLE_RATE
+
+
+def observe_stage(stage: str, seconds: float):
+    STAGE_LATENCY.labels(stage).observe(seconds)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        ERRORS.labels(stage).inc()
+        raise
+    finally:
+        STAGE_LATENCY.labels(stage).observe(time.perf_counter() - start)
+
+
+@contextmanager
+def time_db(operation: str):
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        ERRORS.labels(f"db:{operation}").inc()
+        raise
+    finally:
+        DB_LATENCY.labels(operation).observe(time.perf_counter() - start)
+
+
+def track_model_version(version_fn):
+    """Report the served model version lazily at scrape time."""
+    def _version():
+        version = version_fn()
+        return float(version) if version is not None else float("nan")
+    MODEL_VERSION.set_function(_version)
+
+
+def instrument_app(app):
+    """Record request latency/counters and stamp request.state.received_at for stage timing."""
+    @app.middleware("http")
+    async def _telemetry_middleware(request, call_next):
+        start = time.perf_counter()
+        request.state.received_at = start
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            REQUEST_LATENCY.labels(request.method, route_path).observe(time.perf_counter() - start)
+            REQUESTS.labels(request.method, route_path, str(status)).inc()
+    return app
+
+
+def render_latest():
+    return generate_latest(), CONTENT_TYPE_LATEST
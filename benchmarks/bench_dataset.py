@@ -0,0 +1,76 @@
+# benchmarks/bench_dataset.py
+#
+# Load time and memory of a client dataset: pd.read_csv (what the notebooks do)
+# vs the columnar cache in backend.client.dataset, on a synthetic
+# BRFSS-shaped CSV (0/1 flags, ordinal codes, integer BMI).
+#
+#   python -m benchmarks.bench_dataset [--rows 2000000]
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from backend.client.dataset import TARGET_COLUMN, open_dataset
+from backend.model.features import RAW_INPUT_COLUMNS
+
+_ORDINAL_RANGES = {"BMI": (12, 98), "GenHlth": (1, 5), "MentHlth": (0, 30), "PhysHlth": (0, 30),
+                   "Age": (1, 13), "Education": (1, 6), "Income": (1, 8)}
+
+
+def write_synthetic_csv(path: str, n_rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    data = {}
+    for name in [TARGET_COLUMN] + RAW_INPUT_COLUMNS:
+        lo, hi = _ORDINAL_RANGES.get(name, (0, 1))
+        data[name] = rng.integers(lo, hi + 1, n_rows).astype(np.float64)
+    pd.DataFrame(data).to_csv(path, index=False)
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "client_bench_binary.csv")
+        write_synthetic_csv(csv_path, args.rows)
+        cache_dir = os.path.join(tmp, "cache")
+        print(f"{args.rows:,d} rows, CSV {os.path.getsize(csv_path) / 1e6:.1f} MB")
+        print(f"{'load':<28} {'time':>10} {'peak alloc':>12} {'held':>10}")
+
+        frame, elapsed, peak = measure(lambda: pd.read_csv(csv_path))
+        held = frame.memory_usage(deep=True).sum()
+        print(f"{'pd.read_csv':<28} {elapsed:>9.2f}s {peak / 1e6:>10.1f}MB {held / 1e6:>8.1f}MB")
+        del frame
+
+        _, elapsed, peak = measure(lambda: open_dataset(csv_path, cache_dir))
+        print(f"{'first open (convert)':<28} {elapsed:>9.2f}s {peak / 1e6:>10.1f}MB")
+
+        dataset, elapsed, peak = measure(lambda: open_dataset(csv_path, cache_dir))
+        print(f"{'cached open (mmap)':<28} {elapsed * 1000:>8.2f}ms {peak / 1e6:>10.1f}MB")
+
+        columns, elapsed, peak = measure(lambda: [np.asarray(dataset[name]).sum() for name in dataset.columns])
+        held = sum(dataset[name].nbytes for name in dataset.columns)
+        print(f"{'touch every column':<28} {elapsed:>9.2f}s {peak / 1e6:>10.1f}MB {held / 1e6:>8.1f}MB")
+
+        X, elapsed, peak = measure(lambda: dataset.features())
+        print(f"{'features() float32 matrix':<28} {elapsed:>9.2f}s {peak / 1e6:>10.1f}MB {X.nbytes / 1e6:>8.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
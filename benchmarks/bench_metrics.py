@@ -0,0 +1,92 @@
+# benchmarks/bench_metrics.py
+#
+# Compare /metrics/ payload building: the old path (fetch every row, pandas
+# groupby, to_dict) vs SQL-side aggregation + tuple serialization, as the
+# number of client_updates rows grows. Runs offline against an in-memory
+# SQLite table with the same columns (and a dummy model_blob) as production.
+#
+#   python -m benchmarks.bench_metrics --rows 1000 10000 100000
+
+import argparse
+import random
+import sqlite3
+import time
+
+import pandas as pd
+
+from backend.db.metrics import METRIC_COLUMNS, query_metrics
+
+
+def build_table(n_rows: int, n_clients: int = 4, blob_bytes: int = 2048):
+    conn = sqlite3.connect(":memory:")
+    conn.execute("""
+        CREATE TABLE client_updates (
+            update_id INTEGER PRIMARY KEY, model_id INTEGER, client_id TEXT, model_blob BLOB,
+            accuracy REAL, loss REAL, round_num INTEGER, model_name TEXT,
+            macro_f1 REAL, recall_minority REAL, f1_minority REAL, f1_majority REAL, fit_status TEXT
+        )
+    """)
+    rng = random.Random(0)
+    blob = bytes(blob_bytes)
+    rows = [
+        (1, str(i % n_clients + 1), blob, rng.random(), rng.random(), i // n_clients, "LogisticRegression",
+         rng.random(), rng.random(), rng.random(), rng.random(), "good")
+        for i in range(n_rows)
+    ]
+    conn.executemany("""
+        INSERT INTO client_updates (model_id, client_id, model_blob, accuracy, loss, round_num, model_name,
+                                    macro_f1, recall_minority, f1_minority, f1_majority, fit_status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    conn.commit()
+    return conn
+
+
+def old_path(conn):
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT client_id, round_num AS iteration, model_name, fit_status,
+               accuracy, loss, macro_f1, recall_minority,
+               f1_minority, f1_majority
+        FROM client_updates
+        ORDER BY iteration
+    """)
+    columns = [d[0] for d in cursor.description]
+    df = pd.DataFrame([dict(zip(columns, r)) for r in cursor.fetchall()])
+    global_metrics = df.groupby("iteration")[METRIC_COLUMNS].mean().reset_index()
+    return {
+        "global_metrics": global_metrics.to_dict(orient="records"),
+        "client_metrics": df.copy().to_dict(orient="records"),
+    }
+
+
+def new_path(conn):
+    return query_metrics(conn.cursor())
+
+
+def best_of(fn, conn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(conn)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'old (ms)':>10} {'new (ms)':>10} {'speedup':>8}")
+    for n_rows in args.rows:
+        conn = build_table(n_rows)
+        old = best_of(old_path, conn, args.repeat)
+        new = best_of(new_path, conn, args.repeat)
+        print(f"{n_rows:>10} {old * 1000:>10.2f} {new * 1000:>10.2f} {old / new:>7.1f}x")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
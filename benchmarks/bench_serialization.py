@@ -0,0 +1,72 @@
+# benchmarks/bench_serialization.py
+#
+# Upload size and load time of pickle vs the NNMF container for the model
+# types we store: LogisticRegression (model_id 1) and a 300-tree XGBClassifier
+# (model_id 2), both trained on synthetic 21-feature BRFSS-shaped data.
+#
+#   python -m benchmarks.bench_serialization [--rows 20000] [--trees 300]
+
+import argparse
+import pickle
+import time
+
+import numpy as np
+
+from backend.model import serialization
+from backend.model.features import NUM_FEATURES
+
+
+def synthetic_data(n_rows: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = rng.integers(0, 6, size=(n_rows, NUM_FEATURES)).astype(np.float64)
+    X[:, 3] = rng.normal(28, 6, n_rows)  # BMI
+    logits = X @ rng.normal(0, 0.3, NUM_FEATURES) - 6 + rng.normal(0, 1, n_rows)
+    return X, (logits > 0).astype(np.float64)
+
+
+def best_of(fn, repeat: int):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name, model, repeat):
+    pickled = pickle.dumps(model)
+    formats = [
+        ("pickle", pickled, lambda: pickle.loads(pickled)),
+    ]
+    for compress in (True, False):
+        blob = serialization.dumps(model, compress=compress)
+        formats.append((f"nnmf{'+zlib' if compress else ''}", blob, lambda b=blob: serialization.loads(b)))
+    for fmt, blob, load in formats:
+        print(f"{name:<20} {fmt:<10} {len(blob):>12,d} B {best_of(load, repeat) * 1000:>10.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--trees", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    X, y = synthetic_data(args.rows)
+    print(f"{'model':<20} {'format':<10} {'size':>14} {'load':>13}")
+
+    from sklearn.linear_model import LogisticRegression
+    report("LogisticRegression", LogisticRegression(max_iter=500).fit(X, y), args.repeat)
+
+    try:
+        from xgboost import XGBClassifier
+    except ImportError:
+        print("xgboost not installed; skipping XGBClassifier")
+        return
+    xgb = XGBClassifier(n_estimators=args.trees, max_depth=7, learning_rate=0.1, subsample=0.8,
+                        colsample_bytree=0.88, eval_metric="aucpr", random_state=42)
+    report(f"XGBClassifier({args.trees})", xgb.fit(X, y), max(1, args.repeat // 4))
+
+
+if __name__ == "__main__":
+    main()
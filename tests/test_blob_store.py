@@ -0,0 +1,161 @@
+# tests/test_blob_store.py
+#
+# Content-addressed blob stores. The filesystem store runs on a temporary directory;
+# the database store runs against an in-memory stand-in for its three tables.
+#
+#   python -m pytest tests
+
+import hashlib
+import os
+from contextlib import contextmanager
+
+import pytest
+
+from backend.model import blob_store
+from backend.model.blob_store import BlobNotFoundError, DatabaseBlobStore, FilesystemBlobStore
+
+
+def test_filesystem_store_puts_and_gets_by_content_hash(tmp_path):
+    store = FilesystemBlobStore(str(tmp_path))
+    blob = b"model bytes" * 100
+    sha256, size = store.put(blob)
+    assert sha256 == hashlib.sha256(blob).hexdigest()
+    assert size == len(blob)
+    assert store.exists(sha256)
+    assert store.get(sha256) == blob
+    assert os.path.isfile(tmp_path / sha256[:2] / sha256)
+
+
+def test_filesystem_store_writes_identical_content_once(tmp_path):
+    store = FilesystemBlobStore(str(tmp_path))
+    first = store.put(b"same")
+    path = tmp_path / first[0][:2] / first[0]
+    written_at = os.stat(path).st_mtime_ns
+    assert store.put(bytearray(b"same")) == first
+    assert os.stat(path).st_mtime_ns == written_at
+    assert sorted(p.name for p in tmp_path.rglob("*") if p.is_file()) == [first[0]]
+
+
+def test_filesystem_store_missing_and_corrupt_blobs(tmp_path):
+    store = FilesystemBlobStore(str(tmp_path))
+    missing = hashlib.sha256(b"never stored").hexdigest()
+    assert not store.exists(missing)
+    with pytest.raises(BlobNotFoundError):
+        store.get(missing)
+
+    sha256, _ = store.put(b"original")
+    (tmp_path / sha256[:2] / sha256).write_bytes(b"tampered")
+    with pytest.raises(ValueError, match="hash mismatch"):
+        store.get(sha256)
+
+
+class _FakeBlobTables:
+    """Just enough of model_blobs / blob_uploads / blob_upload_chunks for DatabaseBlobStore."""
+
+    def __init__(self):
+        self.model_blobs = {}
+        self.uploads = {}
+        self.chunks = {}
+        self.sent = []
+        self.fail_chunks = set()
+
+    @contextmanager
+    def cursor(self, dictionary=False, commit=False, buffered=True):
+        yield _FakeCursor(self)
+
+
+class _FakeCursor:
+    def __init__(self, tables):
+        self.tables = tables
+        self.rows = []
+        self.rowcount = 0
+
+    def execute(self, sql, params=()):
+        t = self.tables
+        sql = " ".join(sql.split())
+        if sql.startswith("INSERT IGNORE INTO model_blobs"):
+            t.model_blobs.setdefault(params[0], params[2])
+        elif sql.startswith("INSERT IGNORE INTO blob_uploads"):
+            t.uploads.setdefault(params[0], {"chunk_size": params[2], "num_chunks": params[3], "status": "uploading"})
+        elif sql.startswith("SELECT chunk_size, status FROM blob_uploads"):
+            upload = t.uploads[params[0]]
+            self.rows = [(upload["chunk_size"], upload["status"])]
+        elif sql.startswith("SELECT chunk_index FROM blob_upload_chunks"):
+            self.rows = [(index,) for (sha, index), (checksum, data) in t.chunks.items()
+                         if sha == params[0] and _sha(data) == checksum]
+        elif sql.startswith("INSERT INTO blob_upload_chunks"):
+            sha, index, checksum, data = params
+            if index in t.fail_chunks:
+                t.fail_chunks.discard(index)
+                raise ConnectionError(f"lost connection sending chunk {index}")
+            t.sent.append(index)
+            t.chunks[(sha, index)] = (checksum, data)
+        elif sql.startswith("UPDATE blob_uploads u SET u.status = 'complete'"):
+            sha, num_chunks, _, _, size = params
+            stored = [(checksum, data) for (s, index), (checksum, data) in t.chunks.items()
+                      if s == sha and index < num_chunks]
+            verified = (sum(_sha(data) == checksum for checksum, data in stored) == num_chunks
+                        and sum(len(data) for _, data in stored) == size)
+            if verified:
+                t.uploads[sha]["status"] = "complete"
+            self.rowcount = int(verified)
+        elif sql.startswith("SELECT data FROM model_blobs"):
+            self.rows = [(t.model_blobs[params[0]],)] if params[0] in t.model_blobs else []
+        elif sql.startswith("SELECT c.data FROM blob_uploads u JOIN blob_upload_chunks"):
+            upload = t.uploads.get(params[0])
+            if upload is None or upload["status"] != "complete":
+                self.rows = []
+            else:
+                self.rows = [(t.chunks[(params[0], index)][1],) for index in range(upload["num_chunks"])]
+        else:
+            raise AssertionError(f"unexpected SQL: {sql}")
+
+    def fetchone(self):
+        return self.rows[0] if self.rows else None
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+def _sha(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+@pytest.fixture
+def fake_tables(monkeypatch):
+    tables = _FakeBlobTables()
+    monkeypatch.setattr(blob_store, "db_cursor", tables.cursor)
+    return tables
+
+
+def test_database_store_keeps_small_blobs_in_one_row(fake_tables):
+    store = DatabaseBlobStore(chunk_size=4, chunk_threshold=64)
+    sha256, _ = store.put(b"small")
+    assert fake_tables.model_blobs == {sha256: b"small"}
+    assert not fake_tables.uploads
+    assert store.get(sha256) == b"small"
+
+
+def test_interrupted_chunked_upload_resumes_from_acknowledged_chunks(fake_tables):
+    blob = bytes(range(256)) * 4
+    store = DatabaseBlobStore(chunk_size=100, chunk_threshold=200, chunk_retries=1)
+    fake_tables.fail_chunks = {6}
+    with pytest.raises(ConnectionError):
+        store.put(blob)
+    sha256 = _sha(blob)
+    assert fake_tables.sent == [0, 1, 2, 3, 4, 5]
+    with pytest.raises(BlobNotFoundError):
+        store.get(sha256)
+
+    # A chunk the server holds but whose bytes no longer match its checksum is sent again.
+    checksum, data = fake_tables.chunks[(sha256, 2)]
+    fake_tables.chunks[(sha256, 2)] = (checksum, data[:-1])
+    fake_tables.sent.clear()
+    assert store.put(blob) == (sha256, len(blob))
+    assert fake_tables.sent == [2, 6, 7, 8, 9, 10]
+    assert fake_tables.uploads[sha256]["status"] == "complete"
+    assert store.get(sha256) == blob
+
+    fake_tables.sent.clear()
+    store.put(blob)
+    assert fake_tables.sent == []
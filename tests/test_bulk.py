@@ -0,0 +1,85 @@
+# tests/test_bulk.py
+#
+# POST /bulk/ driven over raw ASGI, so the request body can arrive in several
+# http.request messages the way a real server delivers a large upload.
+#
+#   python -m pytest tests
+
+import asyncio
+import json
+import time
+
+import numpy as np
+import pytest
+
+from backend.api import endpoints
+from backend.main import app
+from backend.model.features import MODEL_TRAINING_FEATURES
+from backend.model.registry import ServingModel
+
+
+class _FirstFeatureModel:
+    def predict(self, X):
+        return np.asarray(X)[:, 0]
+
+
+@pytest.fixture
+def serving_model():
+    previous = endpoints.registry._current
+    endpoints.registry._current = ServingModel(1, 3, _FirstFeatureModel(), time.time(), 0.0)
+    yield
+    endpoints.registry._current = previous
+
+
+def _post(body_parts, query: str, spec_version: str):
+    """Send `body_parts` as separate http.request messages; returns (status, response body)."""
+    messages = [{"type": "http.request", "body": part, "more_body": i < len(body_parts) - 1}
+                for i, part in enumerate(body_parts)]
+    sent = []
+
+    async def receive():
+        if messages:
+            await asyncio.sleep(0)  # let the app interleave, as a real server would between reads
+            return messages.pop(0)
+        await asyncio.sleep(3600)  # client stays connected until the response is done
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0", "spec_version": spec_version}, "http_version": "1.1",
+        "method": "POST", "scheme": "http", "path": "/bulk/", "raw_path": b"/bulk/",
+        "query_string": query.encode(), "root_path": "", "server": ("testserver", 80), "client": ("test", 1),
+        "headers": [(b"content-type", b"text/csv"), (b"host", b"testserver")],
+    }
+
+    async def run():
+        await asyncio.wait_for(app(scope, receive, send), timeout=30)
+
+    asyncio.run(run())
+    status = next(m["status"] for m in sent if m["type"] == "http.response.start")
+    return status, b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body").decode()
+
+
+def _csv_parts(n_rows: int):
+    header = ",".join(MODEL_TRAINING_FEATURES) + "\n"
+    rows = [",".join([str(i % 2)] + ["0"] * (len(MODEL_TRAINING_FEATURES) - 1)) + "\n" for i in range(n_rows)]
+    return [header.encode()] + [row.encode() for row in rows]
+
+
+@pytest.mark.parametrize("spec_version", ["2.3", "2.4"])
+def test_bulk_scores_every_row_of_a_multi_message_body(serving_model, spec_version):
+    status, body = _post(_csv_parts(30), "chunk_rows=5", spec_version)
+    assert status == 200
+    lines = body.strip().split("\n")
+    predictions = [tuple(map(int, line.split(","))) for line in lines if not line.startswith("#")]
+    assert predictions == [(i, i % 2) for i in range(30)]
+    assert "rows=30" in lines[-1]
+
+
+def test_bulk_rejects_non_utf8_upload(serving_model):
+    parts = _csv_parts(3)
+    parts[2] = b"\xff\xfe" + parts[2]
+    status, body = _post(parts, "", "2.4")
+    assert status == 400
+    assert "UTF-8" in json.loads(body)["detail"]
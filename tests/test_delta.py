@@ -0,0 +1,66 @@
+# tests/test_delta.py
+#
+# Linear client updates encoded against their base global model must reconstruct
+# the client's parameters, and a wrong base must be caught by the checksum.
+#
+#   python -m pytest tests
+
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from backend.model import serialization
+from backend.model.delta import DeltaChecksumError, apply_delta, encode_delta, linear_params, read_delta_header
+
+
+def _fitted(seed: int, n: int = 500, n_features: int = 6) -> LogisticRegression:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, n_features))
+    y = (X[:, 0] - X[:, 2] + rng.normal(0, 1, n) > 0).astype(np.int64)
+    return LogisticRegression(max_iter=200).fit(X, y)
+
+
+@pytest.mark.parametrize("quantize", [None, "float32", "int8", "auto"])
+def test_delta_round_trip(quantize):
+    base, client = _fitted(0), _fitted(1)
+    blob = encode_delta(client, base, base_model_id=1, base_version=3, quantize=quantize)
+    header = read_delta_header(blob)
+    assert (header["base_model_id"], header["base_version"]) == (1, 3)
+
+    rebuilt = apply_delta(blob, base)
+    assert type(rebuilt) is LogisticRegression
+    tolerance = 1e-12 if quantize is None else 1e-4 * np.max(np.abs(linear_params(client)))
+    np.testing.assert_allclose(linear_params(rebuilt), linear_params(client), rtol=0, atol=tolerance)
+    np.testing.assert_array_equal(rebuilt.classes_, client.classes_)
+    assert rebuilt.get_params() == client.get_params()
+
+
+def test_sparse_delta_keeps_unchanged_parameters_exact():
+    base = _fitted(0, n_features=200)
+    client = _fitted(0, n_features=200)
+    client.coef_ = client.coef_.copy()
+    client.coef_[0, 4] += 0.25
+    blob = encode_delta(client, base, 1, 3, quantize=None, compress=False)
+    assert read_delta_header(blob)["layout"] == "sparse"
+    np.testing.assert_allclose(linear_params(apply_delta(blob, base)), linear_params(client), rtol=0, atol=1e-12)
+
+
+def test_delta_blob_is_not_a_standalone_model():
+    blob = encode_delta(_fitted(1), _fitted(0), 1, 3)
+    with pytest.raises(ValueError, match="delta"):
+        serialization.loads(blob)
+
+
+def test_wrong_base_fails_the_checksum():
+    base, client = _fitted(0), _fitted(1)
+    blob = encode_delta(client, base, 1, 3)
+    with pytest.raises(DeltaChecksumError, match="model 1 v3"):
+        apply_delta(blob, _fitted(2))
+
+
+def test_base_with_a_different_shape_is_rejected():
+    blob = encode_delta(_fitted(1), _fitted(0), 1, 3)
+    rng = np.random.default_rng(0)
+    other = LogisticRegression().fit(rng.normal(size=(50, 3)), np.arange(50) % 2)
+    with pytest.raises(ValueError, match="parameters"):
+        apply_delta(blob, other)
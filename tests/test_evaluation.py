@@ -0,0 +1,74 @@
+# tests/test_evaluation.py
+#
+# Vectorized metrics must agree with scikit-learn for every stacked candidate.
+#
+#   python -m pytest tests
+
+import numpy as np
+import pytest
+from sklearn.metrics import accuracy_score, f1_score, log_loss, precision_score, recall_score
+
+from backend.model.evaluation import evaluate, evaluate_many
+
+
+def _binary_problem(n: int = 1000, models: int = 3, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    y = (rng.random(n) < 0.3).astype(np.float64)
+    proba = np.clip(y[None, :] * 0.4 + rng.random((models, n)) * 0.6, 0.0, 1.0)
+    return y, proba
+
+
+def _assert_matches_sklearn(result, index, y_true, y_pred, labels):
+    assert result["accuracy"][index] == pytest.approx(accuracy_score(y_true, y_pred))
+    assert result["macro_f1"][index] == pytest.approx(f1_score(y_true, y_pred, labels=labels, average="macro",
+                                                               zero_division=0))
+    for name, metric in [("precision", precision_score), ("recall", recall_score), ("f1", f1_score)]:
+        np.testing.assert_allclose(result[name][index], metric(y_true, y_pred, labels=labels, average=None,
+                                                               zero_division=0))
+
+
+def test_hard_predictions_match_sklearn():
+    rng = np.random.default_rng(1)
+    y = rng.integers(0, 3, 500)
+    y_pred = np.stack([np.where(rng.random(500) < accuracy, y, rng.integers(0, 3, 500))
+                       for accuracy in (0.9, 0.6, 0.0)])
+    result = evaluate_many(y, y_pred=y_pred)
+    np.testing.assert_array_equal(result["labels"], [0, 1, 2])
+    for m in range(len(y_pred)):
+        _assert_matches_sklearn(result, m, y, y_pred[m], [0, 1, 2])
+    np.testing.assert_array_equal(result["support"][0], np.bincount(y, minlength=3))
+
+
+def test_probabilities_at_every_threshold_match_sklearn():
+    y, proba = _binary_problem()
+    thresholds = np.linspace(0.1, 0.9, 9)
+    result = evaluate_many(y, proba=proba, thresholds=thresholds)
+    assert result["accuracy"].shape == (len(proba), len(thresholds))
+    for m in range(len(proba)):
+        assert result["log_loss"][m] == pytest.approx(log_loss(y, proba[m], labels=[0, 1]))
+        for t, cut in enumerate(thresholds):
+            _assert_matches_sklearn(result, (m, t), y, (proba[m] > cut).astype(np.float64), [0, 1])
+
+
+def test_default_threshold_matches_hard_predictions():
+    y, proba = _binary_problem()
+    from_proba = evaluate_many(y, proba=proba)
+    from_labels = evaluate_many(y, y_pred=(proba > 0.5).astype(np.float64), labels=[0.0, 1.0])
+    for key in ("accuracy", "macro_f1", "f1"):
+        np.testing.assert_array_equal(from_proba[key], from_labels[key])
+
+
+def test_evaluate_single_model_matches_sklearn():
+    y, proba = _binary_problem(models=1)
+    predict_proba = np.column_stack((1 - proba[0], proba[0]))
+    result = evaluate(y, proba=predict_proba)
+    y_pred = (proba[0] > 0.5).astype(np.float64)
+    assert result["accuracy"] == pytest.approx(accuracy_score(y, y_pred))
+    assert result["f1"][1.0] == pytest.approx(f1_score(y, y_pred))
+    assert result["log_loss"] == pytest.approx(log_loss(y, predict_proba))
+    assert result["support"] == {0.0: int((y == 0).sum()), 1.0: int((y == 1).sum())}
+
+
+def test_labels_outside_the_label_set_are_rejected():
+    with pytest.raises(ValueError, match="outside"):
+        evaluate_many([0, 1, 1], y_pred=[[0, 2, 1]], labels=[0, 1])
@@ -0,0 +1,72 @@
+# tests/test_migrations.py
+#
+# Shape of MIGRATIONS, plus the EXPLAIN plan checks against a real fl_database.
+# The plan test connects through backend/db/config.yaml (or NERONODE_DB_* overrides)
+# and is skipped when no database is reachable.
+#
+#   python -m pytest tests
+
+import re
+
+import mysql.connector
+import pytest
+
+from backend.db.connection import db_cursor
+from backend.db.migrations import MIGRATIONS, applied_versions, check_query_plans
+
+# Statement forms that are no-ops when the change is already in place.
+_RERUNNABLE = [
+    re.compile(r"CREATE (UNIQUE )?INDEX IF NOT EXISTS \w+ ON \w+"),
+    re.compile(r"CREATE TABLE IF NOT EXISTS \w+"),
+    re.compile(r"ALTER TABLE \w+ ADD COLUMN IF NOT EXISTS \w+"),
+    # MODIFY restates the full column definition, so applying it twice leaves the same column.
+    re.compile(r"ALTER TABLE \w+ MODIFY \w+ [^,;]+$"),
+]
+
+
+def _normalized(statement: str) -> str:
+    return " ".join(statement.split())
+
+
+def test_migration_versions_are_strictly_increasing():
+    versions = [version for version, _, _ in MIGRATIONS]
+    assert versions == sorted(set(versions))
+    assert versions[0] == 1
+
+
+def test_every_migration_has_a_description_and_statements():
+    for version, description, statements in MIGRATIONS:
+        assert description.strip(), f"migration {version} has no description"
+        assert statements, f"migration {version} has no statements"
+
+
+@pytest.mark.parametrize("version,statement", [(version, statement) for version, _, statements in MIGRATIONS
+                                               for statement in statements])
+def test_statement_is_safe_to_run_again(version, statement):
+    sql = _normalized(statement)
+    if sql.startswith("UPDATE "):
+        # A data fix must select only the rows it has not rewritten yet: migration 2
+        # moves update_id 0 past the max, after which no row matches WHERE update_id = 0.
+        assert re.search(r"\bWHERE\b", sql), f"migration {version}: UPDATE without WHERE"
+        return
+    assert any(pattern.match(sql) for pattern in _RERUNNABLE), \
+        f"migration {version}: not re-runnable: {sql[:80]}"
+
+
+@pytest.fixture
+def db():
+    try:
+        with db_cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchall()
+    except mysql.connector.Error as err:
+        pytest.skip(f"no database available: {err}")
+    with db_cursor(commit=True) as cursor:
+        yield cursor
+
+
+def test_query_plans_use_expected_indexes(db):
+    pending = [version for version, _, _ in MIGRATIONS if version not in set(applied_versions(db))]
+    if pending:
+        pytest.skip(f"migrations {pending} not applied; run python -m backend.db.migrations")
+    assert check_query_plans(db) == []
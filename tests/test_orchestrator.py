@@ -0,0 +1,83 @@
+# tests/test_orchestrator.py
+#
+# One federation round driven with the fl_rounds / client_updates access replaced in memory.
+#
+#   python -m pytest tests
+
+import asyncio
+from contextlib import contextmanager
+
+from backend.model import aggregate
+from backend.model.orchestrator import RoundOrchestrator
+
+
+class _Round:
+    """Scripted arrivals per poll, plus a record of what the orchestrator wrote and aggregated."""
+
+    def __init__(self, polls):
+        self.polls = list(polls)
+        self.aggregated = None
+        self.deadline_extensions = 0
+        self.statuses = []
+
+    def aggregate(self, model_id, round_num, clients=None):
+        self.aggregated = clients
+        return {"version": 7}
+
+
+def _orchestrator(round_state, **kwargs) -> RoundOrchestrator:
+    orchestrator = RoundOrchestrator(1, expected_clients=3, poll_interval=0, aggregate_fn=round_state.aggregate,
+                                     **kwargs)
+    orchestrator._open_round = lambda round_num: None
+    orchestrator._record_arrivals = lambda round_num, arrivals: None
+    orchestrator._poll_arrivals = lambda round_num: round_state.polls.pop(0) if len(round_state.polls) > 1 \
+        else round_state.polls[0]
+    orchestrator._set_status = lambda round_num, status, *args: round_state.statuses.append(status)
+
+    def extend(round_num):
+        round_state.deadline_extensions += 1
+
+    orchestrator._extend_deadline = extend
+    return orchestrator
+
+
+def test_quorum_round_aggregates_only_the_reported_clients():
+    round_state = _Round([{"a": 1.0}, {"a": 1.0, "b": 2.0}])
+    record = asyncio.run(_orchestrator(round_state, quorum=2).run_round(4))
+    assert record["trigger"] == "quorum"
+    assert record["clients"] == ["a", "b"]
+    assert round_state.aggregated == ["a", "b"]
+    assert record["stragglers"] == 1
+    assert round_state.statuses == ["aggregating", "closed"]
+
+
+def test_extended_deadline_is_written_back():
+    round_state = _Round([{}, {}, {"c": 5.0}])
+    record = asyncio.run(_orchestrator(round_state, deadline_seconds=0).run_round(4))
+    assert record["trigger"] == "deadline"
+    assert round_state.deadline_extensions == 2
+    assert round_state.aggregated == ["c"]
+    assert record["published_version"] == 7
+
+
+def test_round_updates_are_filtered_to_the_reported_clients(monkeypatch):
+    executed = []
+
+    class _Cursor:
+        def execute(self, sql, params):
+            executed.append((" ".join(sql.split()), params))
+
+        def fetchall(self):
+            return []
+
+    @contextmanager
+    def fake_cursor(**kwargs):
+        yield _Cursor()
+
+    monkeypatch.setattr(aggregate, "db_cursor", fake_cursor)
+    aggregate.fetch_round_updates(1, 4, ["a", "b"])
+    sql, params = executed[-1]
+    assert "AND client_id IN (%s, %s)" in sql
+    assert params == (1, 4, "a", "b")
+    assert aggregate.fetch_round_updates(1, 4, []) == []
+    assert len(executed) == 1
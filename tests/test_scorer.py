@@ -0,0 +1,83 @@
+# tests/test_scorer.py
+#
+# LinearScorer must reproduce the sklearn estimator it was compiled from.
+#
+#   python -m pytest tests
+
+import os
+import pickle
+import re
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+
+from backend.model.features import MODEL_TRAINING_FEATURES
+from backend.model.scorer import LinearScorer, compile_model
+
+DUMP_PATH = os.path.join(os.path.dirname(__file__), "..", "databaseFile", "127_0_0_1.sql")
+
+# Value ranges of the BRFSS features the clients train on (everything else is a 0/1 flag).
+_FEATURE_RANGES = {"BMI": (12, 98), "GenHlth": (1, 5), "MentHlth": (0, 30), "PhysHlth": (0, 30),
+                   "Age": (1, 13), "Education": (1, 6), "Income": (1, 8)}
+
+
+def _production_model() -> LogisticRegression:
+    """Global model 1 v3 ("FinalModel") as shipped in the central_updates dump."""
+    with open(DUMP_PATH) as f:
+        match = re.search(r"\(\d+, 1, '3', 0x([0-9a-f]+), '[^']*', 'FinalModel'\)", f.read())
+    assert match, "FinalModel row not found in the dump"
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")  # pickled with an older scikit-learn
+        return pickle.loads(bytes.fromhex(match.group(1)))
+
+
+def _feature_rows(n: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    columns = []
+    for name in MODEL_TRAINING_FEATURES:
+        lo, hi = _FEATURE_RANGES.get(name, (0, 1))
+        columns.append(rng.integers(lo, hi + 1, n))
+    return np.column_stack(columns).astype(np.float64)
+
+
+def _fitted_model(**params) -> LogisticRegression:
+    X = _feature_rows(2000, seed=1)
+    y = (X[:, 0] + X[:, 3] / 10 + np.random.default_rng(2).normal(0, 1, len(X)) > 4).astype(np.float64)
+    return LogisticRegression(max_iter=500, **params).fit(X, y)
+
+
+def _sklearn_input(model, X):
+    if hasattr(model, "feature_names_in_"):
+        return pd.DataFrame(X, columns=model.feature_names_in_)
+    return X
+
+
+@pytest.mark.parametrize("make_model", [_production_model, _fitted_model,
+                                        lambda: _fitted_model(class_weight="balanced", C=0.01)],
+                         ids=["production-v3", "fitted", "balanced"])
+def test_linear_scorer_matches_logistic_regression(make_model):
+    model = make_model()
+    scorer = compile_model(model)
+    assert isinstance(scorer, LinearScorer)
+
+    X = np.vstack([_feature_rows(5000), np.random.default_rng(3).normal(0, 20, (1000, len(MODEL_TRAINING_FEATURES)))])
+    np.testing.assert_array_equal(scorer.predict(X), model.predict(_sklearn_input(model, X)))
+    np.testing.assert_allclose(scorer.predict_proba(X), model.predict_proba(_sklearn_input(model, X)),
+                               rtol=0, atol=1e-12)
+
+
+def test_non_linear_estimator_is_returned_unchanged():
+    X = _feature_rows(500)
+    model = DecisionTreeClassifier(max_depth=3, random_state=0).fit(X, X[:, 0])
+    assert compile_model(model) is model
+
+
+@pytest.mark.filterwarnings("ignore::sklearn.exceptions.ConvergenceWarning")
+def test_multiclass_logistic_regression_is_returned_unchanged():
+    X = _feature_rows(500)
+    model = LogisticRegression(max_iter=500).fit(X, X[:, 14])  # GenHlth: five classes
+    assert compile_model(model) is model
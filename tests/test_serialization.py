@@ -0,0 +1,85 @@
+# tests/test_serialization.py
+#
+# NNMF containers must round-trip the estimators we exchange and refuse pickles unless asked.
+#
+#   python -m pytest tests
+
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression, Ridge
+from sklearn.tree import DecisionTreeClassifier
+from xgboost import XGBClassifier
+
+from backend.model import serialization
+from backend.model.ensemble import WeightedEnsembleClassifier
+from backend.model.serialization import UnsafeBlobError, UnsupportedModelError
+
+
+def _data(n: int = 400, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 5))
+    y = (X[:, 0] + 0.5 * X[:, 1] + rng.normal(0, 0.5, n) > 0).astype(np.int64)
+    return X, y
+
+
+@pytest.mark.parametrize("compress", [True, False])
+def test_logistic_regression_round_trip(compress):
+    X, y = _data()
+    frame = pd.DataFrame(X, columns=[f"f{i}" for i in range(X.shape[1])])
+    model = LogisticRegression(C=0.5, class_weight={0: 1.0, 1: 2.0}).fit(frame, y)
+    blob = serialization.dumps(model, compress=compress)
+    assert serialization.is_native(blob)
+
+    loaded = serialization.loads(blob)
+    assert type(loaded) is LogisticRegression
+    assert loaded.get_params() == model.get_params()
+    assert list(loaded.feature_names_in_) == list(model.feature_names_in_)
+    np.testing.assert_array_equal(loaded.coef_, model.coef_)
+    np.testing.assert_array_equal(loaded.predict_proba(frame), model.predict_proba(frame))
+
+
+def test_uncompressed_arrays_are_aligned_views():
+    X, y = _data()
+    blob = serialization.dumps(Ridge().fit(X, y), compress=False)
+    start = np.frombuffer(blob, dtype=np.uint8).ctypes.data
+    _, arrays = serialization.unpack_container(blob)
+    for array in arrays.values():
+        assert not array.flags.owndata
+        assert (array.ctypes.data - start) % 64 == 0
+
+
+def test_xgboost_round_trip():
+    X, y = _data()
+    model = XGBClassifier(n_estimators=5, max_depth=2, learning_rate=0.3).fit(X, y)
+    loaded = serialization.loads(serialization.dumps(model))
+    assert type(loaded) is XGBClassifier
+    np.testing.assert_array_equal(loaded.predict_proba(X), model.predict_proba(X))
+
+
+def test_xgboost_ensemble_round_trip():
+    X, y = _data()
+    members = [XGBClassifier(n_estimators=3, max_depth=2, random_state=seed).fit(X[seed::2], y[seed::2])
+               for seed in range(2)]
+    model = WeightedEnsembleClassifier(members, [0.25, 0.75])
+    loaded = serialization.loads(serialization.dumps(model))
+    np.testing.assert_allclose(loaded.predict_proba(X), model.predict_proba(X), rtol=0, atol=1e-7)
+
+
+def test_pickles_are_opt_in():
+    X, y = _data()
+    model = DecisionTreeClassifier(max_depth=2).fit(X, y)
+    with pytest.raises(UnsupportedModelError):
+        serialization.dumps(model)
+
+    wrapped = serialization.dumps(model, allow_pickle=True)
+    with pytest.raises(UnsafeBlobError):
+        serialization.loads(wrapped)
+    np.testing.assert_array_equal(serialization.loads(wrapped, allow_pickle=True).predict(X), model.predict(X))
+
+    legacy = pickle.dumps(model)
+    with pytest.raises(UnsafeBlobError):
+        serialization.loads(legacy)
+    assert type(serialization.loads(legacy, allow_pickle=True)) is DecisionTreeClassifier
@@ -0,0 +1,58 @@
+# tests/test_tree_aggregate.py
+#
+# Concatenated XGBoost boosters must score sum_k w_k * margin_k of the client boosters.
+#
+#   python -m pytest tests
+
+import json
+
+import numpy as np
+import pytest
+import xgboost as xgb
+from xgboost import XGBClassifier, XGBRegressor
+
+from backend.model.tree_aggregate import concat_boosters
+
+
+def _data(seed: int, n: int = 300):
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(n, 4))
+    y = (X[:, 0] + X[:, 1] * X[:, 2] + rng.normal(0, 0.5, n) > 0.3).astype(np.float64)
+    return X, y
+
+
+def _booster_json(model) -> dict:
+    return json.loads(bytes(model.get_booster().save_raw(raw_format="json")))
+
+
+def _margins(booster_json: dict, X) -> np.ndarray:
+    booster = xgb.Booster()
+    booster.load_model(bytearray(json.dumps(booster_json).encode("utf-8")))
+    return booster.predict(xgb.DMatrix(X), output_margin=True).astype(np.float64)
+
+
+@pytest.mark.parametrize("estimator", [XGBClassifier, XGBRegressor], ids=["logistic", "squarederror"])
+def test_concatenated_margin_is_weighted_sum_of_client_margins(estimator):
+    clients = [estimator(n_estimators=4 + k, max_depth=3, random_state=k).fit(*_data(k)) for k in range(3)]
+    booster_jsons = [_booster_json(model) for model in clients]
+    weights = [0.5, 0.3, 0.2]
+    X, _ = _data(99)
+
+    merged = concat_boosters(booster_jsons, weights)
+    expected = sum(w * _margins(b, X) for w, b in zip(weights, booster_jsons))
+    np.testing.assert_allclose(_margins(merged, X), expected, rtol=0, atol=1e-5)
+    assert len(merged["learner"]["gradient_booster"]["model"]["trees"]) == 4 + 5 + 6
+
+
+def test_concat_leaves_client_boosters_untouched():
+    booster_json = _booster_json(XGBClassifier(n_estimators=2, max_depth=2).fit(*_data(0)))
+    before = json.dumps(booster_json)
+    concat_boosters([booster_json, booster_json], [0.5, 0.5])
+    assert json.dumps(booster_json) == before
+
+
+def test_mixed_objectives_are_rejected():
+    booster_jsons = [_booster_json(XGBClassifier(n_estimators=2).fit(*_data(0))),
+                     _booster_json(XGBRegressor(n_estimators=2).fit(*_data(1)))]
+    with pytest.raises(ValueError, match="objectives"):
+        concat_boosters(booster_jsons, [0.5, 0.5])
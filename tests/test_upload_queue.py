@@ -0,0 +1,43 @@
+# tests/test_upload_queue.py
+#
+# The on-disk upload spool keeps the first update per (model, client, round), like the database does.
+#
+#   python -m pytest tests
+
+import numpy as np
+import pytest
+
+from backend.model.upload import DuplicateUpdateError
+from backend.model.upload_queue import UploadQueue
+
+Y_TEST = np.array([0, 1, 1, 0])
+Y_PRED = np.array([0, 1, 0, 0])
+
+
+def _enqueue(queue, blob, client_id="7", round_num=3):
+    return queue.enqueue(blob, Y_TEST, Y_PRED, 0.75, 0.5, 1, client_id, round_num)
+
+
+def test_second_update_for_a_pending_key_is_rejected(tmp_path):
+    queue = UploadQueue(spool_dir=str(tmp_path))
+    key = _enqueue(queue, b"first")
+    with pytest.raises(DuplicateUpdateError, match="first upload is kept"):
+        _enqueue(queue, b"second")
+
+    (name,) = queue.pending()
+    entry, blob = queue._load_entry(name)
+    assert entry["key"] == key
+    assert blob == b"first"
+
+
+def test_other_keys_and_drained_keys_are_accepted(tmp_path):
+    queue = UploadQueue(spool_dir=str(tmp_path))
+    key = _enqueue(queue, b"first")
+    _enqueue(queue, b"other round", round_num=4)
+    _enqueue(queue, b"other client", client_id="8")
+    assert len(queue.pending()) == 3
+
+    # Once drained, a later put is the database's to deduplicate.
+    queue._remove_entry(queue._entry_name(key))
+    _enqueue(queue, b"again")
+    assert len(queue.pending()) == 3
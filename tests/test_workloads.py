@@ -0,0 +1,72 @@
+# tests/test_workloads.py
+#
+# Per-workload executors across app lifespans, and their admission limit
+# (which the micro-batcher's batched predict calls share).
+#
+#   python -m pytest tests
+
+import asyncio
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.api import endpoints
+from backend.api.batcher import MicroBatcher
+from backend.api.workloads import Workload, WorkloadBusy
+from backend.main import app
+from backend.model.features import MODEL_TRAINING_FEATURES
+from backend.model.registry import ServingModel
+
+
+class _FirstFeatureModel:
+    def predict(self, X):
+        return np.asarray(X)[:, 0]
+
+
+@pytest.fixture
+def app_without_database(monkeypatch):
+    async def _no_model_loading():
+        pass
+
+    monkeypatch.setattr(endpoints, "_load_model", _no_model_loading)
+    monkeypatch.setattr(endpoints.registry, "_current", ServingModel(1, 3, _FirstFeatureModel(), time.time(), 0.0))
+    return app
+
+
+def test_workload_runs_again_after_shutdown():
+    workload = Workload("test", 1)
+    assert asyncio.run(workload.run(sum, [1, 2])) == 3
+    workload.shutdown()
+    assert asyncio.run(workload.run(sum, [3, 4])) == 7
+    workload.shutdown()
+
+
+def test_app_serves_predictions_in_a_second_lifespan(app_without_database):
+    body = ",".join(MODEL_TRAINING_FEATURES) + "\n" + ",".join(["1"] * len(MODEL_TRAINING_FEATURES)) + "\n"
+    for _ in range(2):
+        with TestClient(app_without_database) as client:
+            response = client.post("/bulk/", content=body, headers={"content-type": "text/csv"})
+            assert response.status_code == 200
+            assert response.text.startswith("0,1\n")
+
+
+def test_microbatcher_batches_are_admitted_by_the_workload():
+    workload = Workload("test", 1, max_concurrency=1, queue_timeout=0.05)
+    batcher = MicroBatcher(lambda X: X[:, 0], max_wait_ms=0, run=workload.run)
+
+    async def scenario():
+        np.testing.assert_array_equal(await batcher.submit(np.ones((2, 3))), [1, 1])
+        assert workload.completed_total == 1
+
+        holder = asyncio.create_task(workload.run(time.sleep, 0.2))
+        await asyncio.sleep(0.01)  # the holder now owns the only admission slot
+        with pytest.raises(WorkloadBusy):
+            await batcher.submit(np.ones((1, 3)))
+        await holder
+        np.testing.assert_array_equal(await batcher.submit(np.full((1, 3), 2.0)), [2])
+
+    asyncio.run(scenario())
+    assert workload.rejected_total == 1
+    workload.shutdown()